@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Small object benchmark: one write per object vs batched object writes.
+
+Sends a track of tiny objects (metadata, captions, telemetry) over an
+in-memory loopback session. Per object, each object is serialized and
+written with its own send_stream_data() / send_dgram_message() and
+transmit(), as the examples do. Batched, send_objects() and
+send_object_datagrams() encode `batch` objects at a time with a single
+write and transmit. Reports publisher send time per object, and end to
+end time until the subscriber has parsed every object.
+
+usage: python -m aiomoqt.benchmarks.bench_batch --certificate CERT --private-key KEY
+                                               [-n OBJECTS] [-b BATCH] [-s SIZE] [-r REPEAT]
+"""
+import time
+import asyncio
+import argparse
+import logging
+
+from aiomoqt.types import *
+from aiomoqt.messages import *
+from aiomoqt.utils.logger import set_log_level
+from aiomoqt.utils.loopback import loopback_connect
+from aiomoqt.benchmarks.bench_transport import make_sessions, wait_for
+
+
+def send_stream(server, stream_id, objects, batch) -> None:
+    if batch:
+        for pos in range(0, len(objects), batch):
+            server.send_objects(stream_id, objects[pos:pos + batch])
+        return
+    for object_id, payload, exts in objects:
+        data = ObjectHeader(object_id=object_id, payload=payload).serialize(server.codec).data
+        server._quic.send_stream_data(stream_id, data, end_stream=False)
+        server.transmit()
+
+
+def send_dgrams(server, alias, objects, batch) -> None:
+    if batch:
+        for pos in range(0, len(objects), batch):
+            server.send_object_datagrams(alias, 0, objects[pos:pos + batch])
+        return
+    for object_id, payload, exts in objects:
+        msg = ObjectDatagram(track_alias=alias, group_id=0, object_id=object_id, payload=payload)
+        server.send_dgram_message(msg.serialize(server.codec))
+
+
+async def bench(batch: int, count: int, size: int, certificate: str, private_key: str):
+    client, server = await loopback_connect(*make_sessions(False, certificate, private_key))
+    await client.client_session_init(timeout=5)
+    sub_msg = client.subscribe('bench', 'metadata')
+    await wait_for(lambda: sub_msg.subscribe_id in server._subscribers)
+    alias = sub_msg.track_alias
+
+    received = 0
+    handle_stream = client._moqt_handle_data_stream
+    def count_objects(stream_id, buf, buf_len):
+        nonlocal received
+        msg = handle_stream(stream_id, buf, buf_len)
+        if isinstance(msg, ObjectHeader):
+            received += 1
+        return msg
+    client._moqt_handle_data_stream = count_objects
+    handle_dgram = client._moqt_handle_data_dgram
+    def count_dgrams(buf):
+        nonlocal received
+        received += 1
+        return handle_dgram(buf)
+    client._moqt_handle_data_dgram = count_dgrams
+
+    objects = [(object_id, b'T' * size, None) for object_id in range(count)]
+    stream_id = server.create_data_stream()
+    server._quic.send_stream_data(
+        stream_id, SubgroupHeader(track_alias=alias, group_id=0, subgroup_id=0).serialize().data)
+    t0 = time.perf_counter()
+    send_stream(server, stream_id, objects, batch)
+    stream_send = time.perf_counter() - t0
+    await wait_for(lambda: received >= count)
+    stream_total = time.perf_counter() - t0
+
+    received = 0
+    t0 = time.perf_counter()
+    send_dgrams(server, alias, objects, batch)
+    dgram_send = time.perf_counter() - t0
+    await wait_for(lambda: received >= count, timeout=5.0)
+    dgram_total = time.perf_counter() - t0
+
+    client.close()
+    server.close()
+    return tuple(t * 1e6 / count for t in (stream_send, stream_total, dgram_send, dgram_total))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='MoQT small object batch write benchmark')
+    parser.add_argument('-n', '--objects', type=int, default=2000, help='Objects per run')
+    parser.add_argument('-b', '--batch', type=int, default=32, help='Objects per batched write')
+    parser.add_argument('-s', '--size', type=int, default=40, help='Object payload size')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs per case (best is reported)')
+    parser.add_argument('--certificate', type=str, required=True, help='TLS certificate file')
+    parser.add_argument('--private-key', type=str, required=True, help='TLS private key file')
+    return parser.parse_args()
+
+
+async def main(args):
+    set_log_level(logging.CRITICAL)
+    cases = (('per object', 0), (f'batch of {args.batch}', args.batch))
+    results = {name: [] for name, _ in cases}
+    for _ in range(args.repeat):  # interleaved runs, best of each metric
+        for name, batch in cases:
+            results[name].append(await bench(
+                batch, args.objects, args.size, args.certificate, args.private_key))
+
+    print(f"{args.objects} objects of {args.size} bytes, us/object")
+    print(f"{'write':<14} {'stream send':>12} {'stream e2e':>11} {'dgram send':>11} {'dgram e2e':>10}")
+    for name, runs in results.items():
+        stream_send, stream_total, dgram_send, dgram_total = (min(metric) for metric in zip(*runs))
+        print(f"{name:<14} {stream_send:>12.1f} {stream_total:>11.1f} {dgram_send:>11.1f} {dgram_total:>10.1f}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Control message codec benchmark: schema generated vs hand-written code.
+
+The legacy_* functions are the hand-written serialize/deserialize bodies the
+message classes used before the schema codecs, kept here as a reference.
+
+usage: python -m aiomoqt.benchmarks.bench_codec [-n ITERATIONS]
+"""
+import argparse
+import timeit
+
+from aioquic.buffer import Buffer
+
+from aiomoqt.types import *
+from aiomoqt.messages import *
+from aiomoqt.messages.base import BUF_SIZE
+
+
+def legacy_subscribe_serialize(self):
+    buf = Buffer(capacity=BUF_SIZE)
+    payload = Buffer(capacity=BUF_SIZE)
+    payload.push_uint_var(self.subscribe_id)
+    payload.push_uint_var(self.track_alias)
+    payload.push_uint_var(len(self.namespace))
+    for part in self.namespace:
+        payload.push_uint_var(len(part))
+        payload.push_bytes(part)
+    payload.push_uint_var(len(self.track_name))
+    payload.push_bytes(self.track_name)
+    payload.push_uint8(self.priority)
+    payload.push_uint8(self.group_order)
+    payload.push_uint_var(self.filter_type)
+    if self.filter_type in (3, 4):
+        payload.push_uint_var(self.start_group or 0)
+        payload.push_uint_var(self.start_object or 0)
+    if self.filter_type == 4:
+        payload.push_uint_var(self.end_group or 0)
+    parameters = self.parameters or {}
+    payload.push_uint_var(len(parameters))
+    for param_id, param_value in parameters.items():
+        payload.push_uint_var(param_id)
+        param_value = MOQTMessage._bytes_encode(param_value)
+        payload.push_uint_var(len(param_value))
+        payload.push_bytes(param_value)
+    buf.push_uint_var(self.type)
+    buf.push_uint_var(len(payload.data))
+    buf.push_bytes(payload.data)
+    return buf
+
+
+def legacy_subscribe_deserialize(buf):
+    subscribe_id = buf.pull_uint_var()
+    track_alias = buf.pull_uint_var()
+    tuple_len = buf.pull_uint_var()
+    namespace = []
+    for _ in range(tuple_len):
+        part_len = buf.pull_uint_var()
+        namespace.append(buf.pull_bytes(part_len))
+    namespace = tuple(namespace)
+    track_name_len = buf.pull_uint_var()
+    track_name = buf.pull_bytes(track_name_len)
+    priority = buf.pull_uint8()
+    group_order = buf.pull_uint8()
+    filter_type = buf.pull_uint_var()
+    start_group = None
+    start_object = None
+    end_group = None
+    if filter_type in (3, 4):
+        start_group = buf.pull_uint_var()
+        start_object = buf.pull_uint_var()
+    if filter_type == 4:
+        end_group = buf.pull_uint_var()
+    params = {}
+    param_count = buf.pull_uint_var()
+    for _ in range(param_count):
+        param_id = buf.pull_uint_var()
+        param_len = buf.pull_uint_var()
+        param_value = buf.pull_bytes(param_len)
+        params[param_id] = param_value
+    return Subscribe(
+        subscribe_id=subscribe_id, track_alias=track_alias, namespace=namespace,
+        track_name=track_name, priority=priority, group_order=group_order,
+        filter_type=filter_type, start_group=start_group, start_object=start_object,
+        end_group=end_group, parameters=params)
+
+
+def legacy_subscribe_ok_serialize(self):
+    payload = Buffer(capacity=BUF_SIZE)
+    payload.push_uint_var(self.subscribe_id)
+    payload.push_uint_var(self.expires)
+    payload.push_uint8(self.group_order.value)
+    payload.push_uint8(self.content_exists)
+    if self.content_exists == ContentExistsCode.EXISTS:
+        payload.push_uint_var(self.largest_group_id)
+        payload.push_uint_var(self.largest_object_id)
+    parameters = self.parameters or {}
+    payload.push_uint_var(len(parameters))
+    for param_type, param_value in parameters.items():
+        payload.push_uint_var(param_type)
+        param_value = MOQTMessage._bytes_encode(param_value)
+        payload.push_uint_var(len(param_value))
+        payload.push_bytes(param_value)
+    buf = Buffer(capacity=BUF_SIZE)
+    buf.push_uint_var(self.type)
+    buf.push_uint_var(len(payload.data))
+    buf.push_bytes(payload.data)
+    return buf
+
+
+def legacy_subscribe_ok_deserialize(buf):
+    subscribe_id = buf.pull_uint_var()
+    expires = buf.pull_uint_var()
+    group_order = GroupOrder(buf.pull_uint8())
+    content_exists = buf.pull_uint8()
+    largest_group_id = None
+    largest_object_id = None
+    if content_exists == ContentExistsCode.EXISTS:
+        largest_group_id = buf.pull_uint_var()
+        largest_object_id = buf.pull_uint_var()
+    parameters = {}
+    param_count = buf.pull_uint_var()
+    for _ in range(param_count):
+        param_id = buf.pull_uint_var()
+        param_len = buf.pull_uint_var()
+        param_value = buf.pull_bytes(param_len)
+        parameters[param_id] = param_value
+    return SubscribeOk(
+        subscribe_id=subscribe_id, expires=expires, group_order=group_order,
+        content_exists=content_exists, largest_group_id=largest_group_id,
+        largest_object_id=largest_object_id, parameters=parameters)
+
+
+def legacy_announce_serialize(self):
+    buf = Buffer(capacity=BUF_SIZE)
+    payload = Buffer(capacity=BUF_SIZE)
+    payload.push_uint_var(len(self.namespace))
+    for part in self.namespace:
+        payload.push_uint_var(len(part))
+        payload.push_bytes(part)
+    payload.push_uint_var(len(self.parameters))
+    for param_id, param_value in self.parameters.items():
+        payload.push_uint_var(param_id)
+        payload.push_uint_var(len(param_value))
+        payload.push_bytes(param_value)
+    buf.push_uint_var(self.type)
+    buf.push_uint_var(payload.tell())
+    buf.push_bytes(payload.data_slice(0, payload.tell()))
+    return buf
+
+
+def legacy_announce_deserialize(buf):
+    tuple_len = buf.pull_uint_var()
+    namespace = []
+    for _ in range(tuple_len):
+        part_len = buf.pull_uint_var()
+        namespace.append(buf.pull_bytes(part_len))
+    namespace = tuple(namespace)
+    params = {}
+    param_count = buf.pull_uint_var()
+    for _ in range(param_count):
+        param_id = buf.pull_uint_var()
+        param_len = buf.pull_uint_var()
+        param_value = buf.pull_bytes(param_len)
+        params[param_id] = param_value
+    return Announce(namespace=namespace, parameters=params)
+
+
+def legacy_fetch_ok_serialize(self):
+    buf = Buffer(capacity=BUF_SIZE)
+    payload = Buffer(capacity=BUF_SIZE)
+    payload.push_uint_var(self.subscribe_id)
+    payload.push_uint8(self.group_order)
+    payload.push_uint8(self.end_of_track)
+    payload.push_uint_var(self.largest_group_id)
+    payload.push_uint_var(self.largest_object_id)
+    payload.push_uint_var(len(self.parameters))
+    for param_id, param_value in self.parameters.items():
+        payload.push_uint_var(param_id)
+        param_value = MOQTMessage._bytes_encode(param_value)
+        payload.push_uint_var(len(param_value))
+        payload.push_bytes(param_value)
+    buf.push_uint_var(self.type)
+    buf.push_uint_var(len(payload.data))
+    buf.push_bytes(payload.data)
+    return buf
+
+
+def legacy_fetch_ok_deserialize(buf):
+    subscribe_id = buf.pull_uint_var()
+    group_order = buf.pull_uint8()
+    end_of_track = buf.pull_uint8()
+    largest_group_id = buf.pull_uint_var()
+    largest_object_id = buf.pull_uint_var()
+    params = {}
+    param_count = buf.pull_uint_var()
+    for _ in range(param_count):
+        param_id = buf.pull_uint_var()
+        param_len = buf.pull_uint_var()
+        param_value = buf.pull_bytes(param_len)
+        params[param_id] = param_value
+    return FetchOk(
+        subscribe_id=subscribe_id, group_order=group_order, end_of_track=end_of_track,
+        largest_group_id=largest_group_id, largest_object_id=largest_object_id,
+        parameters=params)
+
+
+BENCH_CASES = [
+    (
+        Subscribe(
+            subscribe_id=42, track_alias=7, namespace=(b'live', b'sports'), track_name=b'football',
+            priority=128, group_order=GroupOrder.ASCENDING, filter_type=FilterType.ABSOLUTE_RANGE,
+            start_group=10, start_object=0, end_group=20,
+            parameters={ParamType.AUTHORIZATION_INFO: b'auth-token-123'}),
+        legacy_subscribe_serialize,
+        legacy_subscribe_deserialize,
+    ),
+    (
+        SubscribeOk(
+            subscribe_id=42, expires=0, group_order=GroupOrder.ASCENDING,
+            content_exists=ContentExistsCode.EXISTS, largest_group_id=10, largest_object_id=5,
+            parameters={ParamType.DELIVERY_TIMEOUT: b'\x40\x64'}),
+        legacy_subscribe_ok_serialize,
+        legacy_subscribe_ok_deserialize,
+    ),
+    (
+        Announce(
+            namespace=(b'vivohcast', b'net', b'live'),
+            parameters={ParamType.AUTHORIZATION_INFO: b'auth-token-123'}),
+        legacy_announce_serialize,
+        legacy_announce_deserialize,
+    ),
+    (
+        FetchOk(
+            subscribe_id=42, group_order=GroupOrder.ASCENDING, end_of_track=0,
+            largest_group_id=100, largest_object_id=7, parameters={}),
+        legacy_fetch_ok_serialize,
+        legacy_fetch_ok_deserialize,
+    ),
+]
+
+
+def _strip_header(data: bytes) -> Buffer:
+    buf = Buffer(data=data)
+    buf.pull_uint_var()
+    buf.pull_uint_var()
+    return buf
+
+
+def bench(iterations: int) -> None:
+    print(f"{'message':<14} {'op':<12} {'legacy us':>10} {'schema us':>10} {'speedup':>8}")
+    for msg, legacy_ser, legacy_de in BENCH_CASES:
+        cls = type(msg)
+        data = msg.serialize().data
+        assert data == legacy_ser(msg).data, f"{cls.__name__}: wire format mismatch"
+
+        results = (
+            ('serialize',
+             lambda: legacy_ser(msg),
+             lambda: msg.serialize()),
+            ('deserialize',
+             lambda: legacy_de(_strip_header(data)),
+             lambda: cls.deserialize(_strip_header(data))),
+        )
+        for op, legacy, schema in results:
+            t_legacy = min(timeit.repeat(legacy, number=iterations, repeat=7)) / iterations * 1e6
+            t_schema = min(timeit.repeat(schema, number=iterations, repeat=7)) / iterations * 1e6
+            print(f"{cls.__name__:<14} {op:<12} {t_legacy:>10.3f} {t_schema:>10.3f} "
+                  f"{t_legacy / t_schema:>7.2f}x")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='MoQT control message codec benchmark')
+    parser.add_argument('-n', '--iterations', type=int, default=20000,
+                        help='Iterations per measurement')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    bench(args.iterations)
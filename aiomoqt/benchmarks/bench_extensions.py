@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Object extension encoding benchmark: dict extensions vs ExtensionTemplate.
+
+usage: python -m aiomoqt.benchmarks.bench_extensions [-n ITERATIONS]
+"""
+import time
+import argparse
+import timeit
+
+from aiomoqt.types import MOQT_TIMESTAMP_EXT
+from aiomoqt.messages import ObjectHeader, ExtensionTemplate
+
+PAYLOAD = b'P' * 1200
+
+STATIC_EXTS = {
+    0x00: 4207849484,
+    0x25: b'MOQT-TS: static',
+}
+
+
+def bench(iterations: int) -> None:
+    template = ExtensionTemplate(STATIC_EXTS)
+
+    def with_dict():
+        exts = dict(STATIC_EXTS)
+        exts[MOQT_TIMESTAMP_EXT] = int(time.time() * 1000)
+        return ObjectHeader(object_id=1, extensions=exts, payload=PAYLOAD).serialize()
+
+    def with_template():
+        template[MOQT_TIMESTAMP_EXT] = int(time.time() * 1000)
+        return ObjectHeader(object_id=1, extensions=template, payload=PAYLOAD).serialize()
+
+    print(f"{'extensions':<12} {'us/object':>10}")
+    for name, func in (('dict', with_dict), ('template', with_template)):
+        t = min(timeit.repeat(func, number=iterations, repeat=5)) / iterations * 1e6
+        print(f"{name:<12} {t:>10.3f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='MoQT object extension encoding benchmark')
+    parser.add_argument('-n', '--iterations', type=int, default=50000,
+                        help='Iterations per measurement')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    bench(args.iterations)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Object fan-out benchmark: per-subscriber serialization vs shared objects.
+
+Sends each object of a subgroup to many subscribers of one track, each with
+its own track alias. The legacy_* functions serialize the SubgroupHeader and
+ObjectHeader for every subscriber, as the examples do; the shared path
+encodes the subgroup header tail and each object once (SharedSubgroup,
+SharedObject) and only patches the track alias. Stream writes are collected
+in a list instead of a QUIC connection, so the time is encoding cost only.
+
+usage: python -m aiomoqt.benchmarks.bench_fanout [-s SUBSCRIBERS] [-n OBJECTS] [-p PAYLOAD] [-r REPEAT]
+"""
+import time
+import argparse
+
+from aiomoqt.types import *
+from aiomoqt.messages import *
+
+
+def legacy_fanout(aliases, objects, codec, write) -> None:
+    for alias in aliases:
+        write(SubgroupHeader(track_alias=alias, group_id=0, subgroup_id=0).serialize().data)
+    for obj in objects:
+        for alias in aliases:
+            write(obj.serialize(codec).data)
+
+
+def shared_fanout(aliases, objects, codec, write) -> None:
+    subgroup = SharedSubgroup(group_id=0, subgroup_id=0)
+    for alias in aliases:
+        write(subgroup.header(alias))
+    for obj in objects:
+        data = SharedObject(obj).data(codec)
+        for alias in aliases:
+            write(data)
+
+
+def legacy_dgram_fanout(aliases, objects, codec, write) -> None:
+    for obj in objects:
+        for alias in aliases:
+            obj.track_alias = alias
+            write(obj.serialize(codec).data)
+
+
+def shared_dgram_fanout(aliases, objects, codec, write) -> None:
+    for obj in objects:
+        shared = SharedObject(obj)
+        for alias in aliases:
+            write(shared.datagram(alias, codec))
+
+
+def run(fanout, aliases, objects, codec) -> float:
+    """us per object (all subscribers)."""
+    out = []
+    t0 = time.perf_counter()
+    fanout(aliases, objects, codec, out.append)
+    return (time.perf_counter() - t0) * 1e6 / len(objects)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='MoQT object fan-out benchmark')
+    parser.add_argument('-s', '--subscribers', type=int, default=100, help='Subscribers of the track')
+    parser.add_argument('-n', '--objects', type=int, default=1000, help='Objects per pass')
+    parser.add_argument('-p', '--payload', type=int, default=1000, help='Object payload size (bytes)')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Passes per case (best is reported)')
+    return parser.parse_args()
+
+
+def main(args):
+    codec = get_codec()
+    aliases = list(range(1, args.subscribers + 1))
+    exts = codec.extension_template()
+    exts[MOQT_TIMESTAMP_EXT] = int(time.time() * 1000)
+    payload = b'x' * args.payload
+    objects = [ObjectHeader(object_id=n, extensions=exts, payload=payload) for n in range(args.objects)]
+    dgram_payload = payload[:1100]
+    dgrams = [ObjectDatagram(track_alias=0, group_id=0, object_id=n, extensions=exts, payload=dgram_payload)
+              for n in range(args.objects)]
+    cases = {
+        'stream per-subscriber': (legacy_fanout, objects),
+        'stream shared': (shared_fanout, objects),
+        'datagram per-subscriber': (legacy_dgram_fanout, dgrams),
+        'datagram shared': (shared_dgram_fanout, dgrams),
+    }
+    results = {name: [] for name in cases}
+    for _ in range(args.repeat):  # interleaved runs
+        for name, (fanout, objs) in cases.items():
+            results[name].append(run(fanout, aliases, objs, codec))
+    print(f"{args.subscribers} subscribers, {args.objects} objects, {args.payload} byte payload")
+    print(f"{'fan-out':<24} {'us/object':>10}")
+    for name, runs in results.items():
+        print(f"{name:<24} {min(runs):>10.1f}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Reconnect benchmark: full TLS handshake vs session resumption with 0-RTT.
+
+Reconnects a client to a server over an in-memory loopback with an
+emulated network delay and measures the time from connect to the first
+object of a subscription, for a full handshake and for a resumed session
+(session ticket from the previous connection, setup sent as 0-RTT data).
+
+usage: python -m aiomoqt.benchmarks.bench_resume --certificate CERT --private-key KEY
+                                                [-d DELAY_MS] [-r REPEAT]
+"""
+import ssl
+import time
+import asyncio
+import argparse
+import logging
+
+from aioquic.quic.configuration import QuicConfiguration
+from aioquic.h3.connection import H3_ALPN
+
+from aiomoqt.types import *
+from aiomoqt.messages import *
+from aiomoqt.utils.logger import set_log_level
+from aiomoqt.utils.loopback import loopback_connect
+from aiomoqt.utils.tickets import SessionTicketStore
+
+
+class BenchSession:
+    host = 'localhost'
+    port = 4433
+    endpoint = 'moq'
+
+    def __init__(self, configuration: QuicConfiguration, ticket_store: SessionTicketStore = None):
+        self.configuration = configuration
+        self.ticket_store = ticket_store
+
+    def session_ticket_handler(self, ticket) -> None:
+        self.ticket_store.put((self.host, self.port), ticket)
+
+
+def make_sessions(raw_quic: bool, resume: bool, client_store: SessionTicketStore,
+                  server_store: SessionTicketStore, certificate: str, private_key: str):
+    client = BenchSession(QuicConfiguration(
+        is_client=True,
+        alpn_protocols=[MOQT_ALPN] if raw_quic else H3_ALPN,
+        verify_mode=ssl.CERT_NONE,
+        max_datagram_frame_size=65536,
+    ), client_store)
+    if resume:
+        client.configuration.session_ticket = client_store.get((client.host, client.port))
+    server_cfg = QuicConfiguration(
+        is_client=False,
+        alpn_protocols=H3_ALPN + [MOQT_ALPN],
+        max_datagram_frame_size=65536,
+    )
+    server_cfg.load_cert_chain(certificate, private_key)
+    return client, BenchSession(server_cfg, server_store)
+
+
+async def wait_for(predicate, timeout: float = 30.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.0005)
+
+
+async def reconnect(raw_quic: bool, resume: bool, delay: float, client_store: SessionTicketStore,
+                    server_store: SessionTicketStore, certificate: str, private_key: str) -> float:
+    """Connect, subscribe and wait for the first object: ms."""
+    sessions = make_sessions(raw_quic, resume, client_store, server_store, certificate, private_key)
+    t0 = time.perf_counter()
+    client, server = await loopback_connect(*sessions, delay=delay)
+    await client.client_session_init(timeout=5)
+    sub_msg = client.subscribe('bench', 'track')
+    await wait_for(lambda: sub_msg.subscribe_id in server._subscribers)
+
+    received = []
+    handle_stream = client._moqt_handle_data_stream
+    def first_object(stream_id, buf, buf_len):
+        msg = handle_stream(stream_id, buf, buf_len)
+        if isinstance(msg, ObjectHeader):
+            received.append(msg)
+        return msg
+    client._moqt_handle_data_stream = first_object
+
+    stream_id = server.create_data_stream()
+    data = SubgroupHeader(track_alias=sub_msg.track_alias, group_id=0, subgroup_id=0).serialize().data
+    data += ObjectHeader(object_id=0, payload=b'P' * 1000).serialize(server.codec).data
+    server._quic.send_stream_data(stream_id, data, end_stream=True)
+    server.transmit()
+    await wait_for(lambda: received)
+    first_object_ms = (time.perf_counter() - t0) * 1000
+    if resume:
+        assert client._quic.tls.session_resumed, "session not resumed"
+
+    await wait_for(lambda: client_store.get((client._session.host, client._session.port)) is not None)
+    client.close()
+    server.close()
+    return first_object_ms
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='MoQT reconnect benchmark: full handshake vs 0-RTT resumption')
+    parser.add_argument('-d', '--delay', type=float, default=10.0, help='One-way network delay (ms)')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Reconnects per case (best is reported)')
+    parser.add_argument('--certificate', type=str, required=True, help='TLS certificate file')
+    parser.add_argument('--private-key', type=str, required=True, help='TLS private key file')
+    return parser.parse_args()
+
+
+async def main(args):
+    set_log_level(logging.CRITICAL)
+    delay = args.delay / 1000
+    print(f"one-way delay: {args.delay:.1f} ms (RTT {2 * args.delay:.1f} ms)")
+    print(f"{'transport':<14} {'handshake':<10} {'first object ms':>16}")
+    for name, raw_quic in (('webtransport', False), ('raw quic', True)):
+        results = {'full': [], '0-rtt': []}
+        client_store, server_store = SessionTicketStore(), SessionTicketStore()
+        for _ in range(args.repeat):  # interleaved runs, best of each case
+            for case, resume in (('full', False), ('0-rtt', True)):
+                results[case].append(await reconnect(
+                    raw_quic, resume, delay, client_store, server_store,
+                    args.certificate, args.private_key))
+        for case, runs in results.items():
+            print(f"{name:<14} {case:<10} {min(runs):>16.2f}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(main(args))
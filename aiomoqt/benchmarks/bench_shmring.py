@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Multi-process fan-out benchmark: one shared memory object ring, N egress workers.
+
+An ingest side writes a track's objects once into an ObjectRingWriter. Each
+egress worker process attaches an ObjectRingReader and writes every object
+to its subscribers, appending it to a per subscriber bytearray as a QUIC
+stream send buffer would. Workers run concurrently, so the aggregate
+subscriber writes per second show how fan-out capacity scales with the
+number of worker processes (and cores).
+
+usage: python -m aiomoqt.benchmarks.bench_shmring [-w WORKERS ...] [-s SUBSCRIBERS] [-n OBJECTS] [-p PAYLOAD]
+"""
+import os
+import time
+import argparse
+import multiprocessing
+
+from aiomoqt.types import *
+from aiomoqt.messages import *
+from aiomoqt.utils.shmring import ObjectRingWriter, ObjectRingReader
+
+
+def egress_worker(name, count, subscribers, barrier, results) -> None:
+    reader = ObjectRingReader(name, start=0)
+    codec = reader.codec
+    buffers = [bytearray() for _ in range(subscribers)]
+    barrier.wait()
+    t0 = time.perf_counter()
+    done = 0
+    while done < count:
+        objects = reader.read()
+        for obj in objects:
+            data = obj.data(codec)
+            for buf in buffers:
+                buf += data
+        for buf in buffers:
+            buf.clear()  # sent
+        done += len(objects)
+    results.put(time.perf_counter() - t0)
+    reader.close()
+
+
+def run(workers, count, subscribers, payload) -> float:
+    """Subscriber object writes per second, all workers."""
+    name = f"moqt-bench-{os.getpid()}"
+    writer = ObjectRingWriter(name, get_codec(), size=count * (payload + 32), slots=count)
+    try:
+        for object_id in range(count):
+            writer.append(object_id // 30, 0, ObjectHeader(object_id=object_id % 30, payload=b'x' * payload))
+        ctx = multiprocessing.get_context('spawn')
+        barrier = ctx.Barrier(workers)
+        results = ctx.Queue()
+        procs = [ctx.Process(target=egress_worker, args=(name, count, subscribers, barrier, results))
+                 for _ in range(workers)]
+        for proc in procs:
+            proc.start()
+        elapsed = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+    finally:
+        writer.close()
+    return sum(count * subscribers / t for t in elapsed)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='MoQT shared memory ring fan-out benchmark')
+    parser.add_argument('-w', '--workers', type=int, nargs='+', default=[1, 2, 4], help='Egress worker processes')
+    parser.add_argument('-s', '--subscribers', type=int, default=100, help='Subscribers per worker')
+    parser.add_argument('-n', '--objects', type=int, default=5000, help='Objects in the track')
+    parser.add_argument('-p', '--payload', type=int, default=1000, help='Object payload size (bytes)')
+    return parser.parse_args()
+
+
+def main(args):
+    print(f"{args.objects} objects of {args.payload} bytes, {args.subscribers} subscribers per worker, "
+          f"{os.cpu_count()} cpus")
+    print(f"{'workers':<8} {'writes/s':>12} {'scaling':>8}")
+    base = None
+    for workers in args.workers:
+        rate = run(workers, args.objects, args.subscribers, args.payload)
+        base = base or rate / workers
+        print(f"{workers:<8} {rate:>12.0f} {rate / base:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Session transport benchmark: raw QUIC (ALPN moq-00) vs WebTransport over HTTP/3.
+
+Runs a client and a server session over an in-memory loopback (real QUIC
+handshake and congestion control, no sockets) and measures session setup
+time and the delivery of subgroup stream objects and object datagrams.
+
+usage: python -m aiomoqt.benchmarks.bench_transport --certificate CERT --private-key KEY
+                                                   [-g GROUPS] [-o OBJECTS] [-s SIZE] [-r REPEAT]
+"""
+import ssl
+import time
+import asyncio
+import argparse
+import logging
+
+from aioquic.quic.configuration import QuicConfiguration
+from aioquic.h3.connection import H3_ALPN
+
+from aiomoqt.types import *
+from aiomoqt.messages import *
+from aiomoqt.utils.logger import set_log_level
+from aiomoqt.utils.loopback import loopback_connect
+
+
+class BenchSession:
+    host = 'localhost'
+    port = 4433
+    endpoint = 'moq'
+
+    def __init__(self, configuration: QuicConfiguration):
+        self.configuration = configuration
+
+
+def make_sessions(raw_quic: bool, certificate: str, private_key: str):
+    client = BenchSession(QuicConfiguration(
+        is_client=True,
+        alpn_protocols=[MOQT_ALPN] if raw_quic else H3_ALPN,
+        verify_mode=ssl.CERT_NONE,
+        max_datagram_frame_size=65536,
+    ))
+    server_cfg = QuicConfiguration(
+        is_client=False,
+        alpn_protocols=H3_ALPN + [MOQT_ALPN],
+        max_datagram_frame_size=65536,
+    )
+    server_cfg.load_cert_chain(certificate, private_key)
+    return client, BenchSession(server_cfg)
+
+
+async def wait_for(predicate, timeout: float = 30.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0)
+
+
+async def bench(raw_quic: bool, groups: int, objects: int, size: int, certificate: str, private_key: str):
+    t0 = time.perf_counter()
+    client, server = await loopback_connect(*make_sessions(raw_quic, certificate, private_key))
+    await client.client_session_init(timeout=5)
+    setup_ms = (time.perf_counter() - t0) * 1000
+
+    sub_msg = client.subscribe('bench', 'track')
+    await wait_for(lambda: sub_msg.subscribe_id in server._subscribers)
+    alias = sub_msg.track_alias
+
+    received = 0
+    handle_stream = client._moqt_handle_data_stream
+    def count_objects(stream_id, buf, buf_len):
+        nonlocal received
+        msg = handle_stream(stream_id, buf, buf_len)
+        if isinstance(msg, ObjectHeader):
+            received += 1
+        return msg
+    client._moqt_handle_data_stream = count_objects
+
+    payload = b'P' * size
+    total = groups * objects
+    wire_start = server._transport.bytes_sent
+    t0 = time.perf_counter()
+    for group_id in range(groups):
+        stream_id = server.create_data_stream()
+        data = SubgroupHeader(track_alias=alias, group_id=group_id, subgroup_id=0).serialize().data
+        for object_id in range(objects):
+            data += ObjectHeader(object_id=object_id, payload=payload).serialize(server.codec).data
+        server._quic.send_stream_data(stream_id, data, end_stream=True)
+        server.transmit()
+        await asyncio.sleep(0)
+    await wait_for(lambda: received >= total)
+    stream_ms = (time.perf_counter() - t0) * 1000
+    stream_wire = server._transport.bytes_sent - wire_start
+
+    dgrams = 0
+    handle_dgram = client._moqt_handle_data_dgram
+    def count_dgrams(buf):
+        nonlocal dgrams
+        dgrams += 1
+        return handle_dgram(buf)
+    client._moqt_handle_data_dgram = count_dgrams
+
+    dgram_payload = payload[:1000]
+    t0 = time.perf_counter()
+    for object_id in range(total):
+        msg = ObjectDatagram(track_alias=alias, group_id=0, object_id=object_id, payload=dgram_payload)
+        server.send_dgram_message(msg.serialize(server.codec))
+        if object_id % 16 == 15:
+            await asyncio.sleep(0)
+    await wait_for(lambda: dgrams >= total, timeout=5.0)
+    dgram_ms = (time.perf_counter() - t0) * 1000
+
+    client.close()
+    server.close()
+    return setup_ms, stream_ms, stream_wire, dgram_ms
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='MoQT raw QUIC vs WebTransport transport benchmark')
+    parser.add_argument('-g', '--groups', type=int, default=50, help='Subgroup streams to send')
+    parser.add_argument('-o', '--objects', type=int, default=20, help='Objects per subgroup stream')
+    parser.add_argument('-s', '--size', type=int, default=1000, help='Object payload size')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs per transport (best is reported)')
+    parser.add_argument('--certificate', type=str, required=True, help='TLS certificate file')
+    parser.add_argument('--private-key', type=str, required=True, help='TLS private key file')
+    return parser.parse_args()
+
+
+async def main(args):
+    set_log_level(logging.CRITICAL)
+    transports = (('webtransport', False), ('raw quic', True))
+    results = {name: [] for name, _ in transports}
+    for _ in range(args.repeat):  # interleaved runs, best of each metric
+        for name, raw_quic in transports:
+            results[name].append(await bench(
+                raw_quic, args.groups, args.objects, args.size, args.certificate, args.private_key))
+
+    print(f"{'transport':<14} {'setup ms':>9} {'streams ms':>11} {'wire bytes':>11} {'dgrams ms':>10}")
+    for name, runs in results.items():
+        setup_ms, stream_ms, stream_wire, dgram_ms = (min(metric) for metric in zip(*runs))
+        print(f"{name:<14} {setup_ms:>9.2f} {stream_ms:>11.2f} {stream_wire:>11} {dgram_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(main(args))
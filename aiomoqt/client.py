@@ -1,14 +1,21 @@
 import os
 import sys
 import ssl
-from typing import Optional, AsyncContextManager
+import copy
+import asyncio
+import ipaddress
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, Optional, AsyncContextManager, AsyncIterator, Tuple
 
 from aioquic.quic.configuration import QuicConfiguration
 from aioquic.asyncio.client import connect
+from aioquic.tls import SessionTicket
 from aioquic.h3.connection import H3_ALPN
 
 from .protocol import *
 from .utils.logger import *
+from .utils.auth import Authorizer
+from .utils.tickets import SessionTicketStore
 
 logger = get_logger(__name__)
 
@@ -21,15 +28,23 @@ class MOQTClientSession(MOQTSession):  # New connection manager class
         configuration: Optional[QuicConfiguration] = None,
         keylog_filename: Optional[str] = None,
         debug: Optional[bool] = False,
+        raw_quic: Optional[bool] = False,
+        ticket_store: Optional[SessionTicketStore] = None,
+        max_data_streams: int = MOQT_MAX_DATA_STREAMS,
+        authorizer: Optional[Authorizer] = None,
     ):
         self.host = host
         self.port = port
         self.debug = debug
         self.endpoint = endpoint
+        self.raw_quic = raw_quic  # MoQT directly over QUIC (ALPN moq-00), no H3/WebTransport
+        self.ticket_store = ticket_store  # TLS session tickets for resumption and 0-RTT
+        self.max_data_streams = max_data_streams  # incoming data streams kept open to the peer
+        self.authorizer = authorizer  # AUTHORIZATION_INFO verification of incoming requests
         if configuration is None:
             keylog_file = open(keylog_filename, 'a') if keylog_filename else None
             configuration = QuicConfiguration(
-                alpn_protocols=H3_ALPN,
+                alpn_protocols=[MOQT_ALPN] if raw_quic else H3_ALPN,
                 is_client=True,
                 verify_mode=ssl.CERT_NONE,
                 max_datagram_frame_size=65536,
@@ -40,13 +55,215 @@ class MOQTClientSession(MOQTSession):  # New connection manager class
         self.configuration = configuration
         logger.debug(f"quic_logger: {class_name(configuration.quic_logger)}")
 
+    def session_ticket_handler(self, ticket: SessionTicket) -> None:
+        """Keep a session ticket issued by the server for the next connection."""
+        if self.ticket_store is not None:
+            self.ticket_store.put((self.host, self.port), ticket)
+
+    def _connect_configuration(self) -> Tuple[QuicConfiguration, bool]:
+        """Configuration for a new connection, resuming a stored TLS session if any."""
+        configuration = self.configuration
+        if self.ticket_store is None:
+            return configuration, False
+        ticket = self.ticket_store.get((self.host, self.port))
+        if ticket is None:
+            return configuration, False
+        configuration = copy.copy(configuration)  # the ticket is per connection
+        if configuration.server_name is None:
+            try:
+                ipaddress.ip_address(self.host)
+            except ValueError:
+                configuration.server_name = self.host
+        configuration.session_ticket = ticket
+        early_data = ticket.max_early_data_size is not None and ticket.server_name == configuration.server_name
+        return configuration, early_data
+
     def connect(self) -> AsyncContextManager[MOQTSessionProtocol]:
-        """Return a context manager that creates MOQTSessionProtocol instance."""
+        """Return a context manager that creates MOQTSessionProtocol instance.
+
+        With a ticket_store holding a ticket for this origin the TLS session is
+        resumed and the session setup is sent as 0-RTT data, without waiting
+        for the handshake.
+        """
         logger.debug(f"MOQT: session connect: {self}")
         protocol = lambda *args, **kwargs: MOQTSessionProtocol(*args, **kwargs, session=self)
+        configuration, early_data = self._connect_configuration()
         return connect(
             self.host,
             self.port,
-            configuration=self.configuration,
-            create_protocol=protocol
+            configuration=configuration,
+            create_protocol=protocol,
+            session_ticket_handler=self.session_ticket_handler if self.ticket_store is not None else None,
+            wait_connected=not early_data,
         )
+
+
+PoolKey = Tuple[str, int, Optional[str]]  # (host, port, endpoint)
+
+
+class _PooledSession:
+    """A pooled client connection and its reference count."""
+    __slots__ = ('key', 'client', 'stack', 'protocol', 'ready', 'refs', 'idle_handle')
+
+    def __init__(self, key: PoolKey, client: MOQTClientSession):
+        self.key = key
+        self.client = client
+        self.stack = AsyncExitStack()
+        self.protocol: Optional[MOQTSessionProtocol] = None
+        self.ready: Optional[asyncio.Task] = None  # connect and session setup
+        self.refs = 0
+        self.idle_handle: Optional[asyncio.TimerHandle] = None
+
+    def usable(self) -> bool:
+        protocol = self.protocol
+        if protocol is None or protocol._close_err is not None:
+            return False
+        return not (protocol._moqt_session_closed.done() or protocol._closed.is_set())
+
+
+class MOQTClientPool:
+    """Client sessions shared by (host, port, endpoint).
+
+    acquire() returns an established MoQT session, connecting (QUIC, TLS,
+    WebTransport and MoQT setup) only if no live session exists for the key.
+    Concurrent acquires of a new key share a single connection attempt.
+    Sessions are reference counted: after the last release() a session stays
+    pooled for idle_timeout seconds before it is closed. A session found
+    closed (e.g. connection lost) is replaced on the next acquire, resuming
+    the TLS session with 0-RTT from the pool's ticket_store.
+
+    Pooled sessions are shared, so users should unsubscribe rather than
+    close() them:
+
+        async with MOQTClientPool() as pool:
+            async with pool.session('relay.example.com', 4433, 'moq') as session:
+                await session.subscribe('live/test', 'track', wait_response=True)
+    """
+    def __init__(
+        self,
+        configuration: Optional[QuicConfiguration] = None,
+        idle_timeout: float = 30.0,
+        setup_timeout: int = 10,
+        keylog_filename: Optional[str] = None,
+        debug: Optional[bool] = False,
+        raw_quic: Optional[bool] = False,
+        ticket_store: Optional[SessionTicketStore] = None,
+    ):
+        self.configuration = configuration
+        self.idle_timeout = idle_timeout
+        self.setup_timeout = setup_timeout
+        self.keylog_filename = keylog_filename
+        self.debug = debug
+        self.raw_quic = raw_quic
+        self.ticket_store = SessionTicketStore() if ticket_store is None else ticket_store
+        self.connects = 0  # connections established by the pool
+        self._entries: Dict[PoolKey, _PooledSession] = {}
+        self._protocols: Dict[MOQTSessionProtocol, _PooledSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def __aenter__(self) -> 'MOQTClientPool':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def acquire(self, host: str, port: int, endpoint: Optional[str] = None) -> MOQTSessionProtocol:
+        """Return an established session for (host, port, endpoint), connecting if needed."""
+        key = (host, port, endpoint)
+        entry = self._entries.get(key)
+        if entry is not None and entry.ready.done() and not entry.usable():
+            logger.info(f"MOQT pool: session closed, reconnecting: {key}")
+            await self._discard(entry)
+            entry = None
+        if entry is None:
+            client = MOQTClientSession(
+                host, port, endpoint=endpoint,
+                configuration=self.configuration,
+                keylog_filename=self.keylog_filename,
+                debug=self.debug,
+                raw_quic=self.raw_quic,
+                ticket_store=self.ticket_store,
+            )
+            entry = self._entries[key] = _PooledSession(key, client)
+            entry.ready = asyncio.get_running_loop().create_task(self._open(entry))
+
+        entry.refs += 1
+        if entry.idle_handle is not None:
+            entry.idle_handle.cancel()
+            entry.idle_handle = None
+        try:
+            return await asyncio.shield(entry.ready)
+        except BaseException:
+            entry.refs -= 1
+            raise
+
+    def release(self, protocol: MOQTSessionProtocol) -> None:
+        """Drop a reference taken by acquire(); idle sessions close after idle_timeout."""
+        entry = self._protocols.get(protocol)
+        if entry is None or entry.refs == 0:
+            return
+        entry.refs -= 1
+        if entry.refs > 0:
+            return
+        loop = asyncio.get_running_loop()
+        if not entry.usable() or self.idle_timeout <= 0:
+            loop.create_task(self._discard(entry))
+        else:
+            entry.idle_handle = loop.call_later(self.idle_timeout, self._expire, entry)
+
+    @asynccontextmanager
+    async def session(
+        self, host: str, port: int, endpoint: Optional[str] = None
+    ) -> AsyncIterator[MOQTSessionProtocol]:
+        """Context manager holding a pooled session reference."""
+        protocol = await self.acquire(host, port, endpoint)
+        try:
+            yield protocol
+        finally:
+            self.release(protocol)
+
+    async def close(self) -> None:
+        """Close all pooled sessions."""
+        for entry in list(self._entries.values()):
+            await self._discard(entry)
+
+    async def _open(self, entry: _PooledSession) -> MOQTSessionProtocol:
+        logger.info(f"MOQT pool: connecting: {entry.key}")
+        try:
+            protocol = await entry.stack.enter_async_context(entry.client.connect())
+            entry.protocol = protocol
+            await protocol.client_session_init(self.setup_timeout)
+        except BaseException:
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]  # next acquire retries
+            self._protocols.pop(entry.protocol, None)
+            await entry.stack.aclose()
+            raise
+        self._protocols[protocol] = entry
+        self.connects += 1
+        return protocol
+
+    def _expire(self, entry: _PooledSession) -> None:
+        entry.idle_handle = None
+        if entry.refs == 0:
+            logger.debug(f"MOQT pool: closing idle session: {entry.key}")
+            asyncio.get_running_loop().create_task(self._discard(entry))
+
+    async def _discard(self, entry: _PooledSession) -> None:
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+        if entry.idle_handle is not None:
+            entry.idle_handle.cancel()
+            entry.idle_handle = None
+        if not entry.ready.done():
+            entry.ready.cancel()
+            try:
+                await entry.ready
+            except BaseException:
+                pass
+            return
+        if entry.protocol is not None:
+            self._protocols.pop(entry.protocol, None)
+        await entry.stack.aclose()
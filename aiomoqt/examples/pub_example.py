@@ -86,6 +86,8 @@ async def generate_group_dgram(session: MOQTSessionProtocol, track_alias: int, p
     next_frame_time = time.monotonic()
     object_id = 0
     group_id = -1
+    # pre-encoded extensions, only the timestamp is updated per object
+    extensions = session.codec.extension_template()
     logger.debug(f"MOQT app: generating dgram group data: {track_alias}")
     try:
         while True:
@@ -106,15 +108,14 @@ async def generate_group_dgram(session: MOQTSessionProtocol, track_alias: int, p
                         }
                     )
 
-                    msg = obj.serialize()
+                    msg = obj.serialize(session.codec)
                     if session._close_err is not None:
                         logger.error(f"MOQT app: session closed with error: {session._close_err}")
                         raise MOQTException(*session._close_err)
                     logger.info(f"MOQT app: sending: ObjectDatagramStatus: id: {group_id-1}.{object_id} alias: {obj.track_alias} status: END_OF_GROUP")
                     if session._close_err is not None:
                         raise asyncio.CancelledError
-                    session._quic.send_datagram_frame(b'\0' + msg.data)
-                    session.transmit()
+                    session.send_dgram_message(msg)
                     
                 object_id = 0
                 # prepare I frame
@@ -126,7 +127,7 @@ async def generate_group_dgram(session: MOQTSessionProtocol, track_alias: int, p
                 payload = info + P_FRAME_PAD 
 
             # system local timestamp
-            extensions = {MOQT_TIMESTAMP_EXT: int(time.time()*1000)}
+            extensions[MOQT_TIMESTAMP_EXT] = int(time.time()*1000)
 
             payload = payload[:1100]    
             obj = ObjectDatagram(
@@ -140,14 +141,13 @@ async def generate_group_dgram(session: MOQTSessionProtocol, track_alias: int, p
             if obj is None:
                 logger.error(f"MOQT app: error: ObjectDatagram: constructor failed")
                 raise RuntimeError()
-            msg = obj.serialize()
+            msg = obj.serialize(session.codec)
             msg_len = len(msg.data)
 
             if session._close_err is not None:
                 raise asyncio.CancelledError
             logger.info(f"MOQT app: sending: ObjectDatagram: id: {group_id}.{object_id} size: {msg_len} bytes")
-            session._quic.send_datagram_frame(b'\0' + msg.data)
-            session.transmit()
+            session.send_dgram_message(msg)
             
             object_id += 1
             next_frame_time += FRAME_INTERVAL
@@ -163,17 +163,18 @@ async def generate_group_dgram(session: MOQTSessionProtocol, track_alias: int, p
 async def generate_subgroup_stream(session: MOQTSessionProtocol, subgroup_id: int, track_alias: int, priority: int):
     """Generate a stream of objects simulating video frames"""
     logger = get_logger(__name__)
-    if session._h3 is None:
+    if session._close_err is not None:
         return
-    stream_id = session._h3.create_webtransport_stream(
-        session_id=session._session_id, 
-        is_unidirectional=True
-    )
+    stream_id = await session.open_data_stream()
     logger.info(f"MOQT app: created data stream: group: 0 sub: {subgroup_id} stream: {stream_id}")
+    # spread I frames over the frame interval rather than bursting them into the stream
+    pacer = session.create_pacer(interval=FRAME_INTERVAL)
 
     next_frame_time = time.monotonic()
     object_id = 0
     group_id = -1
+    # pre-encoded extensions, only the timestamp is updated per object
+    extensions = session.codec.extension_template()
 
     try:
         while True:
@@ -190,18 +191,15 @@ async def generate_subgroup_stream(session: MOQTSessionProtocol, subgroup_id: in
                             MOQT_TIMESTAMP_EXT: int(time.time()*1000)
                         }
                     )
-                    msg = header.serialize()
+                    msg = header.serialize(session.codec)
                     logger.debug(f"MOQT app: sending object status: {header} Ox{msg.data.hex()}")
-                    if session._close_err or session._h3 is None or session._quic._close_pending:
+                    if session._close_err or session._quic._close_pending:
                         raise asyncio.CancelledError
                     logger.info(f"MOQT app: sending: ObjectHeader END_OF_GROUP: id: {group_id-1}.{subgroup_id}.{object_id} {msg.tell()} bytes")
                     session._quic.send_stream_data(stream_id, msg.data, end_stream=True)
                     session.transmit()
                     # create next group data stream
-                    stream_id = session._h3.create_webtransport_stream(
-                        session_id=session._session_id,
-                        is_unidirectional=True
-                    )
+                    stream_id = await session.open_data_stream()  # waits if the peer stream limit is reached
 
                 object_id = 0                    
                 logger.debug(f"MOQT app: starting new group: id: {group_id}.{subgroup_id}.{object_id} stream: {stream_id}")
@@ -227,20 +225,19 @@ async def generate_subgroup_stream(session: MOQTSessionProtocol, subgroup_id: in
                 info = f"| {group_id}.{subgroup_id}.{object_id} |".encode()
                 payload = info + P_FRAME_PAD    
                 
-            extensions = {MOQT_TIMESTAMP_EXT: int(time.time()*1000)}
+            extensions[MOQT_TIMESTAMP_EXT] = int(time.time()*1000)
                 
             obj = ObjectHeader(
                 object_id=object_id,
                     payload=payload,
                     extensions=extensions
             )                
-            msg = obj.serialize()
+            msg = obj.serialize(session.codec)
             if session._close_err is not None:
                 raise asyncio.CancelledError
             logger.debug(f"MOQT app: sending ObjectHeader: data: 0x{msg.data_slice(0,16).hex()}...")
             logger.info(f"MOQT app: sending ObjectHeader: id: {group_id}.{subgroup_id}.{object_id} size: {msg.tell()} bytes")
-            session._quic.send_stream_data(stream_id, msg.data, end_stream=False)
-            session.transmit()
+            await pacer.write(stream_id, msg.data)
             
             object_id += 1
             next_frame_time += FRAME_INTERVAL
@@ -248,7 +245,7 @@ async def generate_subgroup_stream(session: MOQTSessionProtocol, subgroup_id: in
             sleep_time = 0 if sleep_time < 0 else sleep_time
             await asyncio.sleep(sleep_time)
 
-    except asyncio.CancelledError:
+    except (asyncio.CancelledError, MOQTException):
         logger.warning(f"MOQT app: stream generation cancelled")
         pass
 
@@ -261,6 +258,7 @@ def parse_args():
     parser.add_argument('--endpoint', type=str, default='moq', help='MOQT WT endpoint')
     parser.add_argument('--datagram', action='store_true', help='Emit ObjectDatagrams')
     parser.add_argument('--keylogfile', type=str, default=None, help='TLS secrets file')
+    parser.add_argument('--raw-quic', action='store_true', help='Raw QUIC session (ALPN moq-00), no WebTransport')
     parser.add_argument('--debug', action='store_true',
                         help='Enable debug output')
     return parser.parse_args()
@@ -276,6 +274,7 @@ async def main(host: str, port: int, endpoint: str, namespace: str, trackname: s
         port,
         endpoint=endpoint,
         keylog_filename=args.keylogfile,
+        raw_quic=args.raw_quic,
         debug=debug
     )
     logger.info(f"MOQT app: publish session connecting: {client}")
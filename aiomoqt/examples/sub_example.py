@@ -20,6 +20,7 @@ def parse_args():
     parser.add_argument('--endpoint', type=str, default="moq", help='MOQT WT endpoint')
     parser.add_argument('--debug', action='store_true', help='Enable debug output')
     parser.add_argument('--keylogfile', type=str, default=None, help='TLS secrets file')
+    parser.add_argument('--raw-quic', action='store_true', help='Raw QUIC session (ALPN moq-00), no WebTransport')
     return parser.parse_args()
 
 
@@ -33,6 +34,7 @@ async def main(host: str, port: int, endpoint: str, namespace: str, track_name:
         port,
         endpoint=endpoint,
         keylog_filename=args.keylogfile,
+        raw_quic=args.raw_quic,
         debug=debug
     )
     logger.info(f"MOQT app: subscribe session connecting: {client}")
@@ -7,7 +7,8 @@ from .fetch import *
 from .track import *
 
 __all__ = [
-    'MOQTMessage', 'MOQTMessageType', 'MOQTUnderflow', 'BUF_SIZE',
+    'MOQTMessage', 'MOQTMessageType', 'MOQTUnderflow', 'BUF_SIZE', 'EMPTY_EXTENSIONS',
+    'ExtensionTemplate', 'MOQTCodec', 'DEFAULT_CODEC', 'get_codec',
     'ClientSetup', 'ServerSetup', 'GoAway',
     'Subscribe', 'SubscribeOk', 'SubscribeError', 'SubscribeUpdate',
     'Unsubscribe', 'SubscribeDone', 'MaxSubscribeId', 'SubscribesBlocked',
@@ -18,4 +19,5 @@ __all__ = [
     'Fetch', 'FetchObject', 'FetchOk', 'FetchError', 'FetchCancel',
     'SubgroupHeader', 'FetchHeader',
     'ObjectDatagram', 'ObjectDatagramStatus', 'ObjectHeader',
+    'ObjectEntry', 'SharedSubgroup', 'SharedObject',
 ]
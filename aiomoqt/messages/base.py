@@ -1,11 +1,14 @@
-from typing import Any, Union, Dict
+from typing import Any, Union, Dict, Mapping, ClassVar, Optional
 from dataclasses import dataclass, fields
 
 from aioquic.buffer import Buffer
 
 from . import ParamType, SetupParamType
+from .codec import (
+    EMPTY_EXTENSIONS, ExtensionTemplate, MOQTCodec, DEFAULT_CODEC, get_codec,
+    _extensions_push, _extensions_size,
+)
 from ..utils.logger import *
-from ..context import get_moqt_ctx_version, get_major_version
 
 logger = get_logger(__name__)
 
@@ -18,85 +21,28 @@ class MOQTUnderflow(Exception):
         self.needed = needed
 
 
-@dataclass
+@dataclass(slots=True)
 class MOQTMessage:
     """Base class for all MOQT messages."""
-    # type: Optional[int] = None - let subclass set it - annoying warnings
+    type: ClassVar[Optional[int]] = None  # message/stream type - set by subclass
 
+    # extension coding for the current version (DEFAULT_CODEC), kept for callers without a session codec
     @staticmethod
-    def _extensions_encode(buf: Buffer, exts: Dict) -> None:
-        vers = get_moqt_ctx_version()
-        major_version = get_major_version(vers)
-        # logger.debug(f"MOQTMessage._extensions_encode(): {vers} maj: {major_version}")
-        if exts is None or len(exts) == 0:
-            buf.push_uint_var(0)
-            return
-        
-        if major_version > 8:
-            pos = buf.tell()
-            payload = Buffer(capacity=BUF_SIZE)
-            for ext_id, ext_value in exts.items():
-                payload.push_uint_var(ext_id)
-                if ext_id % 2 == 0:  # even extension types are simple var int
-                    payload.push_uint_var(ext_value)
-                else:
-                    if isinstance(ext_value, str):
-                        ext_value = ext_value.encode()
-                    assert isinstance(ext_value, bytes)
-                    payload.push_uint_var(len(ext_value))
-                    payload.push_bytes(ext_value)
-
-            exts_len = payload.tell()
-            buf.push_uint_var(exts_len)
-            buf.push_bytes(payload.data)
-        else:
-            buf.push_uint_var(len(exts))
-            for ext_id, ext_value in exts.items():
-                buf.push_uint_var(ext_id)
-                if ext_id % 2 == 0:
-                    buf.push_uint_var(ext_value)
-                else:
-                    if isinstance(ext_value, str):
-                        ext_value = ext_value.encode()
-                    assert isinstance(ext_value, bytes)
-                    buf.push_uint_var(len(ext_value))
-                    buf.push_bytes(ext_value)
+    def _extensions_push(buf: Buffer, exts: Mapping) -> None:
+        _extensions_push(buf, exts)
 
+    @staticmethod
+    def _extensions_size(exts: Mapping) -> int:
+        return _extensions_size(exts)
 
     @staticmethod
-    def _extensions_decode(buf: Buffer) -> Dict[int, Union[int, bytes]]:
-        exts = {}
-        vers = get_moqt_ctx_version()
-        major_version = get_major_version(vers)
-        # logger.debug(f"MOQTMessage._extensions_decode(): {vers} maj: {major_version}")
-        if major_version > 8:
-            exts_len = buf.pull_uint_var()
-            if exts_len > 0:
-                pos = buf.tell()
-                exts_end = pos + exts_len
-                while buf.tell() < exts_end:
-                    ext_id = buf.pull_uint_var()
-                    if ext_id % 2 == 0:  # even extension types are simple var int
-                        ext_value = buf.pull_uint_var()
-                    else:
-                        value_len = buf.pull_uint_var()
-                        ext_value = buf.pull_bytes(value_len)
-                    exts[ext_id] = ext_value
-                assert buf.tell() == exts_end, f"Payload length mismatch: {exts_len} {buf.tell()-pos}"
-        else:
-            exts_len = buf.pull_uint_var()
-            if exts_len > 0:
-                for _ in range(exts_len):
-                    ext_id = buf.pull_uint_var()
-                    if ext_id % 2 == 0:  # even extension types are simple var int
-                        ext_value = buf.pull_uint_var()
-                    else:
-                        value_len = buf.pull_uint_var()
-                        ext_value = buf.pull_bytes(value_len)
-                    exts[ext_id] = ext_value
+    def _extensions_encode(buf: Buffer, exts: Mapping) -> None:
+        DEFAULT_CODEC.extensions_encode(buf, exts)
+
+    @staticmethod
+    def _extensions_decode(buf: Buffer) -> Mapping[int, Union[int, bytes]]:
+        return DEFAULT_CODEC.extensions_decode(buf)
 
-        return exts
-          
     @staticmethod
     def _bytes_encode(value: Any) -> bytes:
         if isinstance(value, int):
@@ -142,7 +88,7 @@ class MOQTMessage:
                 # Decode parameter types and values
                 items = []
                 enum = SetupParamType if class_name(self).endswith('Setup') else ParamType
-                for k, v in value.items():
+                for k, v in (value or {}).items():
                     param_name = enum(k).name  # Convert enum value to name
                     if isinstance(v, int):
                         items.append(f"{param_name}={v}")
@@ -0,0 +1,254 @@
+import struct
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Union
+
+from aioquic.buffer import Buffer
+
+from ..types import MOQT_CUR_VERSION, MOQT_TIMESTAMP_EXT
+from ..context import get_major_version
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _EmptyExtensions(Mapping):
+    """Immutable empty extensions mapping shared by all objects without extensions."""
+    __slots__ = ()
+
+    def __getitem__(self, key: int) -> Any:
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+    def __hash__(self) -> int:
+        return 0
+
+    def __repr__(self) -> str:
+        return "{}"
+
+
+EMPTY_EXTENSIONS = _EmptyExtensions()
+
+_VARINT_8_BYTE = 0xC000000000000000  # 2-bit length prefix of an 8 byte varint
+_VARINT_MAX = (1 << 62) - 1
+
+
+def _extensions_push(buf: Buffer, exts: Mapping) -> None:
+    """Push extension (id, value) entries without the length/count prefix."""
+    for ext_id, ext_value in exts.items():
+        buf.push_uint_var(ext_id)
+        if ext_id % 2 == 0:  # even extension types are simple var int
+            buf.push_uint_var(ext_value)
+        else:
+            if isinstance(ext_value, str):
+                ext_value = ext_value.encode()
+            assert isinstance(ext_value, bytes)
+            buf.push_uint_var(len(ext_value))
+            buf.push_bytes(ext_value)
+
+
+def _extensions_size(exts: Mapping) -> int:
+    """Upper bound of the encoded extensions size."""
+    if exts.__class__ is ExtensionTemplate:
+        return len(exts.data)
+    if not exts:
+        return 1
+    return 8 + sum(16 + (len(v) * 4 if isinstance(v, (bytes, str)) else 0) for v in exts.values())
+
+
+class ExtensionTemplate(Mapping):
+    """Pre-encoded object extension headers with in-place updated values.
+
+    Static extensions are encoded once at construction. Variable extensions
+    (even, varint valued types such as MOQT_TIMESTAMP_EXT) are encoded as fixed
+    8 byte varints and patched in place on assignment, so encoding an object's
+    extensions is a single bytes copy. Use it as the `extensions` of an
+    ObjectHeader, FetchObject, ObjectDatagram or ObjectDatagramStatus:
+
+        exts = session.codec.extension_template({0x25: b'static'})
+        exts[MOQT_TIMESTAMP_EXT] = int(time.time() * 1000)
+        msg = ObjectHeader(object_id=0, extensions=exts, payload=data).serialize(session.codec)
+
+    The encoding follows `version` (default: MOQT_CUR_VERSION). Encoding
+    with a codec of a different major version falls back to the generic path.
+    """
+    __slots__ = ('version', 'length_prefixed', '_values', '_offsets', '_buf', '_data')
+
+    def __init__(
+        self,
+        static: Optional[Mapping[int, Union[bytes, str, int]]] = None,
+        variable: Iterable[int] = (MOQT_TIMESTAMP_EXT,),
+        version: int = MOQT_CUR_VERSION,
+    ):
+        self.version = version
+        self.length_prefixed = get_major_version(self.version) > 8
+        values = dict(static or {})
+        variable = tuple(variable)
+        for ext_id in variable:
+            if ext_id % 2 != 0:
+                raise ValueError(f"variable extension 0x{ext_id:x} must be an even (varint) type")
+            if ext_id in values:
+                raise ValueError(f"extension 0x{ext_id:x} is both static and variable")
+
+        capacity = 16 * (len(values) + len(variable) + 1)
+        capacity += sum(len(v) * 4 for v in values.values() if isinstance(v, (bytes, str)))
+        entries = Buffer(capacity=capacity)
+        _extensions_push(entries, values)
+        offsets = {}
+        for ext_id in variable:
+            entries.push_uint_var(ext_id)
+            offsets[ext_id] = entries.tell()
+            entries.push_uint64(_VARINT_8_BYTE)  # value 0 until set
+            values[ext_id] = 0
+
+        header = Buffer(capacity=8)
+        if self.length_prefixed:
+            header.push_uint_var(entries.tell())
+        else:
+            header.push_uint_var(len(values))
+        shift = header.tell()
+
+        self._values = values
+        self._offsets = {ext_id: offset + shift for ext_id, offset in offsets.items()}
+        self._buf = bytearray(header.data + entries.data)
+        self._data = None
+
+    def __getitem__(self, ext_id: int) -> Union[bytes, int]:
+        return self._values[ext_id]
+
+    def __setitem__(self, ext_id: int, value: int) -> None:
+        """Update a variable extension value in place."""
+        offset = self._offsets.get(ext_id)
+        if offset is None:
+            raise KeyError(f"0x{ext_id:x} is not a variable extension of this template")
+        if not 0 <= value <= _VARINT_MAX:
+            raise ValueError(f"extension value out of varint range: {value}")
+        struct.pack_into('!Q', self._buf, offset, _VARINT_8_BYTE | value)
+        self._values[ext_id] = value
+        self._data = None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"ExtensionTemplate({self._values})"
+
+    @property
+    def data(self) -> bytes:
+        """Encoded extensions, including the length (or count) prefix."""
+        data = self._data
+        if data is None:
+            data = self._data = bytes(self._buf)
+        return data
+
+    def encode(self, buf: Buffer) -> None:
+        buf.push_bytes(self.data)
+
+
+def _extensions_encode_length(buf: Buffer, exts: Mapping) -> None:
+    """Draft-09+ extensions: byte length prefixed."""
+    if exts.__class__ is ExtensionTemplate and exts.length_prefixed:
+        buf.push_bytes(exts.data)
+        return
+    if not exts:
+        buf.push_uint_var(0)
+        return
+    payload = Buffer(capacity=_extensions_size(exts))
+    _extensions_push(payload, exts)
+    buf.push_uint_var(payload.tell())
+    buf.push_bytes(payload.data)
+
+
+def _extensions_encode_count(buf: Buffer, exts: Mapping) -> None:
+    """Draft-08 extensions: count prefixed."""
+    if exts.__class__ is ExtensionTemplate and not exts.length_prefixed:
+        buf.push_bytes(exts.data)
+        return
+    buf.push_uint_var(len(exts))
+    if exts:
+        _extensions_push(buf, exts)
+
+
+def _extensions_decode_length(buf: Buffer) -> Mapping[int, Union[int, bytes]]:
+    exts_len = buf.pull_uint_var()
+    if exts_len == 0:
+        return EMPTY_EXTENSIONS
+    exts = {}
+    pos = buf.tell()
+    exts_end = pos + exts_len
+    while buf.tell() < exts_end:
+        ext_id = buf.pull_uint_var()
+        if ext_id % 2 == 0:  # even extension types are simple var int
+            exts[ext_id] = buf.pull_uint_var()
+        else:
+            exts[ext_id] = buf.pull_bytes(buf.pull_uint_var())
+    assert buf.tell() == exts_end, f"Payload length mismatch: {exts_len} {buf.tell()-pos}"
+    return exts
+
+
+def _extensions_decode_count(buf: Buffer) -> Mapping[int, Union[int, bytes]]:
+    exts_count = buf.pull_uint_var()
+    if exts_count == 0:
+        return EMPTY_EXTENSIONS
+    exts = {}
+    for _ in range(exts_count):
+        ext_id = buf.pull_uint_var()
+        if ext_id % 2 == 0:  # even extension types are simple var int
+            exts[ext_id] = buf.pull_uint_var()
+        else:
+            exts[ext_id] = buf.pull_bytes(buf.pull_uint_var())
+    return exts
+
+
+class MOQTCodec:
+    """Version specific wire encoding bound once per session.
+
+    Holds the negotiated MoQT version with the matching extension encode and
+    decode functions pre-selected, so object serialization does no per-object
+    version lookup. Codecs are immutable and shared: use get_codec(version).
+    """
+    __slots__ = ('version', 'major_version', 'extensions_encode', 'extensions_decode')
+
+    def __init__(self, version: int = MOQT_CUR_VERSION):
+        self.version = version
+        self.major_version = get_major_version(version)
+        self.extensions_encode: Callable[[Buffer, Mapping], None]
+        self.extensions_decode: Callable[[Buffer], Mapping[int, Union[int, bytes]]]
+        if self.major_version > 8:
+            self.extensions_encode = _extensions_encode_length
+            self.extensions_decode = _extensions_decode_length
+        else:
+            self.extensions_encode = _extensions_encode_count
+            self.extensions_decode = _extensions_decode_count
+
+    def extension_template(
+        self,
+        static: Optional[Mapping[int, Union[bytes, str, int]]] = None,
+        variable: Iterable[int] = (MOQT_TIMESTAMP_EXT,),
+    ) -> ExtensionTemplate:
+        """Create an ExtensionTemplate encoded for this codec's version."""
+        return ExtensionTemplate(static, variable, version=self.version)
+
+    def __repr__(self) -> str:
+        return f"MOQTCodec(version=0x{self.version:x})"
+
+
+_codecs: Dict[int, MOQTCodec] = {}
+
+
+def get_codec(version: int = MOQT_CUR_VERSION) -> MOQTCodec:
+    """Shared codec for a MoQT version."""
+    codec = _codecs.get(version)
+    if codec is None:
+        codec = _codecs[version] = MOQTCodec(version)
+    return codec
+
+
+# codec of serialize()/deserialize() calls made without one, outside a session
+DEFAULT_CODEC = get_codec(MOQT_CUR_VERSION)
@@ -0,0 +1,310 @@
+import dataclasses
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from aioquic.buffer import Buffer, BufferWriteError
+
+from ..types import SetupParamType
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FieldKind(IntEnum):
+    """Wire encodings for message schema fields."""
+    VARINT = 0        # QUIC variable length integer
+    UINT8 = 1         # single byte
+    BYTES = 2         # varint length + bytes
+    STRING = 3        # varint length + utf-8 bytes, decoded to str
+    TUPLE = 4         # varint count + (varint length + bytes) per element
+    PARAMS = 5        # varint count + (varint id, varint length, value) per parameter
+    SETUP_PARAMS = 6  # PARAMS with MAX_SUBSCRIBER_ID decoded to int
+    VARINTS = 7       # varint count + varint per element
+
+
+class Framing(IntEnum):
+    """Message framing written ahead of the schema fields."""
+    NONE = 0          # fields only
+    TYPE = 1          # type varint (data stream headers)
+    CONTROL = 2       # type varint + payload length varint (control messages)
+
+
+class SchemaField:
+    """Description of one wire field of a MoQT message.
+
+    `when` makes the field conditional on an earlier field: (field_name, values).
+    `default` is encoded in place of None, `enum` wraps the decoded value.
+    """
+    __slots__ = ('name', 'kind', 'when', 'default', 'enum')
+
+    def __init__(
+        self,
+        name: str,
+        kind: FieldKind,
+        when: Optional[Tuple[str, Iterable[int]]] = None,
+        default: Optional[int] = None,
+        enum: Optional[Type[IntEnum]] = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.when = None if when is None else (when[0], frozenset(int(v) for v in when[1]))
+        self.default = default
+        self.enum = enum
+
+    def __repr__(self) -> str:
+        return f"SchemaField({self.name}, {self.kind.name})"
+
+
+# payload capacity allotted beyond the fixed size fields before falling back to an exact size
+SCHEMA_BUF_SLACK = 1024
+
+
+def _varint_bytes(value: int) -> bytes:
+    buf = Buffer(capacity=8)
+    buf.push_uint_var(value)
+    return buf.data
+
+
+def _param_value(value: Any) -> bytes:
+    """Encode a parameter value: ints as varint, str as utf-8."""
+    if isinstance(value, int):
+        return _varint_bytes(value)
+    if isinstance(value, str):
+        return value.encode()
+    return bytes(value)
+
+
+def _setup_params_fixup(params: Dict[int, Any]) -> Dict[int, Any]:
+    value = params.get(SetupParamType.MAX_SUBSCRIBER_ID)
+    if value is not None:
+        params[SetupParamType.MAX_SUBSCRIBER_ID] = Buffer(data=value).pull_uint_var()
+    return params
+
+
+def _payload_size(schema: Tuple[SchemaField, ...], msg: Any) -> int:
+    """Upper bound of the encoded payload size, used when the fast path buffer overflows."""
+    size = 0
+    for f in schema:
+        if f.when is not None and getattr(msg, f.when[0]) not in f.when[1]:
+            continue
+        value = getattr(msg, f.name)
+        if f.kind in (FieldKind.VARINT, FieldKind.UINT8):
+            size += 8
+        elif f.kind in (FieldKind.BYTES, FieldKind.STRING):
+            size += 8 + len(value.encode() if isinstance(value, str) else (value or b''))
+        elif f.kind == FieldKind.TUPLE:
+            size += 8 + sum(8 + len(part) for part in value)
+        elif f.kind in (FieldKind.PARAMS, FieldKind.SETUP_PARAMS):
+            size += 8 + sum(16 + len(_param_value(v)) for v in (value or {}).values())
+        elif f.kind == FieldKind.VARINTS:
+            size += 8 + 8 * len(value)
+    return size
+
+
+def _when_test(f: SchemaField, prefix: str = "") -> str:
+    """Condition on literal values, folded into constants by the compiler."""
+    values = sorted(f.when[1])
+    if len(values) == 1:
+        return f"{prefix}{f.when[0]} == {values[0]}"
+    return f"{prefix}{f.when[0]} in {tuple(values)!r}"
+
+
+def _gen_encode(schema: Tuple[SchemaField, ...]) -> Tuple[List[str], int]:
+    """Generate _encode(self, payload) writing the schema fields, returns (lines, fixed size)."""
+    lines = ["def _encode(self, payload):"]
+    fixed = 0
+    when = None
+    for f in schema:
+        indent = "    "
+        if f.when is not None:
+            if f.when != when:
+                lines.append(f"    if {_when_test(f, 'self.')}:")
+            indent = "        "
+        when = f.when
+        value = f"self.{f.name}"
+        if f.kind == FieldKind.VARINT:
+            fixed += 8
+            if f.default is not None:
+                lines.append(f"{indent}value = {value}")
+                value = f"{f.default} if value is None else value"
+            lines.append(f"{indent}payload.push_uint_var({value})")
+        elif f.kind == FieldKind.UINT8:
+            fixed += 1
+            lines.append(f"{indent}payload.push_uint8({value})")
+        elif f.kind in (FieldKind.BYTES, FieldKind.STRING):
+            fixed += 8
+            lines.append(f"{indent}value = {value}")
+            if f.kind == FieldKind.STRING:
+                lines.append(f"{indent}value = value.encode() if value else b''")
+            else:
+                lines.append(f"{indent}if value.__class__ is str: value = value.encode()")
+            lines.append(f"{indent}payload.push_uint_var(len(value))")
+            lines.append(f"{indent}payload.push_bytes(value)")
+        elif f.kind == FieldKind.TUPLE:
+            fixed += 8
+            lines.append(f"{indent}value = {value}")
+            lines.append(f"{indent}payload.push_uint_var(len(value))")
+            lines.append(f"{indent}for part in value:")
+            lines.append(f"{indent}    payload.push_uint_var(len(part))")
+            lines.append(f"{indent}    payload.push_bytes(part)")
+        elif f.kind in (FieldKind.PARAMS, FieldKind.SETUP_PARAMS):
+            fixed += 8
+            lines.append(f"{indent}value = {value}")
+            lines.append(f"{indent}if value:")
+            lines.append(f"{indent}    payload.push_uint_var(len(value))")
+            lines.append(f"{indent}    for param_id, param in value.items():")
+            lines.append(f"{indent}        if param.__class__ is not bytes: param = _param_value(param)")
+            lines.append(f"{indent}        payload.push_uint_var(param_id)")
+            lines.append(f"{indent}        payload.push_uint_var(len(param))")
+            lines.append(f"{indent}        payload.push_bytes(param)")
+            lines.append(f"{indent}else:")
+            lines.append(f"{indent}    payload.push_uint_var(0)")
+        elif f.kind == FieldKind.VARINTS:
+            fixed += 8
+            lines.append(f"{indent}value = {value}")
+            lines.append(f"{indent}payload.push_uint_var(len(value))")
+            lines.append(f"{indent}for item in value:")
+            lines.append(f"{indent}    payload.push_uint_var(item)")
+        else:
+            raise ValueError(f"unknown field kind: {f.kind}")
+    lines.append("    return payload")
+    return lines, fixed
+
+
+def _gen_serialize(framing: Framing, type_id: Optional[int], capacity: int) -> List[str]:
+    lines = ["def serialize(self):"]
+    if framing == Framing.TYPE:
+        # no length prefix, so the type is written in place ahead of the fields
+        lines += [
+            f"    payload = Buffer(capacity={capacity + 8})",
+            f"    payload.push_uint_var({int(type_id)})",
+            "    try:",
+            "        return _encode(self, payload)",
+            "    except BufferWriteError:",
+            "        payload = Buffer(capacity=_payload_size(_schema, self) + 8)",
+            f"        payload.push_uint_var({int(type_id)})",
+            "        return _encode(self, payload)",
+        ]
+        return lines
+    lines += [
+        "    try:",
+        f"        payload = _encode(self, Buffer(capacity={capacity}))",
+        "    except BufferWriteError:",
+        "        payload = _encode(self, Buffer(capacity=_payload_size(_schema, self)))",
+    ]
+    if framing == Framing.CONTROL:
+        lines += [
+            "    size = payload.tell()",
+            "    buf = Buffer(capacity=size + 16)",
+            f"    buf.push_uint_var({int(type_id)})",
+            "    buf.push_uint_var(size)",
+            "    buf.push_bytes(payload.data)",
+            "    return buf",
+        ]
+    else:
+        lines.append("    return payload")
+    return lines
+
+
+def _gen_deserialize(cls: type, schema: Tuple[SchemaField, ...], env: Dict[str, Any]) -> List[str]:
+    lines = ["def deserialize(cls, buf):"]
+    # conditional fields default to None, assigned ahead of their condition block
+    lines += [f"    {f.name} = None" for f in schema if f.when is not None]
+    when = None
+    for i, f in enumerate(schema):
+        indent = "    "
+        if f.when is not None:
+            if f.when != when:
+                lines.append(f"    if {_when_test(f)}:")
+            indent = "        "
+        when = f.when
+        name = f.name
+        if f.kind == FieldKind.VARINT:
+            value = "buf.pull_uint_var()"
+        elif f.kind == FieldKind.UINT8:
+            value = "buf.pull_uint8()"
+        elif f.kind == FieldKind.BYTES:
+            value = "buf.pull_bytes(buf.pull_uint_var())"
+        elif f.kind == FieldKind.STRING:
+            value = "buf.pull_bytes(buf.pull_uint_var()).decode()"
+        elif f.kind == FieldKind.TUPLE:
+            lines.append(f"{indent}{name} = []")
+            lines.append(f"{indent}for _ in range(buf.pull_uint_var()):")
+            lines.append(f"{indent}    {name}.append(buf.pull_bytes(buf.pull_uint_var()))")
+            value = f"tuple({name})"
+        elif f.kind in (FieldKind.PARAMS, FieldKind.SETUP_PARAMS):
+            lines.append(f"{indent}{name} = {{}}")
+            lines.append(f"{indent}for _ in range(buf.pull_uint_var()):")
+            lines.append(f"{indent}    param_id = buf.pull_uint_var()")
+            lines.append(f"{indent}    {name}[param_id] = buf.pull_bytes(buf.pull_uint_var())")
+            if f.kind == FieldKind.PARAMS:
+                continue
+            value = f"_setup_params_fixup({name})"
+        elif f.kind == FieldKind.VARINTS:
+            lines.append(f"{indent}{name} = []")
+            lines.append(f"{indent}for _ in range(buf.pull_uint_var()):")
+            lines.append(f"{indent}    {name}.append(buf.pull_uint_var())")
+            continue
+        else:
+            raise ValueError(f"unknown field kind: {f.kind}")
+        if f.enum is not None:
+            env[f"_enum_{i}"] = f.enum
+            value = f"_enum_{i}({value})"
+        lines.append(f"{indent}{name} = {value}")
+
+    # positional arguments while the schema covers the leading dataclass fields
+    names = {f.name for f in schema}
+    args = []
+    keywords = False
+    for field in dataclasses.fields(cls):
+        if field.name not in names:
+            keywords = True
+        else:
+            args.append(f"{field.name}={field.name}" if keywords else field.name)
+    lines.append(f"    return cls({', '.join(args)})")
+    return lines
+
+
+def message_schema(*schema: SchemaField, framing: Framing = Framing.CONTROL) -> Callable[[type], type]:
+    """Class decorator generating specialized serialize()/deserialize() from a wire schema.
+
+    The functions are generated once at import with the field layout unrolled.
+    Payloads are written into a fixed size buffer, retrying with the exact size
+    for oversized messages. serialize() returns a Buffer positioned
+    at the end of the message; deserialize() expects any framing (type and
+    length) to have already been pulled from the buffer.
+    """
+    def wrap(cls: type) -> type:
+        names = {f.name for f in schema}
+        for f in schema:
+            if f.when is not None and f.when[0] not in names:
+                raise ValueError(f"{cls.__name__}.{f.name}: unknown condition field {f.when[0]}")
+        env = {
+            'Buffer': Buffer,
+            'BufferWriteError': BufferWriteError,
+            '_schema': schema,
+            '_param_value': _param_value,
+            '_payload_size': _payload_size,
+            '_setup_params_fixup': _setup_params_fixup,
+        }
+        encode, fixed = _gen_encode(schema)
+        source = "\n".join(encode + [""]
+                           + _gen_serialize(framing, cls.type, fixed + SCHEMA_BUF_SLACK) + [""]
+                           + _gen_deserialize(cls, schema, env))
+        code = compile(source, f"<{cls.__name__} codec>", "exec")
+        exec(code, env)
+
+        serialize = env['serialize']
+        serialize.__qualname__ = f"{cls.__qualname__}.serialize"
+        serialize.__doc__ = f"Serialize {cls.__name__} (generated from schema)."
+        deserialize = env['deserialize']
+        deserialize.__qualname__ = f"{cls.__qualname__}.deserialize"
+        deserialize.__doc__ = f"Deserialize {cls.__name__} (generated from schema)."
+
+        cls.serialize = serialize
+        cls.deserialize = classmethod(deserialize)
+        cls._schema = schema
+        cls._codec_source = source
+        return cls
+
+    return wrap
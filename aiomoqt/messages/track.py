@@ -1,10 +1,12 @@
 from dataclasses import dataclass
-from typing import Optional, Dict, Tuple, Union
+from typing import Optional, Dict, Iterable, List, Mapping, Tuple, Union
 
-from aioquic.buffer import Buffer, BufferReadError
+from aioquic.buffer import Buffer, BufferReadError, encode_uint_var
 
 from . import MOQTUnderflow, MOQTMessage, ObjectStatus, DataStreamType, DatagramType, MOQT_DEFAULT_PRIORITY, BUF_SIZE
-from ..utils.logger import get_logger
+from .codec import EMPTY_EXTENSIONS, MOQTCodec, DEFAULT_CODEC, _extensions_size
+from .schema import FieldKind, Framing, SchemaField, message_schema
+from ..utils.logger import get_logger, class_name
 
 logger = get_logger(__name__)
 
@@ -60,7 +62,14 @@ class Subgroup:
         self.objects[obj.object_id] = obj
 
 
-@dataclass
+@message_schema(
+    SchemaField('track_alias', FieldKind.VARINT),
+    SchemaField('group_id', FieldKind.VARINT),
+    SchemaField('subgroup_id', FieldKind.VARINT),
+    SchemaField('publisher_priority', FieldKind.UINT8),
+    framing=Framing.TYPE,
+)
+@dataclass(slots=True)
 class SubgroupHeader(MOQTMessage):
     """MOQT subgroup stream header."""
     track_alias: int
@@ -68,51 +77,29 @@ class SubgroupHeader(MOQTMessage):
     subgroup_id: int
     publisher_priority: int = MOQT_DEFAULT_PRIORITY
     
-    def __post_init__(self):
-        self.type = DataStreamType.SUBGROUP_HEADER
+    type = DataStreamType.SUBGROUP_HEADER
 
-    def serialize(self) -> Buffer:
-        buf = Buffer(capacity=BUF_SIZE)
-        buf.push_uint_var(DataStreamType.SUBGROUP_HEADER)   
-        buf.push_uint_var(self.track_alias)
-        buf.push_uint_var(self.group_id)
-        buf.push_uint_var(self.subgroup_id)
-        buf.push_uint8(self.publisher_priority)
 
-        return buf
+# (object_id, payload, extensions) of an object in a batch write, extensions may be None
+ObjectEntry = Tuple[int, bytes, Optional[Mapping[int, Union[bytes, int]]]]
 
-    @classmethod
-    def deserialize(cls, buf: Buffer) -> 'SubgroupHeader':
-        """MOQT subgroup stream header."""
-        track_alias = buf.pull_uint_var()
-        group_id = buf.pull_uint_var()
-        subgroup_id = buf.pull_uint_var()
-        publisher_priority = buf.pull_uint8()
 
-        return cls(
-            track_alias=track_alias,
-            group_id=group_id,
-            subgroup_id=subgroup_id,
-            publisher_priority=publisher_priority
-        )
-
-
-@dataclass
+@dataclass(slots=True)
 class ObjectHeader(MOQTMessage):
     """MOQT object header."""
     object_id: int
-    extensions: Optional[Dict[int, Union[bytes, int]]] = None
+    extensions: Mapping[int, Union[bytes, int]] = EMPTY_EXTENSIONS
     status: Optional[ObjectStatus] = ObjectStatus.NORMAL
     payload: bytes = b''
 
-    def serialize(self) -> Buffer:
+    def serialize(self, codec: Optional[MOQTCodec] = None) -> Buffer:
         """Serialize for stream transmission."""
         payload_len = len(self.payload)
-        buf = Buffer(capacity=(BUF_SIZE + payload_len))
+        buf = Buffer(capacity=(BUF_SIZE + payload_len + _extensions_size(self.extensions)))
 
         buf.push_uint_var(self.object_id)
 
-        MOQTMessage._extensions_encode(buf, self.extensions)
+        (codec or DEFAULT_CODEC).extensions_encode(buf, self.extensions)
 
         if self.status == ObjectStatus.NORMAL and self.payload:
             buf.push_uint_var(payload_len)
@@ -122,14 +109,32 @@ class ObjectHeader(MOQTMessage):
             buf.push_uint_var(self.status)  # Status code
 
         return buf
+
+    @staticmethod
+    def serialize_batch(objects: Iterable[ObjectEntry], codec: Optional[MOQTCodec] = None) -> Buffer:
+        """Serialize a run of (object_id, payload, extensions) objects into one stream buffer."""
+        objects = tuple(objects)
+        extensions_encode = (codec or DEFAULT_CODEC).extensions_encode
+        buf = Buffer(capacity=sum(
+            24 + len(payload) + _extensions_size(exts or EMPTY_EXTENSIONS) for _, payload, exts in objects))
+        for object_id, payload, exts in objects:
+            buf.push_uint_var(object_id)
+            extensions_encode(buf, exts or EMPTY_EXTENSIONS)
+            if payload:
+                buf.push_uint_var(len(payload))
+                buf.push_bytes(payload)
+            else:
+                buf.push_uint_var(0)  # Zero length
+                buf.push_uint_var(ObjectStatus.NORMAL)  # Status code
+        return buf
     
     @classmethod
-    def deserialize(cls, buf: Buffer, buf_len: int) -> 'ObjectHeader':
+    def deserialize(cls, buf: Buffer, buf_len: int, codec: Optional[MOQTCodec] = None) -> 'ObjectHeader':
         """Deserialize from stream transmission."""
         object_id = buf.pull_uint_var()
 
         # Parse extensions
-        extensions = MOQTMessage._extensions_decode(buf)
+        extensions = (codec or DEFAULT_CODEC).extensions_decode(buf)
 
         # Get payload or status
         payload_len = buf.pull_uint_var()
@@ -183,44 +188,37 @@ class ObjectHeader(MOQTMessage):
             payload=payload
         )
 
-@dataclass
+@message_schema(
+    SchemaField('subscribe_id', FieldKind.VARINT),
+    framing=Framing.TYPE,
+)
+@dataclass(slots=True)
 class FetchHeader(MOQTMessage):
     """MOQT fetch stream header."""
     subscribe_id: int
 
-    def serialize(self) -> bytes:
-        buf = Buffer(capacity=BUF_SIZE)
-        buf.push_uint_var(DataStreamType.FETCH_HEADER)
-        
-        buf.push_uint_var(self.subscribe_id)
+    type = DataStreamType.FETCH_HEADER
 
-        return buf
-
-    @classmethod
-    def deserialize(cls, buf: Buffer) -> 'FetchHeader':
-        subscribe_id = buf.pull_uint_var()
-        return cls(subscribe_id=subscribe_id)
-
-@dataclass
+@dataclass(slots=True)
 class FetchObject(MOQTMessage):
     """Object within a fetch stream."""
     group_id: int
     subgroup_id: int 
     object_id: int
     publisher_priority: int = MOQT_DEFAULT_PRIORITY
-    extensions: Dict[int, bytes] = None
+    extensions: Mapping[int, Union[bytes, int]] = EMPTY_EXTENSIONS
     status: ObjectStatus = ObjectStatus.NORMAL
     payload: bytes = b''
 
-    def serialize(self) -> bytes:
-        buf = Buffer(capacity=BUF_SIZE + len(self.payload))
+    def serialize(self, codec: Optional[MOQTCodec] = None) -> Buffer:
+        buf = Buffer(capacity=BUF_SIZE + len(self.payload) + _extensions_size(self.extensions))
         
         buf.push_uint_var(self.group_id)
         buf.push_uint_var(self.subgroup_id)
         buf.push_uint_var(self.object_id)
         buf.push_uint8(self.publisher_priority)
 
-        MOQTMessage._extensions_encode(buf, self.extensions)
+        (codec or DEFAULT_CODEC).extensions_encode(buf, self.extensions)
 
         if self.status == ObjectStatus.NORMAL and len(self.payload) > 0:
             buf.push_uint_var(len(self.payload))
@@ -232,14 +230,14 @@ class FetchObject(MOQTMessage):
         return buf
 
     @classmethod
-    def deserialize(cls, buf: Buffer) -> 'FetchObject':
+    def deserialize(cls, buf: Buffer, codec: Optional[MOQTCodec] = None) -> 'FetchObject':
         group_id = buf.pull_uint_var()
         subgroup_id = buf.pull_uint_var()
         object_id = buf.pull_uint_var()
         publisher_priority = buf.pull_uint8()
         
         # Parse extensions
-        extensions = MOQTMessage._extensions_decode(buf)
+        extensions = (codec or DEFAULT_CODEC).extensions_decode(buf)
         payload_len = buf.pull_uint_var()
 
         if payload_len == 0:
@@ -264,42 +262,78 @@ class FetchObject(MOQTMessage):
         )
         
 
-@dataclass
+@dataclass(slots=True)
 class ObjectDatagram(MOQTMessage):
     """Object datagram message."""
     track_alias: int
     group_id: int
     object_id: int
     publisher_priority: int = MOQT_DEFAULT_PRIORITY
-    extensions: Optional[Dict[int, bytes]] = None
+    extensions: Mapping[int, Union[bytes, int]] = EMPTY_EXTENSIONS
     payload: bytes = b''
 
-    def __post_init__(self):
-        self.type = DatagramType.OBJECT_DATAGRAM
+    type = DatagramType.OBJECT_DATAGRAM
 
-    def serialize(self) -> Buffer:
-        payload_len = 0 if self.payload is None else len(self.payload)
-        buf = Buffer(capacity=BUF_SIZE + payload_len)
+    def serialize(self, codec: Optional[MOQTCodec] = None) -> Buffer:
+        buf = Buffer(capacity=self._capacity())
         # MOQT ObjectDatagram
         buf.push_uint_var(DatagramType.OBJECT_DATAGRAM)
         buf.push_uint_var(self.track_alias)
+        self._push_object(buf, codec)
+        return buf
+
+    def _capacity(self) -> int:
+        payload_len = 0 if self.payload is None else len(self.payload)
+        return BUF_SIZE + payload_len + _extensions_size(self.extensions)
+
+    @staticmethod
+    def serialize_batch(
+        track_alias: int,
+        group_id: int,
+        objects: Iterable[ObjectEntry],
+        publisher_priority: int = MOQT_DEFAULT_PRIORITY,
+        codec: Optional[MOQTCodec] = None,
+        prefix: bytes = b"",
+    ) -> List[bytes]:
+        """Serialize (object_id, payload, extensions) objects of one group as datagrams, after an optional transport prefix."""
+        extensions_encode = (codec or DEFAULT_CODEC).extensions_encode
+        head = Buffer(capacity=BUF_SIZE + len(prefix))
+        head.push_bytes(prefix)
+        head.push_uint_var(DatagramType.OBJECT_DATAGRAM)
+        head.push_uint_var(track_alias)
+        head.push_uint_var(group_id)
+        head = head.data  # shared by every datagram of the batch
+        datagrams = []
+        for object_id, payload, exts in objects:
+            exts = exts or EMPTY_EXTENSIONS
+            buf = Buffer(capacity=BUF_SIZE + len(head) + len(payload) + _extensions_size(exts))
+            buf.push_bytes(head)
+            buf.push_uint_var(object_id)
+            buf.push_uint8(publisher_priority)
+            extensions_encode(buf, exts)
+            if payload:
+                buf.push_bytes(payload)
+            datagrams.append(buf.data)
+        return datagrams
+
+    def _push_object(self, buf: Buffer, codec: Optional[MOQTCodec]) -> None:
+        """Push the fields following the track alias."""
         buf.push_uint_var(self.group_id)
         buf.push_uint_var(self.object_id)
         buf.push_uint8(self.publisher_priority)
-        MOQTMessage._extensions_encode(buf, self.extensions)
-        if payload_len > 0:
+        (codec or DEFAULT_CODEC).extensions_encode(buf, self.extensions)
+        if self.payload:
             buf.push_bytes(self.payload)
-        return buf
 
     @classmethod
-    def deserialize(cls, buf: Buffer, buf_len: int) -> 'ObjectDatagram':
+    def deserialize(cls, buf: Buffer, buf_len: int, codec: Optional[MOQTCodec] = None) -> 'ObjectDatagram':
         track_alias = buf.pull_uint_var()
         group_id = buf.pull_uint_var()
         object_id = buf.pull_uint_var()
         publisher_priority = buf.pull_uint8()
         
         # Parse extensions
-        extensions = MOQTMessage._extensions_decode(buf)
+        extensions = (codec or DEFAULT_CODEC).extensions_decode(buf)
                           
         # Get payload - the rest of the datagram - no length needed
         payload = buf.pull_bytes(buf_len - buf.tell())
@@ -313,43 +347,49 @@ class ObjectDatagram(MOQTMessage):
             payload=payload
         )
 
-@dataclass
+@dataclass(slots=True)
 class ObjectDatagramStatus(MOQTMessage):
     """Object datagram status message."""
     track_alias: int
     group_id: int
     object_id: int
     publisher_priority: int = MOQT_DEFAULT_PRIORITY
-    extensions: Optional[Dict[int, bytes]] = None
+    extensions: Mapping[int, Union[bytes, int]] = EMPTY_EXTENSIONS
     status: ObjectStatus = ObjectStatus.NORMAL
 
-    def __post_init__(self):
-        self.type = DatagramType.OBJECT_DATAGRAM_STATUS
+    type = DatagramType.OBJECT_DATAGRAM_STATUS
 
-    def serialize(self) -> Buffer:
-        buf = Buffer(capacity=BUF_SIZE)
+    def serialize(self, codec: Optional[MOQTCodec] = None) -> Buffer:
+        buf = Buffer(capacity=self._capacity())
 
         buf.push_uint_var(DatagramType.OBJECT_DATAGRAM_STATUS)   
         buf.push_uint_var(self.track_alias)
+        self._push_object(buf, codec)
+
+        return buf
+
+    def _capacity(self) -> int:
+        return BUF_SIZE + _extensions_size(self.extensions)
+
+    def _push_object(self, buf: Buffer, codec: Optional[MOQTCodec]) -> None:
+        """Push the fields following the track alias."""
         buf.push_uint_var(self.group_id)
         buf.push_uint_var(self.object_id)
         buf.push_uint8(self.publisher_priority)
         
-        MOQTMessage._extensions_encode(buf, self.extensions)
+        (codec or DEFAULT_CODEC).extensions_encode(buf, self.extensions)
         
         buf.push_uint_var(self.status)  # Status code
 
-        return buf
-
     @classmethod
-    def deserialize(cls, buf: Buffer) -> 'ObjectDatagramStatus':
+    def deserialize(cls, buf: Buffer, codec: Optional[MOQTCodec] = None) -> 'ObjectDatagramStatus':
         track_alias = buf.pull_uint_var()
         group_id = buf.pull_uint_var()
         object_id = buf.pull_uint_var()
         publisher_priority = buf.pull_uint8()
 
         # Parse extensions
-        extensions = MOQTMessage._extensions_decode(buf)
+        extensions = (codec or DEFAULT_CODEC).extensions_decode(buf)
 
         status = ObjectStatus(buf.pull_uint_var())
         return cls(
@@ -361,3 +401,81 @@ class ObjectDatagramStatus(MOQTMessage):
             status=status
         )
 
+
+_SUBGROUP_HEADER_TYPE = encode_uint_var(DataStreamType.SUBGROUP_HEADER)
+
+
+class SharedSubgroup:
+    """Subgroup stream header encoded once for every subscriber of a track.
+
+    Subscribers' subgroup headers differ only in the track alias: the group id,
+    subgroup id and priority are encoded once, and header(track_alias) puts
+    the stream type and a subscriber's alias in front of them. Send it at the
+    start of each subscriber's data stream, followed by SharedObject data.
+    """
+    __slots__ = ('group_id', 'subgroup_id', 'publisher_priority', '_tail')
+
+    def __init__(self, group_id: int, subgroup_id: int, publisher_priority: int = MOQT_DEFAULT_PRIORITY):
+        self.group_id = group_id
+        self.subgroup_id = subgroup_id
+        self.publisher_priority = publisher_priority
+        buf = Buffer(capacity=BUF_SIZE)
+        buf.push_uint_var(group_id)
+        buf.push_uint_var(subgroup_id)
+        buf.push_uint8(publisher_priority)
+        self._tail = buf.data
+
+    def header(self, track_alias: int) -> bytes:
+        """Encoded SubgroupHeader for one subscriber's track alias."""
+        return _SUBGROUP_HEADER_TYPE + encode_uint_var(track_alias) + self._tail
+
+    def __repr__(self) -> str:
+        return f"SharedSubgroup(group_id={self.group_id}, subgroup_id={self.subgroup_id})"
+
+
+class SharedObject:
+    """An object serialized once and shared by all the subscribers it is sent to.
+
+    Wraps an ObjectHeader (subgroup stream object) or an ObjectDatagram or
+    ObjectDatagramStatus. The encoding is cached per codec, so sending to many
+    sessions serializes the object once per MoQT version in use rather than
+    once per subscriber. A stream object's data is the same for every
+    subscriber; a datagram starts with the track alias, so datagram() patches
+    a subscriber's alias in front of the shared encoding. The wrapped message
+    must not be modified once shared.
+    """
+    __slots__ = ('message', '_prefix', '_data')
+
+    def __init__(self, message: Union[ObjectHeader, ObjectDatagram, ObjectDatagramStatus]):
+        self.message = message
+        # datagram type, None for a stream object
+        self._prefix = None if isinstance(message, ObjectHeader) else encode_uint_var(message.type)
+        self._data: Dict[MOQTCodec, bytes] = {}
+
+    @property
+    def is_datagram(self) -> bool:
+        return self._prefix is not None
+
+    def data(self, codec: Optional[MOQTCodec] = None) -> bytes:
+        """Shared encoding: the whole stream object, or the datagram after its track alias."""
+        codec = codec or DEFAULT_CODEC
+        data = self._data.get(codec)
+        if data is None:
+            msg = self.message
+            if self._prefix is None:
+                data = msg.serialize(codec).data
+            else:
+                buf = Buffer(capacity=msg._capacity())
+                msg._push_object(buf, codec)
+                data = buf.data
+            self._data[codec] = data
+        return data
+
+    def datagram(self, track_alias: int, codec: Optional[MOQTCodec] = None, prefix: bytes = b"") -> bytes:
+        """Encoded datagram for one subscriber's track alias, after an optional transport prefix."""
+        if self._prefix is None:
+            raise ValueError("not a datagram object")
+        return b"".join((prefix, self._prefix, encode_uint_var(track_alias), self.data(codec)))
+
+    def __repr__(self) -> str:
+        return f"SharedObject({class_name(self.message)}, object_id={self.message.object_id})"
@@ -3,33 +3,85 @@ import time
 
 import contextvars
 from functools import partial
-from collections import defaultdict
-from typing import Optional, Type, Union, List, Set, Tuple, Dict, DefaultDict, Callable
+from contextlib import contextmanager
+from enum import IntEnum
+from collections import defaultdict, deque
+from typing import Optional, Type, Union, List, Set, Tuple, Dict, DefaultDict, Deque, Callable, Hashable, Iterable, Iterator, AsyncIterator
 
 import asyncio
 from asyncio import Future
 
-from aioquic.buffer import Buffer, UINT_VAR_MAX, BufferReadError
+from aioquic.buffer import Buffer, UINT_VAR_MAX, BufferReadError, encode_uint_var
 from aioquic.asyncio.protocol import QuicConnectionProtocol
 from aioquic.quic.connection import QuicConnection, QuicErrorCode, stream_is_unidirectional
-from aioquic.quic.events import QuicEvent, StreamDataReceived, ProtocolNegotiated, DatagramFrameReceived
+from aioquic.quic.events import QuicEvent, StreamDataReceived, StreamReset, ProtocolNegotiated, DatagramFrameReceived
 from aioquic.h3.connection import H3Connection, ErrorCode, H3_ALPN
 from aioquic.h3.events import HeadersReceived
 
 from .types import *
 from .context import *
 from .messages import *
+from .state import Subscription, DataStream, NamespaceTrie, PendingRequests, TrackRegistry
 from .utils.logger import *
+from .utils.timers import Timer, get_timer_wheel
+from .utils.reader import BufferReader
+from .utils.pacer import ObjectPacer, MOQT_PACER_INTERVAL, MOQT_PACER_BURST
+from .utils.auth import Authorizer
+from .utils.limits import TokenBucket, LoopLagMonitor
 
 from importlib.metadata import version
 USER_AGENT = f"aiomoqt/{version('aiomoqt')}"
 
 
-MOQT_IDLE_STREAM_TIMEOUT = 30
+MOQT_IDLE_STREAM_TIMEOUT = 30  # seconds without data before a data stream is stopped
+MOQT_REQUEST_TIMEOUT = 10  # seconds to wait for a control message response
+MOQT_MAX_SUBSCRIBE_ID_WINDOW = 1000  # subscribe ids initially granted to the peer
+MOQT_MAX_SUBSCRIBE_ID_WINDOW_LIMIT = 65536  # largest window grown to on SUBSCRIBES_BLOCKED
+MOQT_MAX_DATA_STREAMS = 1024  # peer uni streams allowed beyond those already opened (MAX_STREAMS)
+MOQT_MAX_SUBSCRIPTIONS = MOQT_MAX_SUBSCRIBE_ID_WINDOW_LIMIT  # concurrent peer subscriptions and fetches
+MOQT_SEND_WINDOW = 32768  # prioritized data stream bytes handed to QUIC and not yet sent
+# incoming request rate limits per session: message types sharing a limit -> (requests/s, burst)
+MOQT_CONTROL_RATE_LIMITS = {
+    (MOQTMessageType.SUBSCRIBE, MOQTMessageType.FETCH,
+     MOQTMessageType.SUBSCRIBE_UPDATE, MOQTMessageType.TRACK_STATUS_REQUEST): (1000.0, 5000),
+    (MOQTMessageType.ANNOUNCE, MOQTMessageType.SUBSCRIBE_ANNOUNCES): (100.0, 500),
+}
+
+_END = object()  # end of a pipelined request iterator
+
+# WebTransport over HTTP/3 stream signal types, followed by the session id
+WT_STREAM_BIDI = 0x41
+WT_STREAM_UNI = 0x54
+
+
+class StreamRole(IntEnum):
+    """Routing decision cached for a QUIC stream on its first data."""
+    H3 = 0  # HTTP/3 stream, including WebTransport CONNECT streams
+    CONTROL = 1  # MoQT control stream
+    DATA = 2  # MoQT subgroup or fetch data stream
+    IGNORED = 3  # unrecognized bidirectional stream
 
 logger = get_logger(__name__)
     
 
+class _SendCounter:
+    """Datagram transport proxy: bytes sent drain the session's estimate of unsent QUIC data."""
+    __slots__ = ('transport', '_protocol')
+
+    def __init__(self, transport: asyncio.DatagramTransport, protocol: 'MOQTSessionProtocol'):
+        self.transport = transport
+        self._protocol = protocol
+
+    def sendto(self, data: bytes, addr=None) -> None:
+        protocol = self._protocol
+        if protocol._send_backlog:
+            protocol._send_backlog = max(0, protocol._send_backlog - len(data))
+        self.transport.sendto(data, addr)
+
+    def __getattr__(self, name: str):
+        return getattr(self.transport, name)
+
+
 class H3CustomConnection(H3Connection):
     """Custom H3Connection wrapper to support alternate SETTINGS"""
     
@@ -67,29 +119,74 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
     def __init__(self, *args, session: 'MOQTSession', **kwargs):
         super().__init__(*args, **kwargs)
         self._session: MOQTSession = session  # backref to session object with config
-        self._h3: Optional[H3Connection] = None
+        self._conn: MOQTSessionProtocol = self  # protocol receiving the QUIC connection events
+        self._h3: Optional[H3Connection] = None  # created once ALPN selects HTTP/3
+        self._raw_quic = False  # MOQT_ALPN negotiated: MoQT directly over QUIC streams
         self._session_id: Optional[int] = None
         self._control_stream_id: Optional[int] = None
         self._loop = asyncio.get_running_loop()
         self._wt_session_setup: Future[bool] = self._loop.create_future()
         self._moqt_version: int = MOQT_CUR_VERSION
+        self._codec: MOQTCodec = get_codec(MOQT_CUR_VERSION)  # rebound on version negotiation
         self._moqt_session_setup: Future[bool] = self._loop.create_future()
         self._moqt_session_closed: Future[Tuple[int,str]] = self._loop.create_future()
         self._next_subscribe_id = 1  # prime subscribe id generator
         self._next_track_alias = 1  # prime track alias generator
-        self._stream_queues: DefaultDict[int, asyncio.Queue[Buffer]] = defaultdict(asyncio.Queue)
-        self._stream_tasks: Dict[int, asyncio.Task] = {}
         self._tasks: Set[asyncio.Task] = set()
+        self._timers = get_timer_wheel(self._loop)  # stream idle and request timeouts
+        self.idle_stream_timeout: float = MOQT_IDLE_STREAM_TIMEOUT
+        self.request_timeout: float = MOQT_REQUEST_TIMEOUT
+        # connection level routing, shared by the WebTransport sessions on a connection
+        self._wt_sessions: Dict[int, MOQTSessionProtocol] = {}  # MoQT sessions by WT session id
+        self._stream_sessions: Dict[int, MOQTSessionProtocol] = {}  # MoQT session owning a stream
+        self._stream_roles: Dict[int, StreamRole] = {}  # cached routing decision per stream
+        # bound QUIC event handlers by event type (see QUIC_EVENT_REGISTRY)
+        self._quic_event_handlers: Dict[Type[QuicEvent], Callable[[QuicEvent], None]] = {
+            event_type: handler.__get__(self) for event_type, handler in self.QUIC_EVENT_REGISTRY.items()
+        }
         self._close_err = None  # tuple holding latest (error_code, Reason_phrase)
         
-        self._data_streams: Dict[int, int] = {}  # keep track of active data streams
-        self._track_aliases: Dict[int, int] = {}  # map alias to subscription_id
-        self._subscriptions: Dict[int, List] = {}  # map subscription_id to request
-        self._announce_responses: Dict[int, Future[MOQTMessage]] = {}
-        self._subscribe_announces_responses: Dict[int, Future[MOQTMessage]] = {}
-        self._subscribe_responses: Dict[int, Future[MOQTMessage]] = {}
-        self._unsubscribe_responses: Dict[int, Future[MOQTMessage]] = {}
-        self._fetch_responses: Dict[int, Future[MOQTMessage]] = {}
+        self._data_streams: Dict[int, DataStream] = {}  # active incoming data streams
+        self._track_aliases: Dict[int, Subscription] = {}  # our subscriptions by track alias
+        self._subscriptions: Dict[int, Subscription] = {}  # our subscriptions by subscribe_id
+        self._subscribers: Dict[int, Subscription] = {}  # peer subscriptions by subscribe_id
+        self._track_subscribers: Dict[FullTrackName, Dict[int, Subscription]] = {}  # peer subscriptions by track
+        # requests awaiting a response by (request type, subscribe id or namespace)
+        self._requests = PendingRequests(self._loop, self._timers, self._request_timeout_response)
+        self._control_batch: Optional[List[bytes]] = None  # control messages held for one write
+        # subscribe id flow control: MAX_SUBSCRIBE_ID is exclusive (first id not allowed)
+        self._peer_max_subscribe_id: Optional[int] = None  # peer MAX_SUBSCRIBE_ID (None: not limited)
+        self._max_subscribe_id_raised: Optional[Future[int]] = None
+        self._blocked_requests: Deque[Tuple[int, Buffer]] = deque()  # requests beyond the peer limit
+        self._subscribes_blocked_sent: Optional[int] = None  # limit last reported in SUBSCRIBES_BLOCKED
+        self.max_subscribe_id_window: int = MOQT_MAX_SUBSCRIBE_ID_WINDOW  # ids the peer may have open
+        self._max_subscribe_id: Optional[int] = None  # MAX_SUBSCRIBE_ID granted (None: before setup)
+        self._retired_subscribe_ids = 0  # peer ids finished since the last grant
+        # data stream credit (QUIC MAX_STREAMS for uni streams, shared by the connection's sessions)
+        self.max_data_streams: int = getattr(session, 'max_data_streams', MOQT_MAX_DATA_STREAMS)
+        self._grant_data_streams()  # initial limit, sent in the transport parameters
+        self.data_streams_blocked = 0  # data streams opened beyond, or waiting on, the peer's MAX_STREAMS
+        self._data_stream_limit: Optional[int] = None  # peer MAX_STREAMS when reached (None: not reached)
+        self._data_stream_credit: Optional[Future[int]] = None  # waiters for the peer to raise the limit
+        self._data_stream_prefix: Optional[bytes] = None  # pre-encoded WT uni stream type and session id
+        # send scheduling: (subscription, publisher priority) of data streams opened for a peer subscription
+        self._send_priorities: Dict[int, Tuple[Subscription, int]] = {}
+        self._send_queues: Dict[int, Deque[Tuple[bytes, bool]]] = {}  # their writes not yet handed to QUIC
+        self._send_backlog = 0  # estimated bytes handed to QUIC but not yet sent
+        # announce routing state, shared by all sessions of a server
+        self._namespaces: NamespaceTrie = getattr(session, 'namespaces', None) or NamespaceTrie()
+        self._tracks: TrackRegistry = getattr(session, 'tracks', None) or TrackRegistry()  # TRACK_STATUS answers
+        self._authorizer: Optional[Authorizer] = getattr(session, 'authorizer', None)  # AUTHORIZATION_INFO checks
+        # admission control of incoming requests, checked before a handler task is created
+        self.max_subscriptions: int = getattr(session, 'max_subscriptions', MOQT_MAX_SUBSCRIPTIONS)
+        self._request_limits: Dict[int, Optional[TokenBucket]] = {}  # request type -> rate limit (None: unlimited)
+        for types, limit in getattr(session, 'control_rate_limits', MOQT_CONTROL_RATE_LIMITS).items():
+            bucket = TokenBucket(*limit) if limit is not None else None
+            self._request_limits.update((msg_type, bucket) for msg_type in types)
+        self._load_monitor: Optional[LoopLagMonitor] = getattr(session, 'load_monitor', None)
+        self.requests_refused = 0  # incoming requests refused by rate limit, cap or load shedding
+        self._pending_subscribes: Set[int] = set()  # ids of admitted SUBSCRIBE/FETCHes not yet recorded
+        self._refusing = False  # refusals logged once until a request is admitted again
         
         self._control_msg_registry = dict(MOQTSessionProtocol.MOQT_CONTROL_MESSAGE_REGISTRY)
         self._stream_data_registry = dict(MOQTSessionProtocol.MOQT_STREAM_DATA_REGISTRY)
@@ -100,29 +197,285 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
 
         return await super().__aexit__(exc_type, exc, tb)
 
-    @staticmethod
-    def _make_namespace_tuple(namespace: Union[str, Tuple[str, ...]]) -> Tuple[bytes, ...]:
-        """Convert string or tuple into bytes tuple."""
-        if isinstance(namespace, str):
-            return tuple(part.encode() for part in namespace.split('/'))
-        elif isinstance(namespace, tuple):
-            if all(isinstance(x, bytes) for x in namespace):
-                return namespace
-            return tuple(part.encode() if isinstance(part, str) else part for part in namespace)
-        raise ValueError("namespace must be string with '/' delimiters or tuple")
+    @property
+    def sessions(self) -> List['MOQTSessionProtocol']:
+        """MoQT sessions on this QUIC connection (a server may host several WebTransport sessions)."""
+        conn = self._conn
+        return list(dict.fromkeys([conn, *conn._wt_sessions.values()]))
+
+    def _create_wt_session(self, session_id: int) -> 'MOQTSessionProtocol':
+        """Create the MoQT session for an additional WebTransport session on this connection.
+
+        The new session shares the QUIC and H3 connection, and transmits through
+        this protocol, but has its own control stream, subscriptions and codec.
+        """
+        session = self.__class__(self._quic, session=self._session)
+        session._conn = self
+        session._transport = self._transport
+        session.transmit = self.transmit
+        session._h3 = self._h3
+        session._session_id = session_id
+        session._namespaces = self._namespaces
+        session._tracks = self._tracks
+        session._control_msg_registry = dict(self._control_msg_registry)
+        session._stream_data_registry = dict(self._stream_data_registry)
+        session._dgram_data_registry = dict(self._dgram_data_registry)
+        if not self._quic.configuration.is_client:
+            session._wt_session_setup.set_result(True)  # CONNECT already accepted
+        self._wt_sessions[session_id] = session
+        return session
+
+    async def open_session(self, timeout: int = 10) -> 'MOQTSessionProtocol':
+        """Open an additional MoQT client session over this connection's WebTransport."""
+        if self._raw_quic or self._h3 is None:
+            raise MOQTException(SessionCloseCode.INTERNAL_ERROR, "additional sessions require WebTransport")
+        session_id = self._quic.get_next_available_stream_id(is_unidirectional=False)
+        session = self._conn._create_wt_session(session_id)
+        await session.client_session_init(timeout)
+        return session
+
+    @property
+    def raw_quic(self) -> bool:
+        """True when the session runs directly over QUIC (ALPN moq-00) rather than WebTransport."""
+        return self._raw_quic
+
+    @property
+    def tracks(self) -> TrackRegistry:
+        """Status of the tracks published here: publishers record objects sent, TRACK_STATUS reads it."""
+        return self._tracks
+
+    @property
+    def codec(self) -> MOQTCodec:
+        """Codec for the negotiated MoQT version, for serializing objects on this session."""
+        return self._codec
+
+    def _set_moqt_version(self, version: int) -> None:
+        """Bind the negotiated version and its codec to the session."""
+        self._moqt_version = version
+        self._codec = get_codec(version)
+
+    # namespace normalization is cached, see make_namespace_tuple
+    _make_namespace_tuple = staticmethod(make_namespace_tuple)
+
+    def _route_announce(self, namespace: Tuple[bytes, ...], announce: bool = True) -> None:
+        """Forward an ANNOUNCE (or UNANNOUNCE) to the sessions subscribed to a matching prefix."""
+        if not announce and self._namespaces.publishers(namespace):
+            return  # still announced by another publisher
+        for session in self._namespaces.subscribers(namespace):
+            if session is self or session._close_err is not None:
+                continue
+            if announce:
+                session.announce(namespace)
+            else:
+                session.unannounce(namespace)
 
     def _allocate_subscribe_id(self) -> int:
-        """Get next available subscribe ID."""
+        """Get next available subscribe ID, reporting SUBSCRIBES_BLOCKED if beyond the peer limit."""
         subscribe_id = self._next_subscribe_id
         self._next_subscribe_id += 1
+        if self._peer_max_subscribe_id is not None and subscribe_id >= self._peer_max_subscribe_id:
+            self._subscribes_blocked()
         return subscribe_id
 
-    def _allocate_track_alias(self, subscribe_id: int = 1) -> int:
+    def _send_request(self, subscribe_id: int, message: MOQTMessage) -> None:
+        """Send a SUBSCRIBE or FETCH, queued until MAX_SUBSCRIBE_ID allows its subscribe id."""
+        limit = self._peer_max_subscribe_id
+        if self._blocked_requests or (limit is not None and subscribe_id >= limit):
+            logger.info(f"MOQT: blocked by MAX_SUBSCRIBE_ID {limit}: {message}")
+            self._blocked_requests.append((subscribe_id, message.serialize()))
+            return
+        logger.info(f"MOQT send: {message}")
+        self.send_control_message(message.serialize())
+
+    def _unqueue_request(self, subscribe_id: int) -> bool:
+        """Drop a request still waiting for MAX_SUBSCRIBE_ID."""
+        for entry in self._blocked_requests:
+            if entry[0] == subscribe_id:
+                self._blocked_requests.remove(entry)
+                return True
+        return False
+
+    def _subscribes_blocked(self) -> None:
+        """Send SUBSCRIBES_BLOCKED, once per peer limit."""
+        limit = self._peer_max_subscribe_id
+        if self._subscribes_blocked_sent != limit:
+            self._subscribes_blocked_sent = limit
+            self.subscribes_blocked(limit)
+
+    def _subscribe_ids_available(self) -> Optional[int]:
+        """Subscribe IDs left under the peer's MAX_SUBSCRIBE_ID (None: not limited)."""
+        if self._peer_max_subscribe_id is None:
+            return None
+        return max(self._peer_max_subscribe_id - self._next_subscribe_id, 0)
+
+    def _subscribe_ids_raised(self) -> Future:
+        """Future resolved when the peer next raises MAX_SUBSCRIBE_ID."""
+        if self._max_subscribe_id_raised is None or self._max_subscribe_id_raised.done():
+            self._max_subscribe_id_raised = self._loop.create_future()
+        return self._max_subscribe_id_raised
+
+    def _set_peer_max_subscribe_id(self, max_subscribe_id: int) -> None:
+        if self._peer_max_subscribe_id is not None and max_subscribe_id <= self._peer_max_subscribe_id:
+            return  # the limit only grows
+        self._peer_max_subscribe_id = max_subscribe_id
+        if self._blocked_requests:
+            with self.control_batch():
+                while self._blocked_requests and self._blocked_requests[0][0] < max_subscribe_id:
+                    self.send_control_message(self._blocked_requests.popleft()[1])
+        fut = self._max_subscribe_id_raised
+        if fut is not None and not fut.done():
+            fut.set_result(max_subscribe_id)
+
+    def _setup_max_subscribe_id(self) -> bytes:
+        """MAX_SUBSCRIBER_ID setup parameter granting the initial subscribe id window."""
+        self._max_subscribe_id = self.max_subscribe_id_window
+        return MOQTMessage._varint_encode(self._max_subscribe_id)
+
+    def _accept_subscribe_id(self, subscribe_id: int) -> bool:
+        """Check a peer SUBSCRIBE/FETCH id against the granted limit, closing the session if over."""
+        if self._max_subscribe_id is None or subscribe_id < self._max_subscribe_id:
+            return True
+        error = f"MOQT event: subscribe id {subscribe_id} beyond MAX_SUBSCRIBE_ID {self._max_subscribe_id}"
+        logger.error(error)
+        self._close_session(SessionCloseCode.TOO_MANY_SUBSCRIBES, error)
+        return False
+
+    def _admit_request(self, msg: MOQTMessage) -> bool:
+        """Admission control for an incoming request, answering it with an error if refused."""
+        monitor = self._load_monitor
+        bucket = self._request_limits[msg.type]
+        if monitor is not None and monitor.overloaded:
+            reason = MOQT_REFUSED_OVERLOADED
+        elif bucket is not None and not bucket.take():
+            reason = MOQT_REFUSED_RATE_LIMITED
+        elif msg.type in (MOQTMessageType.SUBSCRIBE, MOQTMessageType.FETCH) \
+                and len(self._subscribers) + len(self._pending_subscribes) >= self.max_subscriptions:
+            reason = MOQT_REFUSED_TOO_MANY_SUBSCRIPTIONS
+        else:
+            self._refusing = False
+            return True
+        self.requests_refused += 1
+        if not self._refusing:
+            self._refusing = True
+            logger.warning(f"MOQT event: refusing requests: {reason}: {msg}")
+        self._refuse_request(msg, reason)
+        return False
+
+    def _refuse_request(self, msg: MOQTMessage, reason: str) -> None:
+        """Answer a refused request with INTERNAL_ERROR and a reason from MOQT_REFUSED_REASONS."""
+        msg_type = msg.type
+        if msg_type == MOQTMessageType.SUBSCRIBE:
+            self.subscribe_error(msg.subscribe_id, SubscribeErrorCode.INTERNAL_ERROR, reason, msg.track_alias)
+        elif msg_type == MOQTMessageType.FETCH:
+            self.fetch_error(msg.subscribe_id, SubscribeErrorCode.INTERNAL_ERROR, reason)
+        elif msg_type == MOQTMessageType.ANNOUNCE:
+            self.announce_error(msg.namespace, AnnounceErrorCode.INTERNAL_ERROR, reason)
+        elif msg_type == MOQTMessageType.SUBSCRIBE_ANNOUNCES:
+            message = SubscribeAnnouncesError(namespace_prefix=msg.namespace_prefix, error_code=0x0, reason=reason)
+            logger.info(f"MOQT send: {message}")
+            self.send_control_message(message.serialize())
+        elif msg_type == MOQTMessageType.TRACK_STATUS_REQUEST:
+            self.send_track_status(msg.full_track_name, TrackStatusCode.RELAY_NO_INFO)
+        # SUBSCRIBE_UPDATE has no response: dropped
+
+    def _retire_subscribe_id(self) -> None:
+        """Count a finished peer request; re-grant ids once half the window is retired."""
+        if self._max_subscribe_id is None:
+            return
+        self._retired_subscribe_ids += 1
+        if self._retired_subscribe_ids >= max(self.max_subscribe_id_window // 2, 1):
+            self._grant_subscribe_ids()
+
+    def _grant_subscribe_ids(self, extra: int = 0) -> None:
+        """Raise MAX_SUBSCRIBE_ID by the retired ids plus extra (window growth)."""
+        grant = self._retired_subscribe_ids + extra
+        if self._max_subscribe_id is None or grant == 0:
+            return
+        self._retired_subscribe_ids = 0
+        self._max_subscribe_id += grant
+        self.max_subscribe_id(self._max_subscribe_id)
+
+    def _allocate_track_alias(self) -> int:
         """Get next available track alias."""
         track_alias = self._next_track_alias
         self._next_track_alias += 1
-        self._track_aliases[track_alias] = subscribe_id
         return track_alias
+
+    def _add_subscription(
+            self,
+            subscribe_id: int,
+            request: MOQTMessage,
+            track_alias: Optional[int] = None,
+            idle_timeout: Optional[float] = None,
+        ) -> Subscription:
+        """Record state for an outgoing SUBSCRIBE or FETCH."""
+        sub = Subscription(subscribe_id, track_alias, request, idle_timeout)
+        self._subscriptions[subscribe_id] = sub
+        if track_alias is not None:
+            self._track_aliases[track_alias] = sub
+        return sub
+
+    def _remove_subscription(self, subscribe_id: int) -> Optional[Subscription]:
+        """Drop state for an outgoing SUBSCRIBE or FETCH and detach its data streams."""
+        sub = self._subscriptions.pop(subscribe_id, None)
+        if sub is None:
+            return None
+        if sub.track_alias is not None and self._track_aliases.get(sub.track_alias) is sub:
+            del self._track_aliases[sub.track_alias]
+        for stream_id in sub.streams:
+            data_stream = self._data_streams.get(stream_id)
+            if data_stream is not None:
+                data_stream.subscription = None
+        sub.streams.clear()
+        logger.debug(f"MOQT: removed subscription: {subscribe_id}")
+        return sub
+
+    def _add_subscriber(self, request: MOQTMessage) -> Subscription:
+        """Record state for an incoming SUBSCRIBE or FETCH."""
+        sub = Subscription(request.subscribe_id, getattr(request, 'track_alias', None), request)
+        self._subscribers[sub.subscribe_id] = sub
+        self._pending_subscribes.discard(sub.subscribe_id)
+        if sub.track is not None:
+            self._track_subscribers.setdefault(sub.track, {})[sub.subscribe_id] = sub
+        return sub
+
+    def _remove_subscriber(self, subscribe_id: int) -> Optional[Subscription]:
+        """Drop state for an incoming SUBSCRIBE or FETCH."""
+        sub = self._subscribers.pop(subscribe_id, None)
+        if sub is None:
+            return None
+        self._retire_subscribe_id()
+        conn = self._conn
+        for stream_id in sub.streams:
+            conn._send_priorities.pop(stream_id, None)
+            queue = conn._send_queues.pop(stream_id, None)
+            if queue:  # no longer prioritized: hand the rest to QUIC as is
+                self._write_stream_data(stream_id, queue)
+        if sub.track is None:
+            return sub
+        track_subs = self._track_subscribers.get(sub.track)
+        if track_subs is not None:
+            track_subs.pop(subscribe_id, None)
+            if not track_subs:
+                del self._track_subscribers[sub.track]
+        return sub
+
+    def _release_stream(self, stream_id: int) -> None:
+        """Forget the owning session and role of a finished stream (connection level)."""
+        self._stream_sessions.pop(stream_id, None)
+        self._stream_roles.pop(stream_id, None)
+
+    def _remove_data_stream(self, stream_id: int) -> Optional[DataStream]:
+        """Drop receive state for a finished, reset or timed out data stream."""
+        data_stream = self._data_streams.pop(stream_id, None)
+        if data_stream is None:
+            return None
+        self._conn._release_stream(stream_id)
+        if data_stream.subscription is not None:
+            data_stream.subscription.streams.discard(stream_id)
+            data_stream.subscription = None
+        logger.debug(f"MOQT stream({stream_id}): removed data stream")
+        return data_stream
     
     def _control_task_done(self, task: asyncio.Task) -> None:
         """Remove control task from set."""
@@ -133,6 +486,9 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             e = task.exception()
             if e: logger.error(f"MOQT error: control task failed with exception: {e}")
 
+    def _subscribe_task_done(self, subscribe_id: int, task: asyncio.Task) -> None:
+        self._pending_subscribes.discard(subscribe_id)  # handler finished without recording it
+
     def _endpoint_match(self, path: Union[bytes,str]):
         endpoint = getattr(self._session, 'endpoint')
         if endpoint is None:
@@ -143,9 +499,9 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         if isinstance(path, bytes):
             path = path.decode('utf-8')
             
-        # Strip trailing slashes
-        endpoint = endpoint.rstrip('/')
-        path = path.rstrip('/')
+        # Strip leading and trailing slashes
+        endpoint = endpoint.strip('/')
+        path = path.strip('/')
         
         return endpoint == path
             
@@ -184,12 +540,21 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             #assert start_pos + msg_len == (buf.tell())
             logger.info(f"MOQT event: control message parsed: {msg})")
 
+            if msg_type in (MOQTMessageType.SUBSCRIBE, MOQTMessageType.FETCH) \
+                    and not self._accept_subscribe_id(msg.subscribe_id):
+                return msg
+            if msg_type in self._request_limits and not self._admit_request(msg):
+                return msg
+
             # Schedule handler if one exists
             if handler is not None:
                 logger.debug(f"MOQT event: creating handler task: {handler.__name__}")
                 task = asyncio.create_task(handler(self, msg))
                 task.add_done_callback(self._control_task_done)
                 self._tasks.add(task)
+                if msg_type in (MOQTMessageType.SUBSCRIBE, MOQTMessageType.FETCH):
+                    self._pending_subscribes.add(msg.subscribe_id)  # counted against max_subscriptions until recorded
+                    task.add_done_callback(partial(self._subscribe_task_done, msg.subscribe_id))
                 
             return msg
 
@@ -198,21 +563,52 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             raise
  
     def _stream_task_done(self, stream_id: int, task: asyncio.Task) -> None:
-        """Remove stream task from dict."""
-        if stream_id in self._stream_tasks:
-            del self._stream_tasks[stream_id]
-        else:
+        """Clean up data stream state when its processing task exits."""
+        data_stream = self._data_streams.get(stream_id)
+        if data_stream is None:
             logger.error(f"MOQT error: _stream_task_done: stream does not exist: {stream_id}")
+        else:
+            data_stream.task = None
+            if data_stream.timer is not None:
+                data_stream.timer.cancel()
+            # hold state until FIN/reset so late data is not taken for a new stream
+            if data_stream.fin or data_stream.reset or self._close_err is not None:
+                self._remove_data_stream(stream_id)
         if task.cancelled():
             logger.warning("MOQT warn: stream task cancelled")
         else:
             e = task.exception()
             if e: logger.error(f"MOQT error: stream task failed with exception: {e}")
  
+    def _stop_data_stream(self, stream_id: int, error_code: int) -> None:
+        """Ask the peer to stop sending on a data stream and drop its state."""
+        data_stream = self._data_streams.get(stream_id)
+        if data_stream is None:
+            return
+        data_stream.reset = True
+        try:
+            self._quic.stop_stream(stream_id, error_code)
+            self.transmit()
+        except ValueError as e:
+            logger.debug(f"MOQT stream({stream_id}): stop stream: {e}")
+
+    def _data_stream_idle(self, stream_id: int) -> None:
+        """Timer wheel callback: no data on the stream for its idle timeout."""
+        data_stream = self._data_streams.get(stream_id)
+        if data_stream is None or data_stream.task is None:
+            return
+        logger.warning(f"MOQT stream({stream_id}): idle timeout: {data_stream.header}")
+        self._stop_data_stream(stream_id, SessionCloseCode.DATA_STREAM_TIMEOUT)
+        data_stream.queue.put_nowait(None)
+
     # task for processing data streams
     async def _process_data_stream(self, stream_id: int) -> None:
         ''' Subgroup stream data processing task '''
-        re_buf = Buffer(capacity=(1024*1024*2))  # pre-allocate large buffer accumulator
+        data_stream = self._data_streams[stream_id]
+        queue = data_stream.queue
+        timer = data_stream.timer
+        # unparsed tail of earlier chunks (zero copy views), joined once enough data arrived
+        pending: List[memoryview] = []
         cur_pos: int = 0
         consumed: int = 0
         needed: int = 0
@@ -220,42 +616,35 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         subgroup_id = None
         object_id = None
         while True:
-            try:
-                while True:
-                    async with asyncio.timeout(MOQT_IDLE_STREAM_TIMEOUT):
-                        msg_buf = await self._stream_queues[stream_id].get()
-                        
-                    if msg_buf is None:  # Sentinel done value - return
-                        logger.debug(f"MOQT stream({stream_id}): queue closed: task shutdown")
-                        return
-                    
-                    cur_pos = msg_buf.tell()
-                    msg_len = msg_buf.capacity
-
-                    if msg_len < needed:
-                        needed -= msg_len
-                        re_buf.push_bytes(msg_buf.data_slice(cur_pos, msg_len))
-                        have = re_buf.tell()
-                        logger.debug(f"MOQT stream({stream_id}): data added: len: {msg_len} have: {have} still need: {needed}")
-                    elif cur_pos == msg_len:
-                        continue  # special case where the stream id is all we got - next
-                    else:
-                        logger.debug(f"MOQT stream({stream_id}): data received: pos: {cur_pos} len: {msg_len} needed: {needed}")
-                        break
-                        
-            except asyncio.TimeoutError:
-                logger.warning(f"MOQT stream({stream_id}): idle timeout: {group_id}.{subgroup_id}.{object_id}")
-                return
+            while True:
+                msg_buf = await queue.get()
+                if msg_buf is None:  # Sentinel done value - return
+                    logger.debug(f"MOQT stream({stream_id}): queue closed: task shutdown")
+                    return
+                if timer is not None:
+                    timer.touch()
+
+                cur_pos = msg_buf.tell()
+                msg_len = msg_buf.capacity
+
+                if msg_len - cur_pos < needed:
+                    needed -= msg_len - cur_pos
+                    pending.append(msg_buf.view(cur_pos))
+                    logger.debug(f"MOQT stream({stream_id}): data added: len: {msg_len} still need: {needed}")
+                elif cur_pos == msg_len:
+                    continue  # special case where the stream id is all we got - next
+                else:
+                    logger.debug(f"MOQT stream({stream_id}): data received: pos: {cur_pos} len: {msg_len} needed: {needed}")
+                    break
             
-            # if more data was needed, add it to re_buf accumulator and reprocess
-            if needed > 0:
-                re_buf.push_bytes(msg_buf.data_slice(cur_pos,msg_buf.capacity))
-                msg_len = re_buf.tell()
-                msg_buf = re_buf  # process accumulator, GC msg_buf
-                msg_buf.seek(0)
+            # if more data was needed, join the saved tail with this chunk and reprocess
+            if pending:
+                pending.append(msg_buf.view(cur_pos))
+                msg_buf = BufferReader(b"".join(pending))
+                pending.clear()
+                msg_len = msg_buf.capacity
                 cur_pos = 0
                 needed = 0
-                
 
             while cur_pos < msg_len:
                 logger.debug(f"MOQT stream({stream_id}): process message: pos: {cur_pos} len: {msg_len}")
@@ -264,7 +653,7 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
                     msg_obj = self._moqt_handle_data_stream(stream_id, msg_buf, msg_len)
                 except MOQTUnderflow as e:
                     logger.debug(f"MOQT MOQTUnderflow({stream_id}): at pos: {e.pos} need: {e.needed}")
-                    needed = e.needed
+                    needed = e.needed - cur_pos  # e.needed is the object end position in msg_buf
                     break
                 except BufferReadError as e:
                     logger.debug(f"MOQT BufferReadError({stream_id}): cur_pos: {cur_pos} tell: {msg_buf.tell()}")
@@ -291,7 +680,6 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
                     if status != ObjectStatus.NORMAL:
                         if msg_obj.status in (ObjectStatus.END_OF_GROUP, ObjectStatus.END_OF_TRACK):
                                 logger.info(f"MOQT stream({stream_id}): {logstr}")
-                                self._stream_queues[stream_id].closed = True
                                 return
                     logger.info(f"MOQT stream({stream_id}): {logstr}")
                 elif isinstance(msg_obj, SubgroupHeader):
@@ -305,14 +693,10 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
 
             if needed > 0:
                 have = msg_len - cur_pos
-                # yuck - python memove - custom stream reader in progress
-                saved_bytes = msg_buf.data_slice(cur_pos, msg_len)
                 if have < needed:  # we might not know how much we need
                     needed -= have
-                re_buf.seek(0)
-                re_buf.push_bytes(saved_bytes)
+                pending.append(msg_buf.view(cur_pos))
                 logger.debug(f"MOQT stream({stream_id}): saved {have} bytes still need: {needed}")
-                cur_pos = 0
 
     def _moqt_handle_data_stream(self, stream_id: int, buf: Buffer, len: int) -> MOQTMessage:
         """Process incoming data messages (not control messages)."""
@@ -323,8 +707,9 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         try:
             pos = buf.tell()
             msg_header = None
-            # new data streams will not yet have an entry
-            if self._data_streams.get(stream_id) is None:
+            data_stream = self._data_streams[stream_id]
+            # new data streams will not yet have a header
+            if data_stream.header is None:
                 # Get stream type from first byte
                 stream_type = buf.pull_uint_var()
                 if stream_type == DataStreamType.SUBGROUP_HEADER:
@@ -346,13 +731,26 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
                 # record that the data stream header has been processed
                 consumed = buf.tell() - pos            
                 logger.debug(f"MOQT stream({stream_id}): {msg_header} consumed: {consumed} bytes")
-                self._data_streams[stream_id] = msg_header
+                data_stream.header = msg_header
+                # associate the stream with its subscription
+                if isinstance(msg_header, SubgroupHeader):
+                    sub = self._track_aliases.get(msg_header.track_alias)
+                else:
+                    sub = self._subscriptions.get(msg_header.subscribe_id)
+                if sub is not None:
+                    sub.streams.add(stream_id)
+                    data_stream.subscription = sub
+                    if sub.idle_timeout is not None and data_stream.timer is not None:
+                        data_stream.timer.timeout = sub.idle_timeout
+                        data_stream.timer.touch()
+                else:
+                    logger.warning(f"MOQT stream({stream_id}): no subscription for {msg_header}")
             else:
-                if isinstance(self._data_streams[stream_id], SubgroupHeader):
-                    msg_header = ObjectHeader.deserialize(buf, len)
+                if isinstance(data_stream.header, SubgroupHeader):
+                    msg_header = ObjectHeader.deserialize(buf, len, self._codec)
 
-                elif isinstance(self._data_streams[stream_id], FetchHeader):
-                    msg_header = FetchObject.deserialize(buf)
+                elif isinstance(data_stream.header, FetchHeader):
+                    msg_header = FetchObject.deserialize(buf, self._codec)
 
                 if msg_header is None:
                     error = f"MOQT stream({stream_id}): ObjectHeader parse failed at: {buf.tell()}"
@@ -377,7 +775,7 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         pos = buf.tell()
         dgram_type = buf.pull_uint_var()
         if dgram_type == DatagramType.OBJECT_DATAGRAM:
-            msg = ObjectDatagram.deserialize(buf,buf.capacity)
+            msg = ObjectDatagram.deserialize(buf, buf.capacity, self._codec)
             if msg is None:
                 error = f"datagram parsing failed at: {buf.tell()}"
                 logger.error(f"MOQT error: " + error)
@@ -396,7 +794,7 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             logger.info(f"MOQT event: ObjectDatagram: {logstr}")
             return msg            
         elif dgram_type == DatagramType.OBJECT_DATAGRAM_STATUS:
-            msg = ObjectDatagramStatus.deserialize(buf)
+            msg = ObjectDatagramStatus.deserialize(buf, self._codec)
             if msg is None:
                 error = f"datagram parsing failed at: {buf.tell()}"
                 logger.error(f"MOQT error: " + error)
@@ -419,127 +817,249 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             self._close_session(SessionCloseCode.PROTOCOL_VIOLATION, error)
             return
     
-    # def transmit(self) -> None:
-    #     """Transmit pending data."""
-    #     logger.debug("Transmitting data")
-    #     super().transmit()
+    def transmit(self) -> None:
+        """Send pending QUIC data, handing queued data stream writes to QUIC in priority order.
+
+        aioquic serves streams round robin, so send_stream_data() queues the
+        writes of data streams opened for peer subscriptions (create_data_stream
+        with a subscribe_id) in the session instead. They are handed to QUIC
+        in (subscriber priority, publisher priority) order, lower first, while
+        less than MOQT_SEND_WINDOW bytes wait unsent in QUIC, and refilled as
+        long as QUIC sends it all. Higher priority data written later only
+        waits behind that window, and a SUBSCRIBE_UPDATE takes effect on all
+        data still queued. Control streams are not queued.
+        """
+        if not self._send_queues:
+            super().transmit()
+            return
+        while True:
+            self._release_stream_data()
+            super().transmit()
+            if not self._send_queues or self._send_backlog:
+                return
+
+    def _release_stream_data(self) -> None:
+        """Hand queued data stream writes to QUIC, highest priority first, up to the send window."""
+        budget = MOQT_SEND_WINDOW - self._send_backlog
+        if budget <= 0:
+            return
+        queues = self._send_queues
+        priorities = self._send_priorities
+        def order(stream_id: int) -> Tuple[int, int, int]:
+            sub, publisher_priority = priorities[stream_id]
+            return (sub.priority, publisher_priority, stream_id)
+
+        quic = self._quic
+        for stream_id in sorted(queues, key=order):
+            queue = queues[stream_id]
+            while queue and budget > 0:
+                data, end_stream = queue[0]
+                if len(data) > budget:  # the rest waits for the next window
+                    data = memoryview(data)
+                    queue[0] = (data[budget:], end_stream)
+                    data, end_stream = data[:budget], False
+                else:
+                    queue.popleft()
+                try:
+                    quic.send_stream_data(stream_id, bytes(data), end_stream=end_stream)
+                except RuntimeError as e:  # reset by the peer (STOP_SENDING) or already finished
+                    logger.debug(f"MOQT stream({stream_id}): dropping queued data: {e}")
+                    queue.clear()
+                    break
+                budget -= len(data)
+                self._send_backlog += len(data)
+                if end_stream:
+                    priorities.pop(stream_id)[0].streams.discard(stream_id)
+            if not queue:
+                del queues[stream_id]
+            if budget <= 0:
+                break
+
+    def _write_stream_data(self, stream_id: int, queue: Iterable[Tuple[bytes, bool]]) -> None:
+        """Hand a data stream's queued writes to QUIC without prioritizing them."""
+        try:
+            for data, end_stream in queue:
+                self._quic.send_stream_data(stream_id, bytes(data), end_stream=end_stream)
+        except RuntimeError as e:
+            logger.debug(f"MOQT stream({stream_id}): dropping queued data: {e}")
+
+    def _schedule_data_stream(self, stream_id: int, subscribe_id: int, publisher_priority: int) -> None:
+        """Send a data stream at the priority of the peer subscription it delivers."""
+        sub = self._subscribers.get(subscribe_id)
+        if sub is None:
+            logger.warning(f"MOQT event: data stream {stream_id}: unknown subscribe id: {subscribe_id}")
+            return
+        sub.streams.add(stream_id)
+        self._conn._send_priorities[stream_id] = (sub, publisher_priority)
+
+    def datagram_received(self, data: bytes, addr: Tuple) -> None:
+        super().datagram_received(data, addr)
+        limit = self._data_stream_limit
+        if limit is not None and getattr(self._quic, '_remote_max_streams_uni', limit) != limit:
+            self._data_stream_credit_check()  # MAX_STREAMS received
 
     def connection_made(self, transport):
         """Called when QUIC connection is established."""
-        super().connection_made(transport)
-        self._h3 = H3CustomConnection(self._quic, table_capacity=4096, enable_webtransport=True)
-        logger.info("H3 connection initialized")
+        super().connection_made(_SendCounter(transport, self))
+
+    @property
+    def early_data(self) -> bool:
+        """Client resuming a TLS session with 0-RTT: data is sent before the handshake completes."""
+        tls = getattr(self._quic, 'tls', None)
+        ticket = tls.session_ticket if tls is not None and self._quic.configuration.is_client else None
+        return ticket is not None and ticket.max_early_data_size is not None
+
+    def connect(self, addr, transmit: bool = True) -> None:
+        """Initiate the handshake; when resuming with 0-RTT set up the transport right away."""
+        super().connect(addr, transmit=False)
+        alpn_protocols = self._quic.configuration.alpn_protocols or []
+        if self.early_data and len(alpn_protocols) == 1:
+            # the resumed session keeps its ALPN, so the setup can go out as 0-RTT data
+            logger.debug(f"QUIC: 0-RTT resumption: ALPN: {alpn_protocols[0]}")
+            self._protocol_negotiated(alpn_protocols[0])
+        if transmit:
+            self.transmit()
+
+    def _protocol_negotiated(self, alpn_protocol: Optional[str]) -> bool:
+        """Set up the session transport for the negotiated ALPN."""
+        if alpn_protocol in H3_ALPN:
+            if self._h3 is not None:
+                return True  # already set up for 0-RTT
+            self._h3 = H3CustomConnection(self._quic, table_capacity=4096, enable_webtransport=True)
+            logger.info("H3 connection initialized")
+        elif alpn_protocol == MOQT_ALPN:
+            # no H3 layer: the first bidi stream is the control stream
+            self._raw_quic = True
+            if not self._quic.configuration.is_client and not self._wt_session_setup.done():
+                self._wt_session_setup.set_result(True)
+            logger.info("MOQT: raw QUIC session initialized")
+        else:
+            return False
+        return True
 
     # primary event handling for all QUIC messaging
     def quic_event_received(self, event: QuicEvent) -> None:
-        """Handle incoming QUIC events."""
-        
-        event_class = class_name(event)
-
-        # QUIC errors terminate the session
-        if hasattr(event, 'error_code'):  # Log any errors
-            error = getattr(event, 'error_code', QuicErrorCode.INTERNAL_ERROR)
-            reason = getattr(event, 'reason_phrase', event_class)
-            logger.error(f"QUIC error: code: {error} reason: {reason}")
-            self._close_session(error, reason)
+        """Handle incoming QUIC events via the per-event-type handler table."""
+        handler = self._quic_event_handlers.get(event.__class__)
+        if handler is None:
+            handler = self._quic_event_handler(event.__class__)
+        handler(event)
+
+    def _quic_event_handler(self, event_type: Type[QuicEvent]) -> Callable[[QuicEvent], None]:
+        """Resolve and cache the handler for an event type missing from the registry."""
+        if 'error_code' in getattr(event_type, '__dataclass_fields__', ()):
+            handler = self._quic_error_event  # QUIC errors terminate all sessions on the connection
+        else:
+            handler = self._quic_h3_event
+        self._quic_event_handlers[event_type] = handler
+        return handler
+
+    def _quic_protocol_negotiated(self, event: ProtocolNegotiated) -> None:
+        # Enforce supported ALPN
+        if self._protocol_negotiated(event.alpn_protocol):
+            logger.debug(f"QUIC event: ALPN ProtocolNegotiated: {event.alpn_protocol}")
+        else:
+            logger.error(f"QUIC error: unknown ALPN: {event.alpn_protocol}")
+            self._close_session(
+                SessionCloseCode.UNAUTHORIZED, 
+                f"unsupported ALPN: {event.alpn_protocol}"
+            )
+
+    def _quic_stream_data(self, event: StreamDataReceived) -> None:
+        """Route stream data by the cached role of the stream."""
+        stream_id = event.stream_id
+        role = self._stream_roles.get(stream_id)
+        if role is StreamRole.DATA:
+            self._stream_sessions[stream_id]._data_stream_received(
+                stream_id, BufferReader(event.data), event.end_stream)
+        elif role is StreamRole.CONTROL:
+            self._stream_sessions[stream_id]._control_stream_received(
+                stream_id, Buffer(data=event.data), event.end_stream)
+        elif role is None:
+            self._quic_new_stream_data(event)
+        elif role is StreamRole.H3:
+            self._wt_stream_end(event)
+            self._quic_h3_event(event)
+        # StreamRole.IGNORED: drop
+
+    def _quic_new_stream_data(self, event: StreamDataReceived) -> None:
+        """Route the first data of a stream and cache its role."""
+        stream_id = event.stream_id
+        if not self._wt_session_setup.done():
+            self._stream_roles[stream_id] = StreamRole.H3
+            self._quic_h3_event(event)
             return
-        
-        # data_len = len(event.data) if hasattr(event, 'data') else 0
-        # logger.debug(f"QUIC event: {event_class}: len: {data_len} bytes")
-        
-        if isinstance(event, ProtocolNegotiated):
-            # Enforce supported ALPN
-            if event.alpn_protocol in H3_ALPN:
-                logger.debug(f"QUIC event: ALPN ProtocolNegotiated: {event.alpn_protocol}")
-            elif event.alpn_protocol == "moq-00":
-                # XXX - handle QUIC connection
-                logger.debug(f"QUIC event: ALPN ProtocolNegotiated alpn: {event.alpn_protocol}")
+        if self._closed.is_set():
+            logger.warning(f"QUIC event: stream data after close: stream: {stream_id}")
+            return
+        self._wt_stream_end(event)
+
+        msg_buf = BufferReader(event.data)
+        session = self._stream_sessions.get(stream_id)
+        if session is None:
+            if self._raw_quic:
+                session = self
+            elif len(event.data) == 0:
+                return  # nothing to route, e.g. a bare FIN
             else:
-                logger.error(f"QUIC error: unknown ALPN: {event.alpn_protocol}")
-                self._close_session(
-                    SessionCloseCode.UNAUTHORIZED, 
-                    f"unsupported ALPN: {event.alpn_protocol}"
-                )
+                # new stream: WebTransport streams start with a type and the session id
+                stream_type = msg_buf.pull_uint_var()
+                wt_type = WT_STREAM_UNI if stream_is_unidirectional(stream_id) else WT_STREAM_BIDI
+                if stream_type == wt_type:
+                    session_id = msg_buf.pull_uint_var()
+                    session = self._wt_sessions.get(session_id)
+                    if session is None:
+                        logger.warning(f"MOQT event: stream({stream_id}) for unknown session: {session_id}")
+                        return
+        if session is not None:
+            self._stream_sessions[stream_id] = session
+            session._stream_data_received(stream_id, msg_buf, event.end_stream)
             return
-        elif isinstance(event, StreamDataReceived) and self._wt_session_setup.done():
-            if self._closed.is_set() or self._close_err is not None:
-                close_condition = f"MOQT: {self._close_err} QUIC: {self._closed.is_set()}"
-                logger.warning(f"QUIC event: stream data after close: " + close_condition)
-                return
-            
-            # Detect abrupt closure of critical streams
-            stream_id = event.stream_id
-            if (event.end_stream and len(event.data) == 0 and
-                stream_id in [self._control_stream_id, self._session_id]):
-                self._close_session(
-                    SessionCloseCode.INTERNAL_ERROR, 
-                    f"critical stream closed by remote peer: {stream_id}"
+        # any other stream belongs to HTTP/3
+        self._stream_roles[stream_id] = StreamRole.H3
+        self._quic_h3_event(event)
+
+    def _wt_stream_end(self, event: StreamDataReceived) -> None:
+        if event.end_stream:
+            wt_session = self._wt_sessions.get(event.stream_id)
+            if wt_session is not None:
+                # the WebTransport session (CONNECT) stream ends the session
+                wt_session._close_session(
+                    SessionCloseCode.INTERNAL_ERROR,
+                    f"critical stream closed by remote peer: {event.stream_id}"
                 )
-                return
-            
-            msg_buf = Buffer(data=event.data)
-            msg_len = msg_buf.capacity
-            # logger.debug(f"MOQT event: StreamDataReceived: stream: {stream_id} (0x{msg_buf.data_slice(0, min(msg_len,16)).hex()}...)")
-            
-            # Handle possible MoQT control stream 
-            if not stream_is_unidirectional(stream_id):
-                # Assume first bidi stream is MoQT control stream
-                if self._control_stream_id is None:
-                    self._control_stream_id = stream_id
-                    # strip of initial WT stream identifier
-                    msg_buf.pull_uint_var()
-                    msg_buf.pull_uint_var()
-                elif stream_id != self._control_stream_id:
-                    # XXX ignore additional bidi stream for now - for now
-                    logger.warning(f"MOQT event: unrecognized bidirectional stream({stream_id}):")
-                    return                      
-                        
-            # Handle MoQT control messages
-            if stream_id == self._control_stream_id:
-                # XXX handle underflow in control stream as well
-                while msg_buf.tell() < msg_len:
-                    msg = self._moqt_handle_control_message(msg_buf)
-                    if msg is None:
-                        error = f"control stream: parsing failed at position: {msg_buf.tell()} of {msg_len} bytes"
-                        logger.error(f"MOQT error: " + error)
-                        self._close_session(SessionCloseCode.PROTOCOL_VIOLATION, error)
-                        break
-                return
 
-            # Handle MoQT data messages
-            if stream_is_unidirectional(stream_id):
-                if stream_id not in self._data_streams:
-                    # strip of initial H3/WT stream identifier
-                    msg_buf.pull_uint_var()
-                    msg_buf.pull_uint_var()
-                    # record the stream exists and stream id stripped
-                    self._data_streams[stream_id] = None
-                    # create a handler task for this stream
-                    assert stream_id not in self._stream_tasks
-                    task = asyncio.create_task(self._process_data_stream(stream_id))
-                    self._stream_tasks[stream_id] = task
-                    task.add_done_callback(partial(self._stream_task_done, stream_id))
-                    logger.debug(f"MOQT event: creating _process_data_stream task: {stream_id}")
-                    
-                # Queue the event data buffer for processing
-                if msg_buf.tell() < msg_len:
-                    logger.debug(f"MOQT event: pushing data on stream: {stream_id} pos: {msg_buf.tell()} len: {msg_len}")
-                    self._stream_queues[stream_id].put_nowait(msg_buf)
-                else:
-                    logger.debug(f"MOQT event: skipping empty data: {stream_id} pos: {msg_buf.tell()} len: {msg_len}")
-                    
+    def _quic_datagram(self, event: DatagramFrameReceived) -> None:
+        if not self._wt_session_setup.done():
+            self._quic_h3_event(event)
+            return
+        msg_buf = BufferReader(event.data)
+        session = self
+        if not self._raw_quic:
+            # WT datagrams are prefixed with the quarter session (stream) id
+            session = self._wt_sessions.get(msg_buf.pull_uint_var() * 4)
+            if session is None:
+                logger.warning(f"MOQT event: datagram for unknown session")
                 return
+        session._moqt_handle_data_dgram(msg_buf)
 
-        elif isinstance(event, DatagramFrameReceived) and self._wt_session_setup.done():
-            msg_buf = Buffer(data=event.data)
-            msg_len = msg_buf.capacity
-            logger.debug(f"MOQT event: DatagramFrameReceived: 0x{msg_buf.data_slice(0,min(msg_len,16)).hex()}")
-            # strip off some QUIC quarter identifier
-            msg_buf.pull_uint_var()
-            self._moqt_handle_data_dgram(msg_buf)
+    def _quic_stream_reset(self, event: StreamReset) -> None:
+        # Reset of a data stream only ends that stream
+        session = self._stream_sessions.get(event.stream_id)
+        if session is not None and event.stream_id in session._data_streams:
+            session._data_stream_reset(event.stream_id, event.error_code)
             return
-                      
-        # Pass remaining events to H3
+        self._quic_error_event(event)
+
+    def _quic_error_event(self, event: QuicEvent) -> None:
+        error = getattr(event, 'error_code', QuicErrorCode.INTERNAL_ERROR)
+        reason = getattr(event, 'reason_phrase', class_name(event))
+        logger.error(f"QUIC error: code: {error} reason: {reason}")
+        for session in self.sessions:
+            session._close_session(error, reason)
+
+    def _quic_h3_event(self, event: QuicEvent) -> None:
+        """Pass remaining events to H3."""
         if self._h3 is not None:
             settings = self._h3.received_settings
             try:
@@ -555,8 +1075,109 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             except Exception as e:
                 logger.error(f"H3 error: error handling event: {e}")
                 raise
+        elif self._raw_quic:
+            logger.debug(f"QUIC event: {class_name(event)}")  # no H3 layer in raw QUIC mode
+        else:
+            logger.error(f"QUIC event: event not handled({class_name(event)})")
+
+    def _data_stream_reset(self, stream_id: int, error_code: int) -> None:
+        """Peer reset of a data stream only ends that stream."""
+        logger.info(f"MOQT stream({stream_id}): reset by peer: {error_code}")
+        data_stream = self._data_streams[stream_id]
+        data_stream.reset = True
+        if data_stream.task is None:
+            self._remove_data_stream(stream_id)
+        else:
+            data_stream.queue.put_nowait(None)
+
+    def _stream_data_received(self, stream_id: int, msg_buf: BufferReader, end_stream: bool) -> None:
+        """Handle the first data of a stream routed to this MoQT session (WebTransport
+        stream prefix already removed) and cache the stream role for later data."""
+        if self._close_err is not None:
+            logger.warning(f"QUIC event: stream data after close: MOQT: {self._close_err}")
+            return
+        roles = self._conn._stream_roles
+        # Handle possible MoQT control stream 
+        if not stream_is_unidirectional(stream_id):
+            # Assume first bidi stream is MoQT control stream
+            if self._control_stream_id is None:
+                self._control_stream_id = stream_id
+            elif stream_id != self._control_stream_id:
+                # XXX ignore additional bidi stream for now - for now
+                logger.warning(f"MOQT event: unrecognized bidirectional stream({stream_id}):")
+                roles[stream_id] = StreamRole.IGNORED
+                self._conn._stream_sessions.pop(stream_id, None)
+                return
+            roles[stream_id] = StreamRole.CONTROL
+            # control messages are parsed from an aioquic Buffer
+            msg_buf = Buffer(data=msg_buf.data_slice(msg_buf.tell(), msg_buf.capacity))
+            self._control_stream_received(stream_id, msg_buf, end_stream)
+            return
+        roles[stream_id] = StreamRole.DATA
+        self._grant_data_streams()
+        self._data_stream_received(stream_id, msg_buf, end_stream)
+
+    def _control_stream_received(self, stream_id: int, msg_buf: Buffer, end_stream: bool) -> None:
+        """Handle MoQT control messages."""
+        if self._close_err is not None:
+            logger.warning(f"QUIC event: stream data after close: MOQT: {self._close_err}")
+            return
+        msg_len = msg_buf.capacity
+        # Detect abrupt closure of critical streams
+        if end_stream and msg_len == 0:
+            self._close_session(
+                SessionCloseCode.INTERNAL_ERROR, 
+                f"critical stream closed by remote peer: {stream_id}"
+            )
+            return
+        # XXX handle underflow in control stream as well
+        while msg_buf.tell() < msg_len:
+            msg = self._moqt_handle_control_message(msg_buf)
+            if msg is None:
+                error = f"control stream: parsing failed at position: {msg_buf.tell()} of {msg_len} bytes"
+                logger.error(f"MOQT error: " + error)
+                self._close_session(SessionCloseCode.PROTOCOL_VIOLATION, error)
+                break
+
+    def _data_stream_received(self, stream_id: int, msg_buf: BufferReader, end_stream: bool) -> None:
+        """Handle MoQT data messages."""
+        if self._close_err is not None:
+            logger.warning(f"QUIC event: stream data after close: MOQT: {self._close_err}")
+            return
+        msg_len = msg_buf.capacity
+        data_stream = self._data_streams.get(stream_id)
+        if data_stream is None:
+            if msg_buf.tell() == msg_len:  # nothing to process, e.g. a bare FIN
+                if end_stream:
+                    self._conn._release_stream(stream_id)
+                return
+            # record the stream exists
+            data_stream = DataStream(stream_id)
+            self._data_streams[stream_id] = data_stream
+            data_stream.timer = self._timers.call_later(
+                self.idle_stream_timeout, self._data_stream_idle, stream_id)
+            # create a handler task for this stream
+            task = asyncio.create_task(self._process_data_stream(stream_id))
+            data_stream.task = task
+            task.add_done_callback(partial(self._stream_task_done, stream_id))
+            logger.debug(f"MOQT event: creating _process_data_stream task: {stream_id}")
+        elif data_stream.task is None:
+            # stream processing is complete - drop state once the peer finishes
+            if end_stream:
+                self._remove_data_stream(stream_id)
+            return
+            
+        # Queue the event data buffer for processing
+        if msg_buf.tell() < msg_len:
+            logger.debug(f"MOQT event: pushing data on stream: {stream_id} pos: {msg_buf.tell()} len: {msg_len}")
+            data_stream.queue.put_nowait(msg_buf)
         else:
-            logger.error(f"QUIC event: event not handled({event_class})")
+            logger.debug(f"MOQT event: skipping empty data: {stream_id} pos: {msg_buf.tell()} len: {msg_len}")
+
+        # FIN - queue sentinel to end the stream task
+        if end_stream:
+            data_stream.fin = True
+            data_stream.queue.put_nowait(None)
   
     def _h3_handle_event(self, event: QuicEvent) -> None:
         """Handle H3-specific events."""
@@ -594,18 +1215,26 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
                 status = value
                 
         if is_client:
+            session = self._wt_sessions.get(stream_id, self)
             if status == b"200":
                 logger.debug(f"H3 event: WebTransport client session setup: session id: {stream_id}")
-                self._wt_session_setup.set_result(True)
+                session._wt_session_setup.set_result(True)
             else:
                 error = f"WebTransport session setup failed ({status})"
                 logger.error(f"H3 error: stream {stream_id}: " + error)
-                self._close_session(ErrorCode.H3_CONNECT_ERROR, error)
+                session._close_session(ErrorCode.H3_CONNECT_ERROR, error)
         else:
             # Server: Handle incoming WebTransport CONNECT request
             if method == b"CONNECT" and protocol == b"webtransport":
                 if self._endpoint_match(path):
-                    self._session_id = stream_id
+                    if self._session_id is None:
+                        self._session_id = stream_id
+                        self._wt_sessions[stream_id] = self
+                    else:
+                        # additional MoQT session sharing this QUIC connection
+                        session = self._create_wt_session(stream_id)
+                        logger.info(f"H3 event: WebTransport session added: session id: {stream_id} "
+                                    f"sessions: {len(self._wt_sessions)}")
                     # Send 200 response with WebTransport headers
                     response_headers = [
                         (b":status", b"200"),
@@ -619,7 +1248,8 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
                     )
                     self.transmit()
                     logger.debug(f"H3 event: WebTransport server session setup: session id: {stream_id}")
-                    self._wt_session_setup.set_result(True)
+                    if not self._wt_session_setup.done():
+                        self._wt_session_setup.set_result(True)
                 else:
                     # Endpoint doesn't match, return 404
                     logger.warning(f"H3 event: path not found: {path}")
@@ -654,10 +1284,14 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         logger.error(f"MOQT error: closing: {reason_phrase} ({error_code})")
         self._close_err = (error_code, reason_phrase)
 
+        # Withdraw our announce prefixes and namespaces from the routing state
+        for namespace in self._namespaces.discard(self):
+            self._route_announce(namespace, announce=False)
+
         # Signal all stream tasks to shut down gracefully with sentinel value
-        for stream_id in list(self._stream_tasks.keys()):
-            if stream_id in self._stream_queues:
-                self._stream_queues[stream_id].put_nowait(None)
+        for data_stream in list(self._data_streams.values()):
+            if data_stream.task is not None:
+                data_stream.queue.put_nowait(None)
                 
         if not self._wt_session_setup.done():
             self._wt_session_setup.set_result(False)
@@ -665,6 +1299,13 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             self._moqt_session_setup.set_result(False)
         if not self._moqt_session_closed.done():
             self._moqt_session_closed.set_result((error_code, reason_phrase))
+        # wake open_data_stream() waiters, they raise the close error
+        waiter, self._conn._data_stream_credit = self._conn._data_stream_credit, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(0)
+        # new streams for an ended WebTransport session are no longer accepted
+        if self._conn is not self:
+            self._conn._wt_sessions.pop(self._session_id, None)
         
     def close(self, 
               error_code: SessionCloseCode = SessionCloseCode.NO_ERROR, 
@@ -674,6 +1315,19 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         if self._close_err is not None:
             error_code, reason_phrase =  self._close_err
         logger.info(f"MOQT session: closing: {reason_phrase} ({error_code})")
+        if self._conn is not self:
+            # additional WebTransport session: end it and keep the QUIC connection
+            if self._h3 is not None and self._session_id is not None and not self._h3._is_done:
+                self._h3.send_data(self._session_id, b"", end_stream=True)
+            if self._close_err is None:
+                self._close_session(error_code, reason_phrase)
+            self._h3 = None
+            self.transmit()
+            return
+        # closing the connection ends every session on it
+        for session in self.sessions:
+            if session is not self and session._close_err is None:
+                session._close_session(error_code, reason_phrase)
         if self._session_id is not None:
             self._h3._quic.close(QuicErrorCode.NO_ERROR)
             logger.debug(f"H3 session: closing: {class_name(self._h3)} ({self._session_id})  QUIC: {self._h3._is_done}")
@@ -696,9 +1350,24 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
 
 
     async def client_session_init(self, timeout: int = 10) -> bool:
-        """Initialize WebTransport and MoQT client session."""
+        """Initialize WebTransport (or raw QUIC) and MoQT client session."""
+        if self._h3 is None and not self._raw_quic:
+            await self.wait_connected()  # ALPN not yet known (e.g. 0-RTT offered with several)
+        setup_params = {SetupParamType.MAX_SUBSCRIBER_ID: self._setup_max_subscribe_id()}
+        if self._raw_quic:
+            # no WebTransport session - the control stream is the first client bidi stream
+            self._control_stream_id = self._quic.get_next_available_stream_id(is_unidirectional=False)
+            self._conn._stream_sessions[self._control_stream_id] = self
+            if not self._wt_session_setup.done():
+                self._wt_session_setup.set_result(True)
+            logger.info(f"MOQT: raw QUIC control stream id: {self._control_stream_id}")
+            setup_params[SetupParamType.ENDPOINT_PATH] = f"/{self._session.endpoint}".encode()
+            return await self._client_moqt_setup(setup_params, timeout)
+
         # Create WebTransport session
-        self._session_id = self._h3._quic.get_next_available_stream_id(is_unidirectional=False)
+        if self._session_id is None:
+            self._session_id = self._h3._quic.get_next_available_stream_id(is_unidirectional=False)
+        self._conn._wt_sessions[self._session_id] = self
 
         headers = [
             (b":method", b"CONNECT"),
@@ -736,13 +1405,13 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         
         # Create MoQT control stream
         self._control_stream_id = self._h3.create_webtransport_stream(session_id=self._session_id)
+        self._conn._stream_sessions[self._control_stream_id] = self
         logger.info(f"MOQT: control stream created stream id: {self._control_stream_id}")
+        return await self._client_moqt_setup(setup_params, timeout)
 
-        # Send CLIENT_SETUP
-        client_setup = self.client_setup(
-            versions=MOQT_VERSIONS,
-            parameters={SetupParamType.MAX_SUBSCRIBER_ID: MOQTMessage._varint_encode(1000)}
-        )
+    async def _client_moqt_setup(self, parameters: Dict[int, bytes], timeout: int) -> bool:
+        """Send CLIENT_SETUP on the control stream and wait for SERVER_SETUP."""
+        client_setup = self.client_setup(versions=MOQT_VERSIONS, parameters=parameters)
 
         # Wait for SERVER_SETUP
         session_setup = False
@@ -759,14 +1428,65 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             logger.error(f"MOQT error: session setup failed: {session_setup}")
             raise MOQTException(*self._close_err)
         
-        logger.info(f"MOQT session: setup complete: {result}")
-
+        logger.info(f"MOQT session: setup complete: version: 0x{self._moqt_version:x}")
+        return True
 
+    def _request_timeout_response(self, kind: int, id: Hashable) -> MOQTMessage:
+        """Synthetic error response for a request whose deadline expired."""
+        logger.error(f"Timeout waiting for {MOQTMessageType(kind).name} response: {id}")
+        if kind == MOQTMessageType.SUBSCRIBE:
+            return SubscribeError(
+                subscribe_id=id,
+                error_code=0x5,  # TIMEOUT error code
+                reason="Subscribe Response Timeout",
+                track_alias=0
+            )
+        elif kind == MOQTMessageType.FETCH:
+            return FetchError(subscribe_id=id, error_code=0x5, reason="Fetch Response Timeout")
+        elif kind == MOQTMessageType.ANNOUNCE:
+            return AnnounceError(namespace=id, error_code=0x5, reason="Response timeout")
+        elif kind == MOQTMessageType.TRACK_STATUS_REQUEST:
+            return TrackStatus(namespace=id.namespace, track_name=id.name,
+                               status_code=TrackStatusCode.RELAY_NO_INFO, last_group_id=0, last_object_id=0)
+        return SubscribeAnnouncesError(namespace_prefix=id, error_code=0x5, reason="Response timeout")
+
+    async def _authorize(self, msg: MOQTMessage, scope: Hashable) -> bool:
+        """Check the AUTHORIZATION_INFO of an incoming request (allowed without an authorizer)."""
+        authorizer = self._authorizer
+        if authorizer is None:
+            return True
+        token = (msg.parameters or {}).get(ParamType.AUTHORIZATION_INFO)
+        if await authorizer.authorize(token, msg.type, scope):
+            return True
+        logger.warning(f"MOQT event: unauthorized: {msg}")
+        return False
+
+    def _request(self, kind: int, id: Hashable, timeout: Optional[float]) -> Future:
+        return self._requests.add(kind, id, self.request_timeout if timeout is None else timeout)
+
+    @contextmanager
+    def control_batch(self) -> Iterator[None]:
+        """Coalesce the control messages sent in the block into one stream write and transmit."""
+        if self._control_batch is not None:
+            yield  # already batching
+            return
+        batch = self._control_batch = []
+        try:
+            yield
+        finally:
+            self._control_batch = None
+            if batch:
+                logger.debug(f"QUIC send: control messages: {len(batch)}")
+                self._quic.send_stream_data(self._control_stream_id, b"".join(batch), end_stream=False)
+                self.transmit()
 
     def send_control_message(self, buf: Buffer) -> None:
         """Send a MoQT message on the control stream."""
         if self._quic is None or self._control_stream_id is None:
             raise MOQTException(SessionCloseCode.INTERNAL_ERROR, "control stream not intialized")
+        if self._control_batch is not None:
+            self._control_batch.append(buf.data)
+            return
         
         logger.debug(f"QUIC send: control message: {buf.capacity} bytes")
 
@@ -778,17 +1498,193 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         self.transmit()
 
     def send_dgram_message(self, buf: Buffer) -> None:
-        """Send a MoQT message on the control stream."""
+        """Send a MoQT object datagram (prefixed with the WT quarter stream id unless raw QUIC)."""
         if self._quic is None:
             raise MOQTException(SessionCloseCode.INTERNAL_ERROR, "QUIC not intialized")
                 
         logger.debug(f"QUIC send: datagram message: {buf.capacity} bytes")
+        data = buf.data
+        if not self._raw_quic:
+            data = encode_uint_var(self._session_id // 4) + data
 
         self._quic.send_datagram_frame(
-            data=buf.data
+            data=data
         )
         self.transmit()
 
+    def _grant_data_streams(self) -> None:
+        """Keep max_data_streams peer uni streams available beyond those already opened.
+
+        Raises the connection's local MAX_STREAMS limit (sent with the next
+        packet) once less than half of the window is left, so subscribers
+        receiving many concurrent subgroup streams never wait on the limit.
+        """
+        limit = getattr(self._quic, '_local_max_streams_uni', None)  # aioquic internal, see pyproject
+        if limit is None:
+            return
+        if limit.value - limit.used < self.max_data_streams // 2:
+            limit.value = limit.used + self.max_data_streams
+            logger.debug(f"MOQT event: data stream limit raised: {limit.value}")
+
+    def data_stream_credit(self) -> int:
+        """Data streams that can be opened before reaching the peer's MAX_STREAMS limit."""
+        quic = self._quic
+        peer_limit = getattr(quic, '_remote_max_streams_uni', None)  # aioquic internal, see pyproject
+        if peer_limit is None:  # unknown: QUIC holds streams beyond the limit
+            return self.max_data_streams
+        return peer_limit - quic.get_next_available_stream_id(is_unidirectional=True) // 4
+
+    def _data_stream_credit_check(self) -> None:
+        """Wake open_data_stream() waiters once the peer has raised MAX_STREAMS."""
+        conn = self._conn
+        credit = conn.data_stream_credit()
+        if credit <= 0:
+            conn._data_stream_limit = conn._quic._remote_max_streams_uni  # raised, but not enough
+            return
+        if conn._data_stream_limit is not None:
+            conn._data_stream_limit = None
+            logger.info(f"MOQT event: data stream limit raised by peer: {conn._quic._remote_max_streams_uni}")
+        waiter = conn._data_stream_credit
+        if waiter is not None:
+            conn._data_stream_credit = None
+            if not waiter.done():
+                waiter.set_result(credit)
+
+    def _data_stream_limit_reached(self) -> None:
+        self.data_streams_blocked += 1
+        conn = self._conn
+        if conn._data_stream_limit is None:
+            conn._data_stream_limit = self._quic._remote_max_streams_uni
+            logger.warning(f"MOQT event: data stream limit reached: peer MAX_STREAMS: "
+                           f"{conn._data_stream_limit}, new streams wait until it is raised")
+
+    def create_data_stream(
+        self,
+        subscribe_id: Optional[int] = None,
+        publisher_priority: int = MOQT_DEFAULT_PRIORITY,
+    ) -> int:
+        """Open a unidirectional data stream for subgroup or fetch objects on this session.
+
+        With the subscribe_id of the peer subscription it delivers, writes with
+        send_stream_data() (and send_object() etc.) are sent in
+        (subscriber priority, publisher_priority) order, see transmit().
+        Beyond the peer's MAX_STREAMS limit the stream is still created, but
+        QUIC holds its data until the peer raises the limit: this is counted
+        in data_streams_blocked and logged. Use open_data_stream() to wait
+        for stream credit instead.
+        """
+        quic = self._quic
+        if self.data_stream_credit() <= 0:
+            self._data_stream_limit_reached()
+        stream_id = quic.get_next_available_stream_id(is_unidirectional=True)
+        if self._raw_quic:
+            quic.send_stream_data(stream_id, b"", end_stream=False)  # claim the stream id
+        else:
+            prefix = self._data_stream_prefix
+            if prefix is None:
+                if self._h3 is None or self._session_id is None:
+                    raise MOQTException(SessionCloseCode.INTERNAL_ERROR, "WebTransport session not intialized")
+                prefix = self._data_stream_prefix = encode_uint_var(WT_STREAM_UNI) + encode_uint_var(self._session_id)
+            quic.send_stream_data(stream_id, prefix, end_stream=False)
+        if subscribe_id is not None:
+            self._schedule_data_stream(stream_id, subscribe_id, publisher_priority)
+        return stream_id
+
+    async def open_data_stream(
+        self,
+        timeout: Optional[float] = None,
+        subscribe_id: Optional[int] = None,
+        publisher_priority: int = MOQT_DEFAULT_PRIORITY,
+    ) -> int:
+        """Open a data stream, first waiting for the peer to raise MAX_STREAMS if there is no credit."""
+        conn = self._conn
+        if self.data_stream_credit() <= 0:
+            self._data_stream_limit_reached()
+            while self.data_stream_credit() <= 0:
+                if self._close_err is not None:
+                    raise MOQTException(*self._close_err)
+                if conn._data_stream_credit is None:
+                    conn._data_stream_credit = self._loop.create_future()
+                await asyncio.wait_for(asyncio.shield(conn._data_stream_credit), timeout)
+        return self.create_data_stream(subscribe_id, publisher_priority)
+
+    def create_pacer(self, interval: float = MOQT_PACER_INTERVAL, burst: int = MOQT_PACER_BURST) -> ObjectPacer:
+        """Pacer spreading object writes over the frame interval at the connection's rate, see ObjectPacer."""
+        return ObjectPacer(self, interval=interval, burst=burst)
+
+    def send_stream_data(
+        self,
+        stream_id: int,
+        data: bytes,
+        end_stream: bool = False,
+        transmit: bool = True,
+    ) -> None:
+        """Write to a data stream, queued in priority order if it delivers a peer subscription."""
+        conn = self._conn
+        if stream_id in conn._send_priorities:
+            queue = conn._send_queues.get(stream_id)
+            if queue is None:
+                queue = conn._send_queues[stream_id] = deque()
+            queue.append((data, end_stream))
+        else:
+            self._quic.send_stream_data(stream_id, data, end_stream=end_stream)
+        if transmit:
+            self.transmit()
+
+    def send_subgroup_header(
+        self,
+        stream_id: int,
+        subgroup: SharedSubgroup,
+        track_alias: int,
+        transmit: bool = True,
+    ) -> None:
+        """Start a subgroup data stream with the shared header for a subscriber's track alias."""
+        self.send_stream_data(stream_id, subgroup.header(track_alias), transmit=transmit)
+
+    def send_object(
+        self,
+        stream_id: int,
+        obj: SharedObject,
+        end_stream: bool = False,
+        transmit: bool = True,
+    ) -> None:
+        """Write a shared object to a subgroup data stream, serialized once per codec."""
+        self.send_stream_data(stream_id, obj.data(self._codec), end_stream, transmit)
+
+    def send_objects(
+        self,
+        stream_id: int,
+        objects: Iterable[ObjectEntry],
+        end_stream: bool = False,
+        transmit: bool = True,
+    ) -> None:
+        """Write a batch of (object_id, payload, extensions) objects to a subgroup data stream in one write."""
+        buf = ObjectHeader.serialize_batch(objects, self._codec)
+        self.send_stream_data(stream_id, buf.data, end_stream, transmit)
+
+    def send_object_datagrams(
+        self,
+        track_alias: int,
+        group_id: int,
+        objects: Iterable[ObjectEntry],
+        publisher_priority: int = MOQT_DEFAULT_PRIORITY,
+        transmit: bool = True,
+    ) -> None:
+        """Send a batch of (object_id, payload, extensions) objects as datagrams, packed into packets together."""
+        prefix = b"" if self._raw_quic else encode_uint_var(self._session_id // 4)
+        for data in ObjectDatagram.serialize_batch(
+                track_alias, group_id, objects, publisher_priority, self._codec, prefix):
+            self._quic.send_datagram_frame(data)
+        if transmit:  # one transmit: the DATAGRAM frames share packets up to the path MTU
+            self.transmit()
+
+    def send_object_datagram(self, obj: SharedObject, track_alias: int, transmit: bool = True) -> None:
+        """Send a shared datagram object with a subscriber's track alias patched in."""
+        prefix = b"" if self._raw_quic else encode_uint_var(self._session_id // 4)
+        self._quic.send_datagram_frame(obj.datagram(track_alias, self._codec, prefix))
+        if transmit:
+            self.transmit()
+
     ################################################################################################
     #  Outbound control message API - note: awaitable messages support 'wait_response' param       #
     ################################################################################################
@@ -840,14 +1736,21 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         end_group: Optional[int] = 0,
         parameters: Optional[Dict[int, bytes]] = None,
         wait_response: Optional[bool] = False,
+        timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
     ) -> Optional[MOQTMessage]:
-        """Subscribe to a track with configurable options."""
+        """Subscribe to a track with configurable options.
+
+        timeout bounds the wait for the response (default: request_timeout),
+        idle_timeout the gap between data on the subscription's streams
+        (default: idle_stream_timeout).
+        """
         if parameters is None:
             parameters = {}
         subscribe_id = self._allocate_subscribe_id()
-        track_alias = self._allocate_track_alias(subscribe_id)
-        namespace_tuple = self._make_namespace_tuple(namespace)
-        track_name = track_name.encode() if isinstance(track_name, str) else track_name
+        track_alias = self._allocate_track_alias()
+        track = FullTrackName(namespace, track_name)
+        namespace_tuple, track_name = track.namespace, track.name
 
         message = Subscribe(
             subscribe_id=subscribe_id,
@@ -862,36 +1765,12 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             end_group=end_group,
             parameters=parameters
         )
-        self._subscriptions[subscribe_id] = [message]
-        logger.info(f"MOQT send: {message}")
-        self.send_control_message(message.serialize())
+        self._add_subscription(subscribe_id, message, track_alias, idle_timeout)
+        self._send_request(subscribe_id, message)
 
         if not wait_response:
             return message
-
-        # Create future for response
-        subscribe_fut = self._loop.create_future()
-        self._subscribe_responses[subscribe_id] = subscribe_fut
-
-        async def wait_for_response():
-            try:
-                async with asyncio.timeout(10):
-                    response = await subscribe_fut
-            except asyncio.TimeoutError:
-                # Create synthetic error response
-                response = SubscribeError(
-                    subscribe_id=subscribe_id,
-                    error_code=0x5,  # TIMEOUT error code
-                    reason="Subscribe Response Timeout",
-                    track_alias=0
-                )
-                logger.error(f"Timeout waiting for subscribe response")
-            finally:
-                logger.debug(f"MOQT: removing subscribe response future: {subscribe_id}")
-                self._subscribe_responses.pop(subscribe_id, None)    
-            return response
-
-        return wait_for_response()
+        return self._request(MOQTMessageType.SUBSCRIBE, subscribe_id, timeout)
 
     def subscribe_ok(
         self,
@@ -933,6 +1812,8 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         )
         logger.info(f"MOQT send: {message}")
         self.send_control_message(message.serialize())
+        if self._remove_subscriber(subscribe_id) is None:
+            self._retire_subscribe_id()  # rejected before it was recorded
         return message
     
     def unsubscribe(
@@ -941,11 +1822,117 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
     ) -> Optional[MOQTMessage]:
         """Unsubscribe from a track."""
         message = Unsubscribe(subscribe_id=subscribe_id)
-        logger.info(f"MOQT send: {message}")
-        self.send_control_message(message.serialize())
+        if not self._unqueue_request(subscribe_id):  # not sent yet: nothing to tell the peer
+            logger.info(f"MOQT send: {message}")
+            self.send_control_message(message.serialize())
+        self._remove_subscription(subscribe_id)
  
         return message       
 
+    def subscribe_update(
+        self,
+        subscribe_id: int,
+        start_group: Optional[int] = None,
+        start_object: Optional[int] = None,
+        end_group: Optional[int] = None,
+        priority: Optional[int] = None,
+        parameters: Optional[Dict[int, bytes]] = None,
+    ) -> MOQTMessage:
+        """Change the priority or narrow the range of a subscription (SUBSCRIBE_UPDATE).
+
+        Arguments left as None keep the current value. end_group is the last
+        group + 1, 0 for open ended. The range may only narrow: the start
+        cannot move back, nor the end forward. A SUBSCRIBE still queued by
+        MAX_SUBSCRIBE_ID is rewritten instead; if it is for the latest
+        object, which has no start, only its priority can change.
+        """
+        sub = self._subscriptions.get(subscribe_id)
+        if sub is None or sub.track_alias is None:
+            raise MOQTException(SessionCloseCode.INTERNAL_ERROR, f"subscribe_update: unknown subscription: {subscribe_id}")
+        message = SubscribeUpdate(
+            subscribe_id=subscribe_id,
+            start_group=sub.start_group if start_group is None else start_group,
+            start_object=sub.start_object if start_object is None else start_object,
+            end_group=sub.end_group if end_group is None else end_group,
+            priority=sub.priority if priority is None else priority,
+            parameters=parameters or {},
+        )
+        error = self._check_subscribe_update(sub, message)
+        queued = next((pos for pos, (request_id, _) in enumerate(self._blocked_requests)
+                       if request_id == subscribe_id), None)
+        request = sub.request
+        if (error is None and queued is not None and request.filter_type == FilterType.LATEST_OBJECT and
+                (message.start_group, message.start_object, message.end_group) != (0, 0, 0)):
+            error = "range of a latest object SUBSCRIBE not yet sent"
+        if error is not None:
+            raise MOQTException(SessionCloseCode.PROTOCOL_VIOLATION, f"subscribe_update: {error}")
+        self._apply_subscribe_update(sub, message)
+        if queued is not None:  # not sent yet: send the updated SUBSCRIBE instead
+            request.priority = message.priority
+            if request.filter_type != FilterType.LATEST_OBJECT:
+                request.start_group, request.start_object = message.start_group, message.start_object
+                if message.end_group:
+                    request.filter_type = FilterType.ABSOLUTE_RANGE
+                    request.end_group = message.end_group - 1
+            self._blocked_requests[queued] = (subscribe_id, request.serialize())
+            return message
+        logger.info(f"MOQT send: {message}")
+        self.send_control_message(message.serialize())
+        return message
+
+    @staticmethod
+    def _check_subscribe_update(sub: Subscription, msg: SubscribeUpdate) -> Optional[str]:
+        """Error for a SUBSCRIBE_UPDATE that widens the subscription range, else None."""
+        if (msg.start_group, msg.start_object) < (sub.start_group, sub.start_object):
+            return f"start moved back: {msg.start_group}.{msg.start_object}"
+        if msg.end_group and sub.end_group and msg.end_group > sub.end_group:
+            return f"end group moved forward: {msg.end_group}"
+        if not msg.end_group and sub.end_group:
+            return "end group removed"
+        if msg.end_group and msg.end_group <= msg.start_group:
+            return f"end group {msg.end_group} before start group {msg.start_group}"
+        return None
+
+    @staticmethod
+    def _apply_subscribe_update(sub: Subscription, msg: SubscribeUpdate) -> None:
+        sub.priority = msg.priority
+        sub.start_group = msg.start_group
+        sub.start_object = msg.start_object
+        sub.end_group = msg.end_group
+
+    def subscribe_done(
+        self,
+        subscribe_id: int,
+        status_code: SubscribeDoneCode = SubscribeDoneCode.SUBSCRIPTION_ENDED,
+        stream_count: int = 0,
+        reason: str = "",
+    ) -> Optional[MOQTMessage]:
+        """Create and send a SUBSCRIBE_DONE and drop the peer subscription."""
+        message = SubscribeDone(
+            subscribe_id=subscribe_id,
+            status_code=status_code,
+            stream_count=stream_count,
+            reason=reason
+        )
+        logger.info(f"MOQT send: {message}")
+        self.send_control_message(message.serialize())
+        self._remove_subscriber(subscribe_id)
+        return message
+
+    def max_subscribe_id(self, subscribe_id: int) -> MOQTMessage:
+        """Send MAX_SUBSCRIBE_ID, raising the subscribe id limit for the peer."""
+        message = MaxSubscribeId(subscribe_id=subscribe_id)
+        logger.info(f"MOQT send: {message}")
+        self.send_control_message(message.serialize())
+        return message
+
+    def subscribes_blocked(self, maximum_subscribe_id: int) -> MOQTMessage:
+        """Send SUBSCRIBES_BLOCKED: requests are waiting on the peer's MAX_SUBSCRIBE_ID."""
+        message = SubscribesBlocked(maximum_subscribe_id=maximum_subscribe_id)
+        logger.info(f"MOQT send: {message}")
+        self.send_control_message(message.serialize())
+        return message
+
     def join(
         self,
         namespace: Union[Tuple[bytes,...]|List[Union[bytes,str]]|str],
@@ -955,13 +1942,15 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         pre_group_offset: Optional[int] = 0,
         parameters: Optional[Dict[int, bytes]] = None,
         wait_response: Optional[bool] = False,
+        timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
     ) -> Optional[Tuple[MOQTMessage, MOQTMessage]]:
         """Subscribe and Joining Fetch."""
         parameters = {} if parameters is None else parameters
         subscribe_id = self._allocate_subscribe_id()
-        track_alias = self._allocate_track_alias(subscribe_id)
-        namespace = self._make_namespace_tuple(namespace)
-        track_name = track_name.encode() if isinstance(track_name, str) else track_name
+        track_alias = self._allocate_track_alias()
+        track = FullTrackName(namespace, track_name)
+        namespace, track_name = track.namespace, track.name
 
         message = Subscribe(
             subscribe_id=subscribe_id,
@@ -973,9 +1962,8 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             filter_type=FilterType.LATEST_OBJECT,
             parameters=parameters
         )
-        self._subscriptions[subscribe_id] = [message]
-        logger.info(f"MOQT send: {message}")
-        self.send_control_message(message.serialize())
+        self._add_subscription(subscribe_id, message, track_alias, idle_timeout)
+        self._send_request(subscribe_id, message)
 
         fetch_subscribe_id = self._allocate_subscribe_id()
         message = Fetch(
@@ -988,47 +1976,16 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             parameters=parameters
         )
         
-        self._subscriptions[subscribe_id] = [message]
-        logger.info(f"MOQT send: {message}")
-        self.send_control_message(message.serialize())
+        self._add_subscription(fetch_subscribe_id, message, idle_timeout=idle_timeout)
+        self._send_request(fetch_subscribe_id, message)
 
         if not wait_response:
             return message
-
-        # Create future for response
-        subscribe_fut = self._loop.create_future()
-        self._subscribe_responses[subscribe_id] = subscribe_fut        
-
-        fetch_fut = self._loop.create_future()
-        self._fetch_responses[fetch_subscribe_id] = fetch_fut
-
-        async def wait_for_response():
-            try:
-                async with asyncio.timeout(10):
-                    sub_response = await subscribe_fut
-                    
-                async with asyncio.timeout(10):
-                    fetch_response = await fetch_fut
-
-            except asyncio.TimeoutError:
-                # Create synthetic error response
-                response = SubscribeError(
-                    subscribe_id=subscribe_id,
-                    error_code=0x5,  # TIMEOUT error code
-                    reason="Subscribe Response Timeout",
-                    track_alias=0
-                )
-                logger.error(f"Timeout waiting for subscribe response")
-                sub_response = response if sub_response is None else sub_response
-                fetch_response = response if fetch_response is None else fetch_response
-            finally:
-                logger.debug(f"MOQT: removing subscribe response future: {subscribe_id}")
-                self._subscribe_responses.pop(subscribe_id, None)    
-                self._fetch_responses.pop(fetch_subscribe_id, None)
-                
-            return sub_response, fetch_response
-
-        return wait_for_response()
+        # (subscribe response, fetch response)
+        return asyncio.gather(
+            self._request(MOQTMessageType.SUBSCRIBE, subscribe_id, timeout),
+            self._request(MOQTMessageType.FETCH, fetch_subscribe_id, timeout),
+        )
 
     def fetch(
         self,
@@ -1042,22 +1999,20 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         end_object: Optional[int] = 0,
         parameters: Optional[Dict[int, bytes]] = None,
         wait_response: Optional[bool] = False,
+        timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
     ) -> Optional[MOQTMessage]:
         """Fetch data from a track with configurable options."""
         parameters = {} if parameters is None else parameters
         subscribe_id = self._allocate_subscribe_id()
-        track_alias = self._allocate_track_alias(subscribe_id)
-        namespace = self._make_namespace_tuple(namespace)
-
-        if isinstance(track_name, str):
-            track_name = track_name.encode()
+        track = FullTrackName(namespace, track_name)
+        namespace, track_name = track.namespace, track.name
 
         message = Fetch(
             subscribe_id=subscribe_id,
-            track_alias=track_alias,
             namespace=namespace,
             track_name=track_name,
-            priority=subscriber_priority,
+            subscriber_priority=subscriber_priority,
             fetch_type=FetchType.FETCH,
             group_order=group_order,
             start_group=start_group,
@@ -1067,53 +2022,97 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
             parameters=parameters
         )
         
-        self._subscriptions[subscribe_id] = [message]
-        logger.info(f"MOQT send: {message}")
-        self.send_control_message(message.serialize())
+        self._add_subscription(subscribe_id, message, idle_timeout=idle_timeout)
+        self._send_request(subscribe_id, message)
 
         if not wait_response:
             return message
+        return self._request(MOQTMessageType.FETCH, subscribe_id, timeout)
 
-        # Create future for response
-        subscribe_fut = self._loop.create_future()
-        self._subscribe_responses[subscribe_id] = subscribe_fut
-
-        async def wait_for_response():
-            try:
-                async with asyncio.timeout(10):
-                    response = await subscribe_fut
-            except asyncio.TimeoutError:
-                # Create synthetic error response
-                response = SubscribeError(
-                    subscribe_id=subscribe_id,
-                    error_code=0x5,  # TIMEOUT error code
-                    reason="Subscribe Response Timeout",
-                    track_alias=0
-                )
-                logger.error(f"Timeout waiting for subscribe response")
-            finally:
-                logger.debug(f"MOQT: removing subscribe response future: {subscribe_id}")
-                self._subscribe_responses.pop(subscribe_id, None)    
-            return response
+    async def _pipeline(
+        self,
+        send: Callable[..., Future],
+        requests: Iterable[tuple],
+    ) -> AsyncIterator[MOQTMessage]:
+        """Send requests in control stream batches as the peer's MAX_SUBSCRIBE_ID allows,
+        yielding responses in the order they arrive."""
+        requests = iter(requests)
+        request = next(requests, _END)
+        pending: Set[Future] = set()
+        while request is not _END or pending:
+            if request is not _END:
+                with self.control_batch():
+                    while request is not _END and self._subscribe_ids_available() != 0:
+                        pending.add(send(*request))
+                        request = next(requests, _END)
+                    if request is not _END:
+                        self._subscribes_blocked()
+            waiters = set(pending)
+            if request is not _END:
+                logger.debug(f"MOQT: requests blocked at MAX_SUBSCRIBE_ID {self._peer_max_subscribe_id}")
+                waiters.add(self._subscribe_ids_raised())
+                waiters.add(self._moqt_session_closed)
+            done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                if fut is self._moqt_session_closed:
+                    raise MOQTException(SessionCloseCode.INTERNAL_ERROR,
+                                        "session closed with requests blocked")
+                if fut in pending:
+                    pending.discard(fut)
+                    yield fut.result()
+
+    async def subscribe_many(
+        self,
+        tracks: Iterable[Tuple[Union[Tuple[bytes,...]|List[Union[bytes,str]]|str], Union[bytes|str]]],
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> AsyncIterator[MOQTMessage]:
+        """Subscribe to many (namespace, track_name) tracks, pipelined.
+
+        As many SUBSCRIBEs as the peer's MAX_SUBSCRIBE_ID allows go out in one
+        control stream write and transmit; the rest follow as the limit is
+        raised. Yields SUBSCRIBE_OK/SUBSCRIBE_ERROR responses as they arrive
+        (match them by subscribe_id). Other keyword arguments go to subscribe().
+        """
+        def send(namespace, track_name) -> Future:
+            return self.subscribe(namespace, track_name, wait_response=True, timeout=timeout, **kwargs)
+
+        async for response in self._pipeline(send, tracks):
+            yield response
+
+    async def fetch_many(
+        self,
+        ranges: Iterable[Tuple[Union[Tuple[bytes,...]|List[Union[bytes,str]]|str], Union[bytes|str], int, int, int, int]],
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> AsyncIterator[MOQTMessage]:
+        """Fetch many (namespace, track_name, start_group, start_object, end_group, end_object)
+        ranges, pipelined like subscribe_many(). Yields FETCH_OK/FETCH_ERROR responses."""
+        def send(namespace, track_name, start_group, start_object, end_group, end_object) -> Future:
+            return self.fetch(
+                namespace, track_name,
+                start_group=start_group, start_object=start_object,
+                end_group=end_group, end_object=end_object,
+                wait_response=True, timeout=timeout, **kwargs
+            )
 
-        return wait_for_response()
+        async for response in self._pipeline(send, ranges):
+            yield response
 
     def fetch_ok(
         self,
         subscribe_id: int,
-        expires: int = 0,  # 0 means no expiry
         group_order: int = GroupOrder.ASCENDING,
-        content_exists: int = 0,
-        largest_group_id: Optional[int] = None,
-        largest_object_id: Optional[int] = None,
+        end_of_track: int = 0,
+        largest_group_id: int = 0,
+        largest_object_id: int = 0,
         parameters: Optional[Dict[int, bytes]] = None
     ) -> Optional[MOQTMessage]:
-        """Create and send a SUBSCRIBE_OK response."""
-        message = SubscribeOk(
+        """Create and send a FETCH_OK response."""
+        message = FetchOk(
             subscribe_id=subscribe_id,
-            expires=expires,
             group_order=group_order,
-            content_exists=content_exists,
+            end_of_track=end_of_track,
             largest_group_id=largest_group_id,
             largest_object_id=largest_object_id,
             parameters=parameters or {}
@@ -1127,24 +2126,37 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         subscribe_id: int,
         error_code: int = SubscribeErrorCode.INTERNAL_ERROR,
         reason: str = "Internal error",
-        track_alias: Optional[int] = None
     ) -> Optional[MOQTMessage]:
-        """Create and send a SUBSCRIBE_ERROR response."""
-        message = SubscribeError(
+        """Create and send a FETCH_ERROR response."""
+        message = FetchError(
             subscribe_id=subscribe_id,
             error_code=error_code,
             reason=reason,
-            track_alias=track_alias
         )
         logger.info(f"MOQT send: {message}")
         self.send_control_message(message.serialize())
+        if self._remove_subscriber(subscribe_id) is None:
+            self._retire_subscribe_id()  # rejected before it was recorded
+        return message
+
+    def fetch_cancel(
+        self,
+        subscribe_id: int,
+    ) -> Optional[MOQTMessage]:
+        """Cancel an outstanding fetch."""
+        message = FetchCancel(subscribe_id=subscribe_id)
+        if not self._unqueue_request(subscribe_id):
+            logger.info(f"MOQT send: {message}")
+            self.send_control_message(message.serialize())
+        self._remove_subscription(subscribe_id)
         return message
 
     def announce(
         self,
         namespace: Union[str, Tuple[str, ...]],
         parameters: Optional[Dict[int, bytes]] = None,
-        wait_response: Optional[bool] = False
+        wait_response: Optional[bool] = False,
+        timeout: Optional[float] = None,
     ) -> Optional[MOQTMessage]:
         """Announce track namespace availability."""
         namespace_tuple = self._make_namespace_tuple(namespace)
@@ -1157,28 +2169,7 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
 
         if not wait_response:
             return message
-
-        # Create future for response
-        announce_fut = self._loop.create_future()
-        self._announce_responses[namespace_tuple] = announce_fut
-
-        async def wait_for_response():
-            try:
-                async with asyncio.timeout(10):
-                    response = await announce_fut
-            except asyncio.TimeoutError:
-                # Create synthetic error response
-                response = AnnounceError(
-                    namespace=namespace,
-                    error_code=0x5,  # TIMEOUT error code
-                    reason="Response timeout"
-                )
-                logger.error(f"Timeout waiting for announce response")
-            finally:
-                self._announce_responses.pop(namespace, None)
-            return response
-
-        return wait_for_response()
+        return self._request(MOQTMessageType.ANNOUNCE, namespace_tuple, timeout)
 
     def announce_ok(
         self,
@@ -1193,6 +2184,22 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         self.send_control_message(message.serialize())
         return message
 
+    def announce_error(
+        self,
+        namespace: Union[str, Tuple[str, ...]],
+        error_code: int = AnnounceErrorCode.INTERNAL_ERROR,
+        reason: str = "Internal error",
+    ) -> Optional[MOQTMessage]:
+        """Create and send an ANNOUNCE_ERROR response."""
+        message = AnnounceError(
+            namespace=self._make_namespace_tuple(namespace),
+            error_code=error_code,
+            reason=reason,
+        )
+        logger.info(f"MOQT send: {message}")
+        self.send_control_message(message.serialize())
+        return message
+
     def unannounce(
         self,
         namespace: Tuple[bytes, ...]
@@ -1207,7 +2214,8 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         self,
         namespace_prefix: str,
         parameters: Optional[Dict[int, bytes]] = None,
-        wait_response: Optional[bool] = False
+        wait_response: Optional[bool] = False,
+        timeout: Optional[float] = None,
     ) -> Optional[MOQTMessage]:
         """Subscribe to announcements for a namespace prefix."""
         if parameters is None:
@@ -1223,29 +2231,7 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
 
         if not wait_response:
             return message
-
-        # Create future for response
-        sub_announces_fut = self._loop.create_future()
-        self._subscribe_announces_responses[prefix] = sub_announces_fut
-
-        async def wait_for_response():
-            try:
-                async with asyncio.timeout(10):
-                    response = await sub_announces_fut
-            except asyncio.TimeoutError:
-                # Create synthetic error response
-                response = SubscribeAnnouncesError(
-                    namespace_prefix=prefix,
-                    error_code=0x5,  # TIMEOUT error code
-                    reason="Response timeout"
-                )
-                logger.error(f"Timeout waiting for announce subscribe response")
-            finally:
-                self._subscribe_announces_responses.pop(prefix, None)
-            
-            return response
-
-        return wait_for_response()
+        return self._request(MOQTMessageType.SUBSCRIBE_ANNOUNCES, prefix, timeout)
 
     def subscribe_announces_ok(
         self,
@@ -1269,6 +2255,42 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         self.send_control_message(message.serialize())
         return message
 
+    def track_status(
+        self,
+        namespace: str,
+        track_name: str,
+        wait_response: Optional[bool] = False,
+        timeout: Optional[float] = None,
+    ) -> Optional[MOQTMessage]:
+        """Request the status and largest location of a track (TRACK_STATUS_REQUEST), without subscribing."""
+        track = FullTrackName(namespace, track_name)
+        message = TrackStatusRequest(namespace=track.namespace, track_name=track.name)
+        logger.info(f"MOQT send: {message}")
+        self.send_control_message(message.serialize())
+
+        if not wait_response:
+            return message
+        return self._request(MOQTMessageType.TRACK_STATUS_REQUEST, track, timeout)
+
+    def send_track_status(
+        self,
+        track: FullTrackName,
+        status_code: TrackStatusCode,
+        last_group_id: int = 0,
+        last_object_id: int = 0,
+    ) -> MOQTMessage:
+        """Create and send a TRACK_STATUS response."""
+        message = TrackStatus(
+            namespace=track.namespace,
+            track_name=track.name,
+            status_code=status_code,
+            last_group_id=last_group_id,
+            last_object_id=last_object_id,
+        )
+        logger.info(f"MOQT send: {message}")
+        self.send_control_message(message.serialize())
+        return message
+
 
     ###############################################################################################
     #  Inbound MoQT message handlers                                                              #
@@ -1316,9 +2338,10 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
                     reason_phrase=error
                 )
             else:
-                self._moqt_version = selected_version
-                # set version context scoped to the session and save prev state token
-                set_moqt_ctx_version(self._moqt_version)
+                self._set_moqt_version(selected_version)
+                max_subscribe_id = msg.parameters.get(SetupParamType.MAX_SUBSCRIBER_ID)
+                if max_subscribe_id is not None:
+                    self._set_peer_max_subscribe_id(max_subscribe_id)
 
             # indicate moqt session setup is complete
             self._moqt_session_setup.set_result(True)
@@ -1341,14 +2364,49 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
                 reason_phrase=error
             )
         else:
-            # indicate moqt session setup is complete
+            if self._raw_quic:
+                # no CONNECT request: the endpoint comes from the ENDPOINT_PATH setup parameter
+                path = msg.parameters.get(SetupParamType.ENDPOINT_PATH)
+                if path is None or not self._endpoint_match(path):
+                    error = f"MOQT event: CLIENT_SETUP endpoint path not found: {path}"
+                    logger.error(error)
+                    self._close_session(
+                        error_code=SessionCloseCode.PROTOCOL_VIOLATION,
+                        reason_phrase=error
+                    )
+                    return
+            # prefer our current version, then the client's order of preference
             if MOQT_CUR_VERSION in msg.versions:
-                self.server_setup()
-                self._moqt_session_setup.set_result(True)
+                selected_version = MOQT_CUR_VERSION
+            else:
+                selected_version = next((v for v in msg.versions if v in MOQT_VERSIONS), None)
+            if selected_version is None:
+                error = f"MOQT event: no supported version in CLIENT_SETUP {[hex(v) for v in msg.versions]}"
+                logger.error(error)
+                self._close_session(
+                    error_code=SessionCloseCode.PROTOCOL_VIOLATION,
+                    reason_phrase=error
+                )
+                return
+            self._set_moqt_version(selected_version)
+            max_subscribe_id = msg.parameters.get(SetupParamType.MAX_SUBSCRIBER_ID)
+            if max_subscribe_id is not None:
+                self._set_peer_max_subscribe_id(max_subscribe_id)
+            self.server_setup(
+                selected_version=selected_version,
+                parameters={SetupParamType.MAX_SUBSCRIBER_ID: self._setup_max_subscribe_id()}
+            )
+            # indicate moqt session setup is complete
+            self._moqt_session_setup.set_result(True)
         
     async def _handle_subscribe(self, msg: Subscribe) -> None:
         logger.info(f"MOQT receive: {msg}")
-        self._track_aliases[msg.track_alias] = msg.subscribe_id
+        sub = self._add_subscriber(msg)  # recorded first: an UNSUBSCRIBE may arrive during verification
+        if not await self._authorize(msg, sub.track):
+            self.subscribe_error(msg.subscribe_id, SubscribeErrorCode.UNAUTHORIZED, "Unauthorized", msg.track_alias)
+            return
+        if self._subscribers.get(msg.subscribe_id) is not sub:
+            return  # unsubscribed while verifying
         self.subscribe_ok(
             subscribe_id=msg.subscribe_id,
             expires=0,
@@ -1358,51 +2416,53 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
 
     async def _handle_announce(self, msg: Announce) -> None:
         logger.info(f"MOQT receive: {msg}")
+        if not await self._authorize(msg, msg.namespace):
+            self.announce_error(msg.namespace, AnnounceErrorCode.UNAUTHORIZED, "Unauthorized")
+            return
+        first = not self._namespaces.publishers(msg.namespace)
+        if self._namespaces.announce(msg.namespace, self) and first:
+            self._route_announce(msg.namespace)
         self.announce_ok(msg.namespace)
 
     async def _handle_subscribe_update(self, msg: SubscribeUpdate) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Handle subscription update
+        sub = self._subscribers.get(msg.subscribe_id)
+        if sub is None or sub.track_alias is None:  # may have just ended
+            logger.warning(f"MOQT event: SubscribeUpdate for unknown subscription: {msg.subscribe_id}")
+            return
+        error = self._check_subscribe_update(sub, msg)
+        if error is not None:
+            self._close_session(SessionCloseCode.PROTOCOL_VIOLATION, f"SubscribeUpdate: {error}")
+            return
+        self._apply_subscribe_update(sub, msg)  # transmit() serves its streams at the new priority
 
     async def _handle_subscribe_ok(self, msg: SubscribeOk) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Set future result for subscriber waiting for response
-        future = self._subscribe_responses.get(msg.subscribe_id)
-        if future and not future.done():
-            future.set_result(msg)
-        if msg.subscribe_id in self._subscriptions:
-            self._subscriptions[msg.subscribe_id].append(msg)
+        self._requests.resolve(MOQTMessageType.SUBSCRIBE, msg.subscribe_id, msg)
+        sub = self._subscriptions.get(msg.subscribe_id)
+        if sub is not None:
+            sub.response = msg
         else:
-            logger.warning(f"MOQT messages: unsolicited SubscribeOk(msg.subscribe_id)")
+            logger.warning(f"MOQT messages: unsolicited SubscribeOk({msg.subscribe_id})")
 
     async def _handle_subscribe_error(self, msg: SubscribeError) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Set future result for subscriber waiting for response
-        future = self._subscribe_responses.get(msg.subscribe_id)
-        if future and not future.done():
-            future.set_result(msg)
-        if msg.subscribe_id in self._subscriptions:
-            self._subscriptions[msg.subscribe_id].append(msg)
-        else:
-            logger.warning(f"MOQT messages: unsolicited SubscribeError(msg.subscribe_id)")
+        self._requests.resolve(MOQTMessageType.SUBSCRIBE, msg.subscribe_id, msg)
+        if self._remove_subscription(msg.subscribe_id) is None:
+            logger.warning(f"MOQT messages: unsolicited SubscribeError({msg.subscribe_id})")
             
     async def _handle_announce_ok(self, msg: AnnounceOk) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Set future result for announcer waiting for response
-        future = self._announce_responses.get(msg.namespace)
-        if future and not future.done():
-            future.set_result(msg)
+        self._requests.resolve(MOQTMessageType.ANNOUNCE, msg.namespace, msg)
 
     async def _handle_announce_error(self, msg: AnnounceError) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Set future result for announcer waiting for response
-        future = self._announce_responses.get(msg.namespace)
-        if future and not future.done():
-            future.set_result(msg)
+        self._requests.resolve(MOQTMessageType.ANNOUNCE, msg.namespace, msg)
 
     async def _handle_unannounce(self, msg: Unannounce) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        self.announce_ok(msg.namespace)
+        if self._namespaces.unannounce(msg.namespace, self):
+            self._route_announce(msg.namespace, announce=False)
 
     async def _handle_announce_cancel(self, msg: AnnounceCancel) -> None:
         logger.info(f"MOQT event: handle {msg}")
@@ -1410,30 +2470,42 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
 
     async def _handle_unsubscribe(self, msg: Unsubscribe) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Handle unsubscribe request
+        if msg.subscribe_id not in self._subscribers:
+            logger.warning(f"MOQT messages: unsubscribe for unknown subscription: {msg.subscribe_id}")
+            return
+        self.subscribe_done(msg.subscribe_id, SubscribeDoneCode.UNSUBSCRIBED, reason="unsubscribed")
 
     async def _handle_subscribe_done(self, msg: SubscribeDone) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Set future result for subscriber waiting for completion
-        future = self._subscribe_responses.get(msg.subscribe_id)
-        if future and not future.done():
-            future.set_result(msg)
+        self._requests.resolve(MOQTMessageType.SUBSCRIBE, msg.subscribe_id, msg)
+        self._remove_subscription(msg.subscribe_id)
 
     async def _handle_max_subscribe_id(self, msg: MaxSubscribeId) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Update maximum subscribe ID
+        self._set_peer_max_subscribe_id(msg.subscribe_id)
 
     async def _handle_subscribes_blocked(self, msg: SubscribesBlocked) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Handle subscribes blocked notification
+        if self._max_subscribe_id is None or msg.maximum_subscribe_id < self._max_subscribe_id:
+            return  # a larger MAX_SUBSCRIBE_ID is already on its way
+        # the peer needs more concurrent requests: grow the window and grant retired ids now
+        window = self.max_subscribe_id_window
+        grow = max(min(window, min(MOQT_MAX_SUBSCRIBE_ID_WINDOW_LIMIT, self.max_subscriptions) - window), 0)
+        self.max_subscribe_id_window = window + grow
+        self._grant_subscribe_ids(grow)
 
     async def _handle_track_status_request(self, msg: TrackStatusRequest) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Send track status in response
+        track = msg.full_track_name
+        status_code, group_id, object_id = self._tracks.status(track)
+        if status_code == TrackStatusCode.DOES_NOT_EXIST and self._namespaces.publishers(track.namespace):
+            status_code = TrackStatusCode.RELAY_NO_INFO  # published by a peer session, not tracked here
+        self.send_track_status(track, status_code, group_id, object_id)
 
     async def _handle_track_status(self, msg: TrackStatus) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Handle track status update
+        if not self._requests.resolve(MOQTMessageType.TRACK_STATUS_REQUEST, msg.full_track_name, msg):
+            logger.warning(f"MOQT messages: unsolicited TrackStatus: {msg.full_track_name}")
 
     async def _handle_goaway(self, msg: GoAway) -> None:
         logger.info(f"MOQT event: handle {msg}")
@@ -1441,47 +2513,54 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
 
     async def _handle_subscribe_announces(self, msg: SubscribeAnnounces) -> None:
         logger.info(f"MOQT event: handle {msg}")
+        self._namespaces.subscribe(msg.namespace_prefix, self)
         self.subscribe_announces_ok(msg.namespace_prefix)
+        # Send the namespaces already announced under the new prefix
+        for namespace, publishers in self._namespaces.announced(msg.namespace_prefix):
+            if publishers - {self}:
+                self.announce(namespace)
            
     async def _handle_subscribe_announces_ok(self, msg: SubscribeAnnouncesOk) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Set future result for subscriber waiting for response
-        future = self._subscribe_announces_responses.get(msg.namespace_prefix)
-        if future and not future.done():
-            future.set_result(msg)
+        self._requests.resolve(MOQTMessageType.SUBSCRIBE_ANNOUNCES, msg.namespace_prefix, msg)
 
     async def _handle_subscribe_announces_error(self, msg: SubscribeAnnouncesError) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Set future result for subscriber waiting for response
-        future = self._subscribe_announces_responses.get(msg.namespace_prefix)
-        if future and not future.done():
-            future.set_result(msg)
+        self._requests.resolve(MOQTMessageType.SUBSCRIBE_ANNOUNCES, msg.namespace_prefix, msg)
 
     async def _handle_unsubscribe_announces(self, msg: UnsubscribeAnnounces) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        self.subscribe_announces_ok(msg.namespace_prefix)
+        self._namespaces.unsubscribe(msg.namespace_prefix, self)
 
     async def _handle_fetch(self, msg: Fetch) -> None:
         logger.info(f"MOQT event: handle {msg}")
+        sub = self._add_subscriber(msg)
+        track = sub.track
+        if track is None:  # joining fetch: the track of the joined subscription
+            joined = self._subscribers.get(msg.joining_sub_id)
+            track = joined.track if joined is not None else None
+        if not await self._authorize(msg, track):
+            self.fetch_error(msg.subscribe_id, SubscribeErrorCode.UNAUTHORIZED, "Unauthorized")
+            return
+        if self._subscribers.get(msg.subscribe_id) is not sub:
+            return  # cancelled while verifying
         self.fetch_ok(msg.subscribe_id)
 
     async def _handle_fetch_cancel(self, msg: FetchCancel) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Handle fetch cancellation
+        self._remove_subscriber(msg.subscribe_id)
 
     async def _handle_fetch_ok(self, msg: FetchOk) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Set future result for fetcher waiting for response
-        future = self._fetch_responses.get(msg.subscribe_id)
-        if future and not future.done():
-            future.set_result(msg)
+        self._requests.resolve(MOQTMessageType.FETCH, msg.subscribe_id, msg)
+        sub = self._subscriptions.get(msg.subscribe_id)
+        if sub is not None:
+            sub.response = msg
 
     async def _handle_fetch_error(self, msg: FetchError) -> None:
         logger.info(f"MOQT event: handle {msg}")
-        # Set future result for fetcher waiting for response
-        future = self._fetch_responses.get(msg.subscribe_id)
-        if future and not future.done():
-            future.set_result(msg)
+        self._requests.resolve(MOQTMessageType.FETCH, msg.subscribe_id, msg)
+        self._remove_subscription(msg.subscribe_id)
 
 
     # Data handlers need full update - stream reader in progress
@@ -1489,10 +2568,8 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         """Handle subgroup header message."""
         logger.info(f"MOQT event: handle {msg}")
         # Process subgroup header - 
-        sub_id = self._track_aliases.get(msg.track_alias)
-        if sub_id is not None:
-            sub_state = self._subscriptions[sub_id]
-        else:
+        sub_state = self._track_aliases.get(msg.track_alias)
+        if sub_state is None:
             logger.error(f"MOQT error: unrecognized track alias: {msg.track_alias}")
 
     async def _handle_fetch_header(self, msg: FetchHeader) -> None:
@@ -1513,8 +2590,8 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         logger.info(f"MOQT event: handle {msg}")
         # Process object datagram
         # Validate track alias exists
-        subscribe_id = self._track_aliases.get(msg.track_alias)
-        if subscribe_id is None:
+        sub = self._track_aliases.get(msg.track_alias)
+        if sub is None:
             logger.error(f"MOQT error: datagram for unknown track: {msg.track_alias}")
             self._close_session(
                 error_code=SessionCloseCode.PROTOCOL_VIOLATION,
@@ -1530,8 +2607,8 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         logger.info(f"MOQT event: handle {msg}")
         # Process object status
         # Update status in local tracking
-        subscibe_id = self._track_aliases.get(msg.track_alias)
-        if subscibe_id is None:
+        sub = self._track_aliases.get(msg.track_alias)
+        if sub is None:
             logger.error(f"MOQT error: datagram status for unknown track: {msg.track_alias}")
             self._close_session(
                 error_code=SessionCloseCode.PROTOCOL_VIOLATION,
@@ -1592,6 +2669,14 @@ class MOQTSessionProtocol(QuicConnectionProtocol):
         DataStreamType.FETCH_HEADER: (FetchHeader, _handle_fetch_header),
     }
     
+    # QUIC event handlers (unbound), other event types are resolved by _quic_event_handler
+    QUIC_EVENT_REGISTRY: Dict[Type[QuicEvent], Callable] = {
+        StreamDataReceived: _quic_stream_data,
+        DatagramFrameReceived: _quic_datagram,
+        StreamReset: _quic_stream_reset,
+        ProtocolNegotiated: _quic_protocol_negotiated,
+    }
+
     # Datagram data message types
     MOQT_DGRAM_DATA_REGISTRY: Dict[DataStreamType, Tuple[Type[MOQTMessage], Callable]] = {
         DatagramType.OBJECT_DATAGRAM: (ObjectDatagram, _handle_object_datagram),
@@ -1,5 +1,6 @@
 import ssl
-from typing import Any, Optional, Tuple, Coroutine
+import weakref
+from typing import Any, Dict, Iterator, Optional, Tuple, Coroutine
 
 import asyncio
 from asyncio.futures import Future
@@ -7,8 +8,14 @@ from aioquic.quic.configuration import QuicConfiguration
 from aioquic.asyncio.server import QuicServer, serve
 from aioquic.h3.connection import H3_ALPN
 
-from .protocol import MOQTSession, MOQTSessionProtocol
+from .protocol import (MOQTSession, MOQTSessionProtocol, MOQT_MAX_DATA_STREAMS, MOQT_MAX_SUBSCRIPTIONS,
+                       MOQT_CONTROL_RATE_LIMITS)
+from .state import NamespaceTrie, TrackRegistry
+from .types import MOQT_ALPN
 from .utils.logger import *
+from .utils.auth import Authorizer
+from .utils.limits import LoopLagMonitor, MOQT_LOAD_SHED_LAG
+from .utils.tickets import SessionTicketStore
 
 logger = get_logger(__name__)
 
@@ -24,20 +31,37 @@ class MOQTServerSession(MOQTSession):
         endpoint: Optional[str] = "moq",
         congestion_control_algorithm: Optional[str] = 'reno',
         configuration: Optional[QuicConfiguration] = None,
-        debug: bool = False
+        debug: bool = False,
+        ticket_store: Optional[SessionTicketStore] = None,
+        max_data_streams: int = MOQT_MAX_DATA_STREAMS,
+        authorizer: Optional[Authorizer] = None,
+        max_subscriptions: int = MOQT_MAX_SUBSCRIPTIONS,
+        control_rate_limits: Optional[Dict[Tuple[int, ...], Optional[Tuple[float, int]]]] = None,
+        load_shed_lag: Optional[float] = MOQT_LOAD_SHED_LAG,
     ):
         self.host = host
         self.port = port
         self.endpoint = endpoint
         self.debug = debug
+        self.max_data_streams = max_data_streams  # incoming data streams kept open to the peer
+        self.authorizer = authorizer  # AUTHORIZATION_INFO verification of incoming requests
+        # per session admission control, and requests shed while the event loop lags (None: never)
+        self.max_subscriptions = max_subscriptions
+        self.control_rate_limits = MOQT_CONTROL_RATE_LIMITS if control_rate_limits is None else control_rate_limits
+        self.load_monitor = LoopLagMonitor(load_shed_lag) if load_shed_lag is not None else None
         self._loop = asyncio.get_running_loop()
         self._server_closed:Future[Tuple[int,str]] = self._loop.create_future()
         self._next_subscribe_id = 1  # prime subscribe id generator
+        self.namespaces = NamespaceTrie()  # announce routing across all sessions
+        self.tracks = TrackRegistry()  # published track status across all sessions
+        self.connections: 'weakref.WeakSet[MOQTSessionProtocol]' = weakref.WeakSet()  # live QUIC connections
+        # issued TLS session tickets: clients resume and send 0-RTT data
+        self.ticket_store = SessionTicketStore() if ticket_store is None else ticket_store
 
         if configuration is None:
             configuration = QuicConfiguration(
                 is_client=False,
-                alpn_protocols=H3_ALPN,
+                alpn_protocols=H3_ALPN + [MOQT_ALPN],  # WebTransport or raw QUIC sessions
                 verify_mode=ssl.CERT_NONE,
                 certificate=certificate,
                 private_key=private_key,
@@ -57,15 +81,28 @@ class MOQTServerSession(MOQTSession):
         """Start the MOQT server."""
         logger.info(f"Starting MOQT server on {self.host}:{self.port}")
         
-        protocol = lambda *args, **kwargs: MOQTSessionProtocol(*args, **kwargs, session=self)
+        def protocol(*args, **kwargs) -> MOQTSessionProtocol:
+            conn = MOQTSessionProtocol(*args, **kwargs, session=self)
+            self.connections.add(conn)
+            return conn
+        if self.load_monitor is not None:
+            self.load_monitor.start(self._loop)
 
         return serve(
             self.host,
             self.port,
             configuration=self.configuration,
             create_protocol=protocol,
+            session_ticket_fetcher=self.ticket_store.fetch,
+            session_ticket_handler=self.ticket_store.add,
         )
 
+    def sessions(self) -> Iterator[MOQTSessionProtocol]:
+        """MoQT sessions open on the server, including extra WebTransport sessions of a connection."""
+        for conn in list(self.connections):
+            if conn._close_err is None:
+                yield from conn.sessions
+
     async def closed(self) -> bool:
         if not self._server_closed.done():
             self._server_closed = await self._server_closed
@@ -0,0 +1,327 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import asyncio
+
+from .types import FullTrackName, FilterType, TrackStatusCode, MOQT_DEFAULT_PRIORITY
+from .messages import MOQTMessage
+from .utils.logger import *
+from .utils.timers import Timer, TimerWheel
+
+logger = get_logger(__name__)
+
+
+class Subscription:
+    """Session state for a single SUBSCRIBE or FETCH request.
+
+    Indexed by subscribe_id (and track_alias for subscriptions, and the
+    interned FullTrackName for peer subscriptions) in the session protocol
+    and dropped on UNSUBSCRIBE, SUBSCRIBE_DONE, FETCH_CANCEL or an error
+    response, so session memory does not grow with request history.
+
+    priority and the start / end_group range follow SUBSCRIBE_UPDATE. As in
+    that message, end_group is the last group + 1, 0 for an open ended range.
+    """
+    __slots__ = ('subscribe_id', 'track_alias', 'request', 'track', 'response', 'streams', 'idle_timeout',
+                 'priority', 'start_group', 'start_object', 'end_group')
+
+    def __init__(
+        self,
+        subscribe_id: int,
+        track_alias: Optional[int] = None,
+        request: Optional[MOQTMessage] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        self.subscribe_id = subscribe_id
+        self.track_alias = track_alias
+        self.request = request
+        # None for a joining fetch, which names its track by the joined subscription
+        self.track: Optional[FullTrackName] = getattr(request, 'full_track_name', None)
+        self.response: Optional[MOQTMessage] = None
+        self.streams: Set[int] = set()  # data stream ids currently delivering objects
+        self.idle_timeout = idle_timeout  # data stream idle timeout (None: session default)
+        # subscriber priority (lower is sent first) and range, changed by SUBSCRIBE_UPDATE
+        self.priority: int = getattr(request, 'priority', getattr(request, 'subscriber_priority', MOQT_DEFAULT_PRIORITY))
+        filter_type = getattr(request, 'filter_type', None)
+        absolute = filter_type in (FilterType.ABSOLUTE_START, FilterType.ABSOLUTE_RANGE)
+        self.start_group: int = (request.start_group or 0) if absolute else 0
+        self.start_object: int = (request.start_object or 0) if absolute else 0
+        end_group = getattr(request, 'end_group', None)
+        self.end_group: int = end_group + 1 if filter_type == FilterType.ABSOLUTE_RANGE and end_group is not None else 0
+
+    def __repr__(self) -> str:
+        return (f"Subscription(subscribe_id={self.subscribe_id}, track_alias={self.track_alias}, "
+                f"track={self.track}, priority={self.priority}, streams={len(self.streams)})")
+
+
+class DataStream:
+    """Receive state for an incoming subgroup or fetch data stream.
+
+    Holds the parsed stream header along with the chunk queue and the task
+    processing it. Removed from the session when the stream is finished (FIN),
+    reset, or times out.
+    """
+    __slots__ = ('stream_id', 'header', 'subscription', 'queue', 'task', 'timer', 'fin', 'reset')
+
+    def __init__(self, stream_id: int):
+        self.stream_id = stream_id
+        self.header: Optional[MOQTMessage] = None
+        self.subscription: Optional[Subscription] = None
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.timer: Optional[Timer] = None  # idle timeout, touched as data arrives
+        self.fin = False  # FIN received from peer
+        self.reset = False  # RESET_STREAM received from peer
+
+    def __repr__(self) -> str:
+        return f"DataStream(stream_id={self.stream_id}, header={self.header}, fin={self.fin})"
+
+
+class PendingRequests:
+    """Control requests awaiting a response, keyed by (request message type, id).
+
+    The id is the subscribe id for SUBSCRIBE and FETCH, and the namespace
+    (prefix) tuple for ANNOUNCE and SUBSCRIBE_ANNOUNCES, so a response handler
+    resolves a request by the key it was registered with. Every request has a
+    timer wheel deadline; on expiry its future resolves with the synthetic
+    error response built by timeout_response(kind, id). Entries are removed
+    when resolved or expired.
+    """
+    __slots__ = ('_loop', '_timers', '_timeout_response', '_requests')
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        timers: TimerWheel,
+        timeout_response: Callable[[int, Hashable], MOQTMessage],
+    ):
+        self._loop = loop
+        self._timers = timers
+        self._timeout_response = timeout_response
+        self._requests: Dict[Tuple[int, Hashable], Tuple[asyncio.Future, Timer]] = {}
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def __contains__(self, key: Tuple[int, Hashable]) -> bool:
+        return key in self._requests
+
+    def add(self, kind: int, id: Hashable, timeout: float) -> asyncio.Future:
+        """Register a request; the returned future resolves with its response."""
+        key = (kind, id)
+        previous = self._requests.get(key)
+        if previous is not None and not previous[0].done():
+            return previous[0]  # same request in flight (e.g. re-ANNOUNCE): share the response
+        fut = self._loop.create_future()
+        self._requests[key] = (fut, self._timers.call_later(timeout, self._expire, key))
+        return fut
+
+    def resolve(self, kind: int, id: Hashable, response: MOQTMessage) -> bool:
+        """Complete a pending request with its response; False if none is pending."""
+        entry = self._requests.pop((kind, id), None)
+        if entry is None:
+            return False
+        fut, timer = entry
+        timer.cancel()
+        if not fut.done():
+            fut.set_result(response)
+        return True
+
+    def _expire(self, key: Tuple[int, Hashable]) -> None:
+        entry = self._requests.pop(key, None)
+        if entry is not None and not entry[0].done():
+            entry[0].set_result(self._timeout_response(*key))
+
+    def __repr__(self) -> str:
+        return f"PendingRequests({len(self._requests)})"
+
+
+class TrackRegistry:
+    """Status of the tracks published through a session or server, for TRACK_STATUS.
+
+    Publishers record the largest (group, object) they have sent on a track
+    with publish(), and finish() at its end. status() is one dict lookup, so
+    a TRACK_STATUS_REQUEST is answered without a subscription or any access
+    to the data path. Shared by all sessions of a server, like NamespaceTrie.
+    """
+    __slots__ = ('_tracks',)
+
+    def __init__(self):
+        # track -> [status code, largest group id, largest object id]
+        self._tracks: Dict[FullTrackName, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __contains__(self, track: FullTrackName) -> bool:
+        return track in self._tracks
+
+    def register(self, track: FullTrackName) -> None:
+        """Add a track that has no objects yet (NOT_STARTED)."""
+        self._tracks.setdefault(track, [TrackStatusCode.NOT_STARTED, 0, 0])
+
+    def publish(self, track: FullTrackName, group_id: int, object_id: int) -> None:
+        """Record an object sent on a track, keeping the largest location."""
+        entry = self._tracks.get(track)
+        if entry is None:
+            self._tracks[track] = [TrackStatusCode.IN_PROGRESS, group_id, object_id]
+            return
+        entry[0] = TrackStatusCode.IN_PROGRESS
+        if group_id > entry[1] or (group_id == entry[1] and object_id > entry[2]):
+            entry[1] = group_id
+            entry[2] = object_id
+
+    def finish(self, track: FullTrackName) -> None:
+        """Mark a track ended (FINISHED), keeping its largest location."""
+        entry = self._tracks.get(track)
+        if entry is None:
+            self._tracks[track] = [TrackStatusCode.FINISHED, 0, 0]
+        else:
+            entry[0] = TrackStatusCode.FINISHED
+
+    def remove(self, track: FullTrackName) -> bool:
+        """Forget a track. Returns False if it was not registered."""
+        return self._tracks.pop(track, None) is not None
+
+    def status(self, track: FullTrackName) -> Tuple[TrackStatusCode, int, int]:
+        """(status code, largest group id, largest object id) of a track."""
+        entry = self._tracks.get(track)
+        if entry is None:
+            return TrackStatusCode.DOES_NOT_EXIST, 0, 0
+        return TrackStatusCode(entry[0]), entry[1], entry[2]
+
+    def __repr__(self) -> str:
+        return f"TrackRegistry(tracks={len(self._tracks)})"
+
+
+class _NamespaceNode:
+    """Trie node for one namespace tuple element."""
+    __slots__ = ('children', 'subscribers', 'publishers')
+
+    def __init__(self):
+        self.children: Dict[bytes, '_NamespaceNode'] = {}
+        self.subscribers: Set[Any] = set()  # SUBSCRIBE_ANNOUNCES with this exact prefix
+        self.publishers: Set[Any] = set()  # ANNOUNCE of this exact namespace
+
+
+class NamespaceTrie:
+    """Tuple element trie of announced namespaces and announce prefix subscriptions.
+
+    Namespaces are the Tuple[bytes, ...] produced by make_namespace_tuple.
+    Matching the subscribers of an ANNOUNCE walks one node per tuple element,
+    so it is O(depth) regardless of how many prefixes are registered. Owners
+    (typically session protocols) are opaque hashable objects; discard(owner)
+    drops everything an owner registered when its session closes.
+    """
+    __slots__ = ('_root', '_owners')
+
+    def __init__(self):
+        self._root = _NamespaceNode()
+        # owner -> {(is_publisher, namespace)} for discard() on session close
+        self._owners: Dict[Any, Set[Tuple[bool, Tuple[bytes, ...]]]] = {}
+
+    def _node(self, namespace: Tuple[bytes, ...], create: bool = False) -> Optional[_NamespaceNode]:
+        node = self._root
+        for part in namespace:
+            child = node.children.get(part)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[part] = _NamespaceNode()
+            node = child
+        return node
+
+    def _add(self, namespace: Tuple[bytes, ...], owner: Any, is_publisher: bool) -> bool:
+        node = self._node(namespace, create=True)
+        owners = node.publishers if is_publisher else node.subscribers
+        if owner in owners:
+            return False
+        owners.add(owner)
+        self._owners.setdefault(owner, set()).add((is_publisher, namespace))
+        return True
+
+    def _unlink(self, namespace: Tuple[bytes, ...], owner: Any, is_publisher: bool) -> bool:
+        path = [self._root]
+        for part in namespace:
+            child = path[-1].children.get(part)
+            if child is None:
+                return False
+            path.append(child)
+        owners = path[-1].publishers if is_publisher else path[-1].subscribers
+        if owner not in owners:
+            return False
+        owners.discard(owner)
+        # prune nodes left empty, deepest first
+        for depth in range(len(namespace), 0, -1):
+            node = path[depth]
+            if node.children or node.subscribers or node.publishers:
+                break
+            del path[depth - 1].children[namespace[depth - 1]]
+        return True
+
+    def _remove(self, namespace: Tuple[bytes, ...], owner: Any, is_publisher: bool) -> bool:
+        if not self._unlink(namespace, owner, is_publisher):
+            return False
+        entries = self._owners[owner]
+        entries.discard((is_publisher, namespace))
+        if not entries:
+            del self._owners[owner]
+        return True
+
+    def subscribe(self, prefix: Tuple[bytes, ...], subscriber: Any) -> bool:
+        """Register a SUBSCRIBE_ANNOUNCES prefix. Returns False if already registered."""
+        return self._add(prefix, subscriber, False)
+
+    def unsubscribe(self, prefix: Tuple[bytes, ...], subscriber: Any) -> bool:
+        """Remove a SUBSCRIBE_ANNOUNCES prefix. Returns False if not registered."""
+        return self._remove(prefix, subscriber, False)
+
+    def announce(self, namespace: Tuple[bytes, ...], publisher: Any) -> bool:
+        """Register an announced namespace. Returns False if already announced."""
+        return self._add(namespace, publisher, True)
+
+    def unannounce(self, namespace: Tuple[bytes, ...], publisher: Any) -> bool:
+        """Withdraw an announced namespace. Returns False if not announced."""
+        return self._remove(namespace, publisher, True)
+
+    def subscribers(self, namespace: Tuple[bytes, ...]) -> Set[Any]:
+        """All subscribers with a prefix matching the namespace (including itself)."""
+        node = self._root
+        matched = set(node.subscribers)
+        for part in namespace:
+            node = node.children.get(part)
+            if node is None:
+                break
+            matched.update(node.subscribers)
+        return matched
+
+    def publishers(self, namespace: Tuple[bytes, ...]) -> Set[Any]:
+        """Publishers currently announcing exactly this namespace."""
+        node = self._node(namespace)
+        return set(node.publishers) if node is not None else set()
+
+    def announced(self, prefix: Tuple[bytes, ...]) -> List[Tuple[Tuple[bytes, ...], Set[Any]]]:
+        """All announced (namespace, publishers) at or under a prefix."""
+        node = self._node(prefix)
+        if node is None:
+            return []
+        found = []
+        stack = [(prefix, node)]
+        while stack:
+            namespace, node = stack.pop()
+            if node.publishers:
+                found.append((namespace, set(node.publishers)))
+            for part, child in node.children.items():
+                stack.append((namespace + (part,), child))
+        return found
+
+    def discard(self, owner: Any) -> List[Tuple[bytes, ...]]:
+        """Drop all prefixes and namespaces of an owner, returning the namespaces it announced."""
+        withdrawn = []
+        for is_publisher, namespace in self._owners.pop(owner, ()):
+            self._unlink(namespace, owner, is_publisher)
+            if is_publisher:
+                withdrawn.append(namespace)
+        return withdrawn
+
+    def __repr__(self) -> str:
+        return f"NamespaceTrie(owners={len(self._owners)})"
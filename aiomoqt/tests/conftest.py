@@ -1,3 +1,6 @@
+import os
+import heapq
+import asyncio
 from dataclasses import fields
 from aiomoqt.messages import MOQTMessageType
 
@@ -71,3 +74,173 @@ def moqt_message_serialization(cls, params, type_id=None, needs_len=False):
             assert original_value == new_value, f"'{field.name}' doesn't match after deserialization"
     
     return True
+
+
+class MOQTTestSession:
+    """Minimal session object for driving a protocol without a network."""
+    host = 'localhost'
+    port = 4433
+    endpoint = 'moq'
+
+
+class MOQTTestTransport:
+    """Transport stub that discards outgoing datagrams."""
+    def sendto(self, data, addr=None):
+        pass
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+
+class MOQTFakeClock:
+    """Deterministic time for timing tests, standing in for the time module
+    (monotonic), asyncio.sleep and an event loop's timers (time, call_at,
+    call_later). Time only moves on sleep(), advance() or stall()."""
+    class Handle:
+        def __init__(self):
+            self.cancelled = False
+
+        def cancel(self):
+            self.cancelled = True
+
+    resolution = 1e-6  # shortest sleep, like a real timer's granularity
+
+    def __init__(self, now=0.0):
+        self.now = now
+        self.slept = []  # sleep() delays
+        self._timers = []  # heap of (when, seq, handle, callback, args)
+        self._seq = 0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def call_at(self, when, callback, *args):
+        handle = self.Handle()
+        self._seq += 1
+        heapq.heappush(self._timers, (when, self._seq, handle, callback, args))
+        return handle
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(self.now + delay, callback, *args)
+
+    def advance(self, delay):
+        """Move time forward, running each timer when it is due (late if the clock stalled)."""
+        end = self.now + delay
+        while self._timers and self._timers[0][0] <= end:
+            when, _, handle, callback, args = heapq.heappop(self._timers)
+            self.now = max(self.now, when)
+            if not handle.cancelled:
+                callback(*args)
+        self.now = end
+
+    def stall(self, delay):
+        """Move time forward without running timers, as a blocked event loop would."""
+        self.now += delay
+
+    async def sleep(self, delay, result=None):
+        self.slept.append(delay)
+        self.advance(max(delay, self.resolution))
+        await asyncio.sleep(0)
+        return result
+
+
+_test_certificate = None
+
+def moqt_test_certificate():
+    """Self-signed (certificate, private_key) pair for server-side test connections."""
+    global _test_certificate
+    if _test_certificate is None:
+        import datetime
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=10))
+            .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+            .sign(key, hashes.SHA256())
+        )
+        _test_certificate = (cert, key)
+    return _test_certificate
+
+
+def moqt_test_protocol(is_client=True, session=None):
+    """
+    Create a MOQTSessionProtocol over an unconnected QuicConnection with the
+    WebTransport session marked as established, so QUIC events can be fed
+    directly to quic_event_received(). Outgoing data is queued on the QUIC
+    connection but never transmitted. Must be called with a running loop.
+    """
+    from aioquic.quic.configuration import QuicConfiguration
+    from aioquic.quic.connection import QuicConnection
+    from aiomoqt.protocol import MOQTSessionProtocol
+
+    configuration = QuicConfiguration(is_client=is_client)
+    if not is_client:
+        configuration.certificate, configuration.private_key = moqt_test_certificate()
+    quic = QuicConnection(
+        configuration=configuration,
+        original_destination_connection_id=None if is_client else os.urandom(8),
+    )
+    protocol = MOQTSessionProtocol(quic, session=session or MOQTTestSession())
+    protocol.connection_made(MOQTTestTransport())
+    protocol.transmit = lambda: None  # no handshake - nothing can be sent
+    protocol._session_id = 0
+    protocol._control_stream_id = 0 if is_client else 1
+    protocol._wt_sessions[0] = protocol
+    protocol._stream_sessions[protocol._control_stream_id] = protocol
+    protocol._wt_session_setup.set_result(True)
+    return protocol
+
+
+def moqt_rss_bytes():
+    """Current resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+
+def moqt_loopback_sessions(raw_quic=False, endpoint='moq'):
+    """
+    (client_session, server_session) objects holding QUIC configurations for
+    aiomoqt.utils.loopback.loopback_connect(). The server accepts both
+    WebTransport and raw QUIC; the client offers one of them.
+    """
+    import ssl
+    from aioquic.quic.configuration import QuicConfiguration
+    from aioquic.h3.connection import H3_ALPN
+    from aiomoqt.types import MOQT_ALPN
+
+    client = MOQTTestSession()
+    client.endpoint = endpoint
+    client.configuration = QuicConfiguration(
+        is_client=True,
+        alpn_protocols=[MOQT_ALPN] if raw_quic else H3_ALPN,
+        verify_mode=ssl.CERT_NONE,
+        max_datagram_frame_size=65536,
+    )
+    server = MOQTTestSession()
+    server.configuration = QuicConfiguration(
+        is_client=False,
+        alpn_protocols=H3_ALPN + [MOQT_ALPN],
+        max_datagram_frame_size=65536,
+    )
+    server.configuration.certificate, server.configuration.private_key = moqt_test_certificate()
+    return client, server
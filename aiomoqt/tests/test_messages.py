@@ -216,6 +216,142 @@ GOAWAY_TEST_CASES = [
     )
 ]
 
+# Test cases for SUBSCRIBE family messages
+SUBSCRIBE_TEST_CASES = [
+    (
+        Subscribe,
+        {
+            "subscribe_id": 1,
+            "track_alias": 7,
+            "namespace": (b"live", b"sports"),
+            "track_name": b"football",
+            "priority": 128,
+            "group_order": GroupOrder.ASCENDING,
+            "filter_type": FilterType.LATEST_OBJECT,
+            "parameters": {ParamType.AUTHORIZATION_INFO: b"auth-token-123"}
+        },
+        MOQTMessageType.SUBSCRIBE,
+        False,
+        "latest_object"
+    ),
+    (
+        Subscribe,
+        {
+            "subscribe_id": 2,
+            "track_alias": 8,
+            "namespace": (b"vod",),
+            "track_name": b"movie",
+            "priority": 1,
+            "group_order": GroupOrder.DESCENDING,
+            "filter_type": FilterType.ABSOLUTE_RANGE,
+            "start_group": 10,
+            "start_object": 5,
+            "end_group": 20,
+            "parameters": {}
+        },
+        MOQTMessageType.SUBSCRIBE,
+        False,
+        "absolute_range"
+    ),
+    (
+        SubscribeOk,
+        {
+            "subscribe_id": 1,
+            "expires": 0,
+            "group_order": GroupOrder.ASCENDING,
+            "content_exists": ContentExistsCode.EXISTS,
+            "largest_group_id": 100,
+            "largest_object_id": 3,
+            "parameters": {ParamType.DELIVERY_TIMEOUT: b"\x40\x64"}
+        },
+        MOQTMessageType.SUBSCRIBE_OK,
+        False,
+        "content_exists"
+    ),
+    (
+        SubscribeOk,
+        {
+            "subscribe_id": 1,
+            "expires": 1000,
+            "group_order": GroupOrder.DESCENDING,
+            "content_exists": ContentExistsCode.NO_CONTENT,
+            "parameters": {}
+        },
+        MOQTMessageType.SUBSCRIBE_OK,
+        False,
+        "no_content"
+    ),
+    (
+        SubscribeError,
+        {
+            "subscribe_id": 1,
+            "error_code": SubscribeErrorCode.TRACK_DOES_NOT_EXIST,
+            "reason": "no such track",
+            "track_alias": 7
+        },
+        MOQTMessageType.SUBSCRIBE_ERROR,
+        False,
+        "basic"
+    ),
+    (
+        SubscribeUpdate,
+        {
+            "subscribe_id": 1,
+            "start_group": 5,
+            "start_object": 0,
+            "end_group": 50,
+            "priority": 10,
+            "parameters": {ParamType.DELIVERY_TIMEOUT: b"\x40\x64"}
+        },
+        MOQTMessageType.SUBSCRIBE_UPDATE,
+        False,
+        "basic"
+    ),
+    (
+        SubscribeDone,
+        {
+            "subscribe_id": 1,
+            "status_code": SubscribeDoneCode.TRACK_ENDED,
+            "stream_count": 12,
+            "reason": "track ended"
+        },
+        MOQTMessageType.SUBSCRIBE_DONE,
+        False,
+        "basic"
+    ),
+    (Unsubscribe, {"subscribe_id": 1}, MOQTMessageType.UNSUBSCRIBE, False, "basic"),
+    (MaxSubscribeId, {"subscribe_id": 1000}, MOQTMessageType.MAX_SUBSCRIBE_ID, False, "basic"),
+    (SubscribesBlocked, {"maximum_subscribe_id": 100000},
+     MOQTMessageType.SUBSCRIBES_BLOCKED, False, "basic"),
+]
+
+# Test cases for TRACK_STATUS messages
+TRACK_STATUS_TEST_CASES = [
+    (
+        TrackStatusRequest,
+        {
+            "namespace": (b"live", b"sports"),
+            "track_name": b"football"
+        },
+        MOQTMessageType.TRACK_STATUS_REQUEST,
+        False,
+        "basic"
+    ),
+    (
+        TrackStatus,
+        {
+            "namespace": (b"live", b"sports"),
+            "track_name": b"football",
+            "status_code": TrackStatusCode.IN_PROGRESS,
+            "last_group_id": 42,
+            "last_object_id": 7
+        },
+        MOQTMessageType.TRACK_STATUS,
+        False,
+        "basic"
+    ),
+]
+
 # Define test cases for parameterized testing
 TEST_CASES = [
     # (class, params, type_id, needs_len, test_id)
@@ -396,6 +532,8 @@ TEST_CASES.extend(FETCH_ERROR_TEST_CASES)
 TEST_CASES.extend(SERVER_SETUP_TEST_CASES)
 TEST_CASES.extend(CLIENT_SETUP_TEST_CASES)
 TEST_CASES.extend(GOAWAY_TEST_CASES)
+TEST_CASES.extend(SUBSCRIBE_TEST_CASES)
+TEST_CASES.extend(TRACK_STATUS_TEST_CASES)
 
 @pytest.mark.parametrize(
     "cls,params,type_id,needs_len",
@@ -547,3 +685,243 @@ def test_ObjectHeader():
         assert len(obj.extensions) == len(new_obj.extensions)
         
     assert len(obj.payload) == len(new_obj.payload)
+
+@pytest.mark.parametrize(
+    "cls,params,type_id,needs_len",
+    [case[:4] for case in TEST_CASES],
+    ids=[moqt_test_id(case) for case in TEST_CASES]
+)
+def test_moqt_message_slots(cls, params, type_id, needs_len):
+    """Message instances are slotted and carry the type as a class constant."""
+    obj = cls(**params)
+    assert not hasattr(obj, '__dict__')
+    if type_id is not None:
+        assert cls.type == type_id
+
+
+def test_empty_extensions_shared():
+    obj = ObjectHeader(object_id=1, payload=b'Hello World')
+    assert obj.extensions is EMPTY_EXTENSIONS
+    buf = obj.serialize()
+    buf_len = buf.tell()
+    buf.seek(0)
+    new_obj = ObjectHeader.deserialize(buf, buf_len)
+    assert new_obj.extensions is EMPTY_EXTENSIONS
+    assert new_obj.extensions == {}
+    assert new_obj.extensions.get(MOQT_TIMESTAMP_EXT) is None
+
+
+CONTROL_TEST_CASES = [case for case in TEST_CASES if isinstance(case[2], MOQTMessageType)]
+
+@pytest.mark.parametrize(
+    "cls,params,type_id,needs_len",
+    [case[:4] for case in CONTROL_TEST_CASES],
+    ids=[moqt_test_id(case) for case in CONTROL_TEST_CASES]
+)
+def test_control_message_length(cls, params, type_id, needs_len):
+    """Control message length field matches the encoded payload."""
+    buf = cls(**params).serialize()
+    buf_len = buf.tell()
+    buf.seek(0)
+    assert buf.pull_uint_var() == type_id
+    assert buf.pull_uint_var() == buf_len - buf.tell()
+
+
+def test_schema_large_message():
+    """Messages beyond the default buffer size are encoded at their exact size."""
+    token = b'T' * 10000
+    namespace = tuple(b'ns%d' % i for i in range(32))
+    obj = Announce(namespace=namespace, parameters={ParamType.AUTHORIZATION_INFO: token})
+    buf = obj.serialize()
+    buf.seek(0)
+    assert buf.pull_uint_var() == MOQTMessageType.ANNOUNCE
+    buf.pull_uint_var()
+    new_obj = Announce.deserialize(buf)
+    assert new_obj.namespace == namespace
+    assert new_obj.parameters[ParamType.AUTHORIZATION_INFO] == token
+
+
+def test_schema_param_encoding():
+    """Int and str parameter values are encoded as varint and utf-8 bytes."""
+    obj = SubscribeAnnounces(
+        namespace_prefix=(b'live',),
+        parameters={ParamType.DELIVERY_TIMEOUT: 100, ParamType.AUTHORIZATION_INFO: 'token'})
+    buf = obj.serialize()
+    buf.seek(0)
+    buf.pull_uint_var()
+    buf.pull_uint_var()
+    new_obj = SubscribeAnnounces.deserialize(buf)
+    assert new_obj.parameters[ParamType.DELIVERY_TIMEOUT] == b'\x40\x64'
+    assert new_obj.parameters[ParamType.AUTHORIZATION_INFO] == b'token'
+
+
+@pytest.mark.parametrize("version", [0xff00000a, 0xff000008])
+def test_extension_template(version):
+    """Template extensions decode like dict extensions, with variable values patched in place."""
+    codec = get_codec(version)
+    exts = codec.extension_template({0x25: b'static-ext', 0x0: 4207849484})
+    for ts in (0, 1700000000000, (1 << 62) - 1):
+        exts[MOQT_TIMESTAMP_EXT] = ts
+        for obj in (
+            ObjectHeader(object_id=1, extensions=exts, payload=b'Hello World'),
+            FetchObject(group_id=1, subgroup_id=0, object_id=2, extensions=exts, payload=b'Hi'),
+        ):
+            buf = obj.serialize(codec)
+            buf_len = buf.tell()
+            buf.seek(0)
+            if isinstance(obj, ObjectHeader):
+                new_obj = ObjectHeader.deserialize(buf, buf_len, codec)
+            else:
+                new_obj = FetchObject.deserialize(buf, codec)
+            assert new_obj.extensions == {0x25: b'static-ext', 0x0: 4207849484, MOQT_TIMESTAMP_EXT: ts}
+            assert new_obj.payload == obj.payload
+
+        buf = ObjectDatagram(track_alias=1, group_id=2, object_id=3, extensions=exts,
+                             payload=b'datagram').serialize(codec)
+        buf_len = buf.tell()
+        buf.seek(0)
+        assert buf.pull_uint_var() == DatagramType.OBJECT_DATAGRAM
+        new_obj = ObjectDatagram.deserialize(buf, buf_len, codec)
+        assert new_obj.extensions[MOQT_TIMESTAMP_EXT] == ts
+        assert new_obj.payload == b'datagram'
+
+
+@pytest.mark.parametrize("version,other", [(0xff00000a, 0xff000008), (0xff000008, 0xff00000a)])
+def test_codec_versions(version, other):
+    """Codecs encode per version independent of DEFAULT_CODEC."""
+    codec = get_codec(version)
+    assert codec is get_codec(version)
+    assert DEFAULT_CODEC is get_codec(MOQT_CUR_VERSION)
+    exts = {0x25: b'ext', MOQT_TIMESTAMP_EXT: 1234}
+    # a template built for another version is still encoded for the codec's version
+    for extensions in (exts, get_codec(other).extension_template({0x25: b'ext'})):
+        if isinstance(extensions, ExtensionTemplate):
+            extensions[MOQT_TIMESTAMP_EXT] = 1234
+        buf = ObjectHeader(object_id=1, extensions=extensions, payload=b'x').serialize(codec)
+        buf_len = buf.tell()
+        buf.seek(0)
+        new_obj = ObjectHeader.deserialize(buf, buf_len, codec)
+        assert new_obj.extensions == exts
+
+
+def test_extension_template_errors():
+    exts = ExtensionTemplate({0x25: b'static-ext'})
+    with pytest.raises(KeyError):
+        exts[0x25] = 1
+    with pytest.raises(ValueError):
+        exts[MOQT_TIMESTAMP_EXT] = 1 << 62
+    with pytest.raises(ValueError):
+        ExtensionTemplate(variable=(0x21,))
+    with pytest.raises(ValueError):
+        ExtensionTemplate({MOQT_TIMESTAMP_EXT: 1})
+
+
+def test_full_track_name():
+    track = FullTrackName('live/sports', 'football')
+    assert track is FullTrackName((b'live', b'sports'), b'football')
+    assert track is FullTrackName(['live', b'sports'], 'football')
+    assert track.namespace == (b'live', b'sports') and track.name == b'football'
+    assert {track: 1}[FullTrackName((b'live', b'sports'), b'football')] == 1
+    assert track != FullTrackName('live/sports', 'hockey')
+    with pytest.raises(AttributeError):
+        track.name = b'hockey'
+    with pytest.raises(ValueError):
+        FullTrackName(42, 'football')
+
+    msg = Subscribe(
+        subscribe_id=1, track_alias=1, namespace=(b'live', b'sports'), track_name=b'football',
+        priority=128, group_order=GroupOrder.ASCENDING, filter_type=FilterType.LATEST_OBJECT)
+    assert msg.full_track_name is track
+    assert Fetch(fetch_type=FetchType.JOINING_FETCH, subscribe_id=2, joining_sub_id=1).full_track_name is None
+
+
+def test_full_track_name_intern_bound(monkeypatch):
+    import aiomoqt.types
+    monkeypatch.setattr(aiomoqt.types, 'MOQT_TRACK_INTERN_SIZE', 4)
+    monkeypatch.setattr(aiomoqt.types, '_track_names', {})
+    first = FullTrackName('ns', 'track0')
+    for i in range(1, 10):
+        FullTrackName('ns', f'track{i}')
+    assert len(aiomoqt.types._track_names) == 4
+    # an evicted name still equals (and hashes like) its re-interned replacement
+    again = FullTrackName('ns', 'track0')
+    assert again is not first and again == first and hash(again) == hash(first)
+
+
+def test_buffer_reader():
+    from aioquic.buffer import Buffer, BufferReadError
+    from aiomoqt.utils.reader import BufferReader
+
+    buf = Buffer(capacity=64)
+    values = [0, 63, 64, 16383, 16384, 2**30 - 1, 2**30, 2**62 - 1]
+    for value in values:
+        buf.push_uint_var(value)
+    buf.push_uint8(7)
+    buf.push_bytes(b'payload')
+    for data in (buf.data, memoryview(buf.data)):
+        reader = BufferReader(data)
+        assert [reader.pull_uint_var() for _ in values] == values
+        assert reader.pull_uint8() == 7
+        assert reader.pull_bytes(7) == b'payload' and reader.eof()
+        with pytest.raises(BufferReadError):
+            reader.pull_uint_var()
+
+    # data plane messages deserialize from a reader as from a Buffer
+    extensions = {0: 4207849484, 1: b'\xfa\xce\xb0\x0c'}
+    data = ObjectDatagram(track_alias=1, group_id=2, object_id=3, extensions=extensions,
+                          payload=b'Hello World').serialize().data
+    reader = BufferReader(memoryview(data))
+    assert reader.pull_uint_var() == DatagramType.OBJECT_DATAGRAM
+    msg = ObjectDatagram.deserialize(reader, reader.capacity)
+    assert msg.extensions == extensions and msg.payload == b'Hello World'
+    assert isinstance(msg.payload, bytes)
+
+
+@pytest.mark.parametrize("version", [0xff000008, MOQT_CUR_VERSION])
+def test_shared_object(version):
+    """Shared encodings match per-subscriber serialization with the subscriber's track alias."""
+    codec = get_codec(version)
+    subgroup = SharedSubgroup(group_id=300, subgroup_id=2, publisher_priority=7)
+    for alias in (1, 70, 20000):
+        assert subgroup.header(alias) == SubgroupHeader(
+            track_alias=alias, group_id=300, subgroup_id=2, publisher_priority=7).serialize().data
+
+    exts = codec.extension_template({0x25: b'static'})
+    exts[MOQT_TIMESTAMP_EXT] = 1234
+    obj = ObjectHeader(object_id=5, extensions=exts, payload=b'x' * 1000)
+    shared = SharedObject(obj)
+    assert not shared.is_datagram
+    assert shared.data(codec) == obj.serialize(codec).data
+    assert shared.data(codec) is shared.data(codec)  # serialized once
+    with pytest.raises(ValueError):
+        shared.datagram(1, codec)
+
+    for dgram in (
+        ObjectDatagram(track_alias=0, group_id=3, object_id=4, extensions={1: b'ext'}, payload=b'y' * 500),
+        ObjectDatagramStatus(track_alias=0, group_id=3, object_id=4, status=ObjectStatus.END_OF_GROUP),
+    ):
+        shared = SharedObject(dgram)
+        assert shared.is_datagram
+        for alias in (1, 70, 20000):
+            dgram.track_alias = alias
+            assert shared.datagram(alias, codec) == dgram.serialize(codec).data
+        assert shared.datagram(9, codec, prefix=b'\x00')[:1] == b'\x00'
+
+
+@pytest.mark.parametrize("version", [0xff000008, MOQT_CUR_VERSION])
+def test_serialize_batch(version):
+    """A batch encodes to the concatenation (streams) or list (datagrams) of per-object serializations."""
+    codec = get_codec(version)
+    objects = [(0, b'a' * 10, None), (1, b'', {2: 7}), (2, b'c' * 300, {1: b'ext'})]
+    batch = ObjectHeader.serialize_batch(iter(objects), codec)
+    assert batch.data == b''.join(
+        ObjectHeader(object_id=o, payload=p, extensions=e or EMPTY_EXTENSIONS).serialize(codec).data
+        for o, p, e in objects)
+
+    dgrams = ObjectDatagram.serialize_batch(9, 4, objects, publisher_priority=3, codec=codec)
+    assert dgrams == [
+        ObjectDatagram(track_alias=9, group_id=4, object_id=o, publisher_priority=3,
+                       extensions=e or EMPTY_EXTENSIONS, payload=p).serialize(codec).data
+        for o, p, e in objects]
+    assert ObjectDatagram.serialize_batch(9, 4, objects[:1], codec=codec, prefix=b'\x00')[0] == b'\x00' + \
+        ObjectDatagram(track_alias=9, group_id=4, object_id=0, payload=b'a' * 10).serialize(codec).data
@@ -1,10 +1,1263 @@
+import gc
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+import asyncio
+from aioquic.buffer import Buffer
+from aioquic.quic.events import StreamDataReceived, StreamReset
+from conftest import moqt_test_protocol, moqt_rss_bytes, moqt_loopback_sessions, MOQTTestSession, MOQTFakeClock
+
 from aiomoqt.messages import *
 from aiomoqt.protocol import *
 from aiomoqt.client import *
 from aiomoqt.client import *
 from aiomoqt.types import *
+from aiomoqt.state import NamespaceTrie
+from aiomoqt.utils.auth import Authorizer
+from aiomoqt.utils import limits as limits_module
+from aiomoqt.utils.limits import LoopLagMonitor
+from aiomoqt.utils.shmring import ObjectRingWriter, ObjectRingReader, RingFanout, ring_name
+from aiomoqt.utils import pacer as pacer_module
+from aiomoqt.utils.loopback import loopback_connect
+from aiomoqt.utils.tickets import SessionTicketStore
+from aiomoqt.utils.timers import TimerWheel
+from aiomoqt.utils.logger import set_log_level
 
 
 def test_moqt_stub():
     assert True
+
+
+def subgroup_stream_data(track_alias, group_id, object_id=0, status=ObjectStatus.NORMAL):
+    """WebTransport uni stream prefix + subgroup header + one object."""
+    buf = Buffer(capacity=64)
+    buf.push_uint_var(0x54)  # WT uni stream type
+    buf.push_uint_var(0)  # WT session id
+    data = buf.data
+    data += SubgroupHeader(track_alias=track_alias, group_id=group_id, subgroup_id=0).serialize().data
+    data += ObjectHeader(object_id=object_id, status=status, payload=b'x' * 100).serialize().data
+    return data
+
+
+def test_subscription_lifecycle():
+    async def run():
+        session = moqt_test_protocol()
+        sub_msg = session.subscribe('test', 'track')
+        assert sub_msg.subscribe_id in session._subscriptions
+        assert session._track_aliases[sub_msg.track_alias].subscribe_id == sub_msg.subscribe_id
+
+        # SUBSCRIBE_DONE from the publisher drops subscription state
+        await session._handle_subscribe_done(SubscribeDone(
+            subscribe_id=sub_msg.subscribe_id,
+            status_code=SubscribeDoneCode.TRACK_ENDED,
+            stream_count=0,
+            reason="done"))
+        assert not session._subscriptions and not session._track_aliases
+
+        # UNSUBSCRIBE on the subscriber side
+        sub_msg = session.subscribe('test', 'track')
+        session.unsubscribe(sub_msg.subscribe_id)
+        assert not session._subscriptions and not session._track_aliases
+
+        # FETCH_CANCEL on the subscriber side
+        fetch_msg = session.fetch('test', 'track', end_group=10)
+        assert fetch_msg.subscribe_id in session._subscriptions
+        session.fetch_cancel(fetch_msg.subscribe_id)
+        assert not session._subscriptions
+
+        # publisher side: UNSUBSCRIBE and FETCH_CANCEL from the peer
+        publisher = moqt_test_protocol(is_client=False)
+        await publisher._handle_subscribe(Subscribe(
+            subscribe_id=7, track_alias=3, namespace=(b'test',), track_name=b'track',
+            priority=128, group_order=GroupOrder.ASCENDING, filter_type=FilterType.LATEST_OBJECT))
+        assert 7 in publisher._subscribers
+        assert 7 in publisher._track_subscribers[FullTrackName('test', 'track')]
+        await publisher._handle_unsubscribe(Unsubscribe(subscribe_id=7))
+        assert not publisher._subscribers and not publisher._track_subscribers
+        await publisher._handle_fetch(Fetch(
+            fetch_type=FetchType.JOINING_FETCH, subscribe_id=8, joining_sub_id=7, pre_group_offset=0))
+        assert 8 in publisher._subscribers
+        await publisher._handle_fetch_cancel(FetchCancel(subscribe_id=8))
+        assert not publisher._subscribers
+
+    asyncio.run(run())
+
+
+def test_data_stream_reset():
+    async def run():
+        session = moqt_test_protocol()
+        sub_msg = session.subscribe('test', 'track')
+        data = subgroup_stream_data(sub_msg.track_alias, group_id=0)
+        session.quic_event_received(StreamDataReceived(data=data, end_stream=False, stream_id=3))
+        await asyncio.sleep(0)
+        sub = session._subscriptions[sub_msg.subscribe_id]
+        assert sub.streams == {3}
+        session.quic_event_received(StreamReset(error_code=0, stream_id=3))
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert not session._data_streams
+        assert not sub.streams
+        assert session._close_err is None
+
+    asyncio.run(run())
+
+
+def test_stream_role_cache():
+    """Stream roles are decided on first data and cached until the stream is released."""
+    async def run():
+        session = moqt_test_protocol()
+        sub_msg = session.subscribe('test', 'track')
+        session.quic_event_received(StreamDataReceived(
+            data=subgroup_stream_data(sub_msg.track_alias, group_id=0), end_stream=False, stream_id=3))
+        control = SubscribeOk(subscribe_id=sub_msg.subscribe_id, expires=0,
+                              group_order=GroupOrder.ASCENDING, content_exists=0).serialize().data
+        session.quic_event_received(StreamDataReceived(data=control, end_stream=False, stream_id=0))
+        bidi = Buffer(capacity=8)
+        bidi.push_uint_var(0x41)  # WT bidi stream
+        bidi.push_uint_var(0)
+        session.quic_event_received(StreamDataReceived(data=bidi.data + b'x', end_stream=False, stream_id=5))
+        assert session._stream_roles == {3: StreamRole.DATA, 0: StreamRole.CONTROL, 5: StreamRole.IGNORED}
+
+        # later data goes straight to the data stream
+        data = ObjectHeader(object_id=1, payload=b'y').serialize().data
+        session.quic_event_received(StreamDataReceived(data=data, end_stream=False, stream_id=3))
+        assert session._data_streams[3].queue.qsize() == 2
+        session.quic_event_received(StreamReset(error_code=0, stream_id=3))
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert 3 not in session._stream_roles and 3 not in session._stream_sessions
+
+    asyncio.run(run())
+
+
+def test_data_stream_split_chunks():
+    """Objects split across any chunk boundaries are reassembled."""
+    async def run():
+        session = moqt_test_protocol()
+        sub_msg = session.subscribe('test', 'track')
+        received = []
+        handle_stream = session._moqt_handle_data_stream
+        def record(stream_id, buf, buf_len):
+            msg = handle_stream(stream_id, buf, buf_len)
+            received.append(msg)
+            return msg
+        session._moqt_handle_data_stream = record
+
+        data = subgroup_stream_data(sub_msg.track_alias, group_id=0)
+        for object_id in range(1, 20):
+            data += ObjectHeader(object_id=object_id, payload=bytes([object_id]) * (object_id * 37)).serialize().data
+        for pos in range(0, len(data), 13):
+            session.quic_event_received(StreamDataReceived(data=data[pos:pos + 13], end_stream=False, stream_id=3))
+            await asyncio.sleep(0)
+        objects = [msg for msg in received if isinstance(msg, ObjectHeader)]
+        assert [obj.object_id for obj in objects] == list(range(20))
+        assert all(obj.payload == bytes([obj.object_id]) * (obj.object_id * 37) for obj in objects[1:])
+
+    asyncio.run(run())
+
+
+def test_object_pacer(monkeypatch):
+    """Objects beyond the burst allowance are spread over the interval, or slowed to cwnd / RTT."""
+    clock = MOQTFakeClock()
+    monkeypatch.setattr(pacer_module, 'time', clock)
+    monkeypatch.setattr(pacer_module, 'asyncio', clock)
+
+    async def run():
+        session = moqt_test_protocol(is_client=False)
+        stream_id = session._quic.get_next_available_stream_id(is_unidirectional=True)
+        pieces = []
+        send_stream_data = session.send_stream_data
+        def record(stream_id, data, end_stream=False):
+            pieces.append(len(data))
+            send_stream_data(stream_id, data, end_stream)
+        session.send_stream_data = record
+        pacer = session.create_pacer(interval=0.05, burst=4000)
+        assert pacer.link_rate() is None  # no RTT sample yet
+
+        await pacer.write(stream_id, b'p' * 2000)  # within the burst allowance
+        assert pieces == [2000] and clock.slept == []
+        size = len(ObjectHeader(object_id=0, payload=b'i' * 20000).serialize().data)
+        await pacer.write(stream_id, SharedObject(ObjectHeader(object_id=0, payload=b'i' * 20000)))
+        # quantum pieces at size / interval, after the 2000 bytes of burst credit left
+        assert sum(pieces[1:]) == size and max(pieces[1:]) <= pacer.quantum
+        rate = size / 0.05
+        assert (size - 2000) / rate <= sum(clock.slept) <= (size - 2000 + pacer.quantum) / rate
+        sent = session._quic._streams[stream_id].sender._buffer
+        assert len(sent) == 2000 + size
+
+        # link slower than the object rate: paced at cwnd / smoothed RTT (10 KB / 100 ms)
+        loss = session._quic._loss
+        loss._rtt_initialized, loss._rtt_smoothed = True, 0.1
+        loss._cc.congestion_window = 10000
+        assert pacer.rate(20000) == pytest.approx(100000)
+        tokens, slept, written = pacer._tokens, sum(clock.slept), len(pieces)
+        await pacer.write(stream_id, b'i' * 12000, end_stream=True)
+        assert sum(pieces[written:]) == 12000
+        assert sum(clock.slept) - slept == pytest.approx((12000 - tokens) / 100000, abs=pacer.quantum / 100000)
+        assert session._quic._streams[stream_id].sender._buffer_fin is not None
+
+    asyncio.run(run())
+
+
+def test_data_stream_credit():
+    """Peer uni stream limit is kept ahead of use; publishers see and wait for the peer's limit."""
+    async def run():
+        # receive side: the local MAX_STREAMS stays a window ahead of the streams opened by the peer
+        session = moqt_test_protocol()
+        limit = session._quic._local_max_streams_uni
+        assert limit.value == session.max_data_streams == MOQT_MAX_DATA_STREAMS
+        session.max_data_streams = 8
+        limit.value = 8
+        sub_msg = session.subscribe('test', 'track')
+        for n, stream_id in enumerate((3, 7, 11, 15, 19)):
+            limit.used = stream_id // 4 + 1  # as counted by QUIC on the STREAM frame
+            session.quic_event_received(StreamDataReceived(
+                data=subgroup_stream_data(sub_msg.track_alias, group_id=n), end_stream=False, stream_id=stream_id))
+        assert limit.used == 5 and limit.value == 5 + 8
+
+        # send side: streams beyond the peer's limit are counted, open_data_stream() waits for credit
+        publisher = moqt_test_protocol(is_client=False)
+        publisher._raw_quic = True
+        publisher._quic._remote_max_streams_uni = 2
+        assert publisher.data_stream_credit() == 2
+        assert [publisher.create_data_stream() for _ in range(2)] == [3, 7]
+        assert publisher.data_stream_credit() == 0 and publisher.data_streams_blocked == 0
+        assert publisher.create_data_stream() == 11
+        assert publisher.data_streams_blocked == 1 and publisher._data_stream_limit == 2
+
+        opening = asyncio.ensure_future(publisher.open_data_stream(timeout=2))
+        await asyncio.sleep(0)
+        assert not opening.done() and publisher.data_streams_blocked == 2
+        publisher.datagram_received(b'', ('127.0.0.1', 4433))  # no MAX_STREAMS yet: still waiting
+        await asyncio.sleep(0)
+        assert not opening.done()
+        publisher._quic._remote_max_streams_uni = 10  # MAX_STREAMS received
+        publisher.datagram_received(b'', ('127.0.0.1', 4433))
+        assert await opening == 15
+        assert publisher._data_stream_limit is None and publisher.data_stream_credit() == 6
+
+        publisher._quic._remote_max_streams_uni = 0
+        opening = asyncio.ensure_future(publisher.open_data_stream())
+        await asyncio.sleep(0)
+        publisher._close_session(SessionCloseCode.INTERNAL_ERROR, "closed")
+        with pytest.raises(MOQTException):
+            await opening
+
+    asyncio.run(run())
+
+
+def test_aioquic_internals():
+    """The private aioquic state read for stream credit and pacing exists (aioquic is pinned in pyproject)."""
+    quic = QuicConnection(configuration=QuicConfiguration(is_client=True))
+    local = quic._local_max_streams_uni
+    assert isinstance(local.value, int) and isinstance(local.used, int)
+    assert isinstance(quic._remote_max_streams_uni, int)
+    loss = quic._loss
+    assert isinstance(loss.congestion_window, int) and isinstance(loss._rtt_initialized, bool)
+    assert isinstance(loss._rtt_smoothed, float)
+
+
+def test_subscribe_update_priority():
+    """SUBSCRIBE_UPDATE changes the order in which a publisher sends a subscription's data streams."""
+    async def run():
+        client, server = await loopback_connect(*moqt_loopback_sessions(raw_quic=True))
+        await client.client_session_init(timeout=2)
+        low = client.subscribe('live/test', 'low', priority=200)
+        high = client.subscribe('live/test', 'high', priority=10)
+        await asyncio.sleep(0.01)
+        assert server._subscribers[low.subscribe_id].priority == 200
+        # order in which each group's last byte is handed to QUIC: what the publisher
+        # schedules, independent of loss and retransmission on the loopback socket
+        finished, received = [], []
+        groups, unsent = {}, {}
+        quic_send = server._quic.send_stream_data
+        def record_send(stream_id, data, end_stream=False):
+            quic_send(stream_id, data, end_stream=end_stream)
+            if stream_id in unsent:
+                unsent[stream_id] -= len(data)
+                if not unsent[stream_id]:
+                    finished.append(groups[stream_id])
+        server._quic.send_stream_data = record_send
+        handle_stream = client._moqt_handle_data_stream
+        def record(stream_id, buf, buf_len):
+            msg = handle_stream(stream_id, buf, buf_len)
+            if isinstance(msg, ObjectHeader):
+                received.append(client._data_streams[stream_id].header.group_id)
+            return msg
+        client._moqt_handle_data_stream = record
+
+        async def send_groups(low_group, high_group):
+            for sub_msg, group_id in ((low, low_group), (high, high_group)):  # low priority written first
+                stream_id = server.create_data_stream(sub_msg.subscribe_id)
+                groups[stream_id] = group_id
+                header = SubgroupHeader(track_alias=sub_msg.track_alias, group_id=group_id, subgroup_id=0)
+                obj = ObjectHeader(object_id=0, payload=b'x' * 100000)
+                data = header.serialize().data + obj.serialize(server.codec).data
+                unsent[stream_id] = len(data)
+                server.send_stream_data(stream_id, data, transmit=False)
+            server.transmit()
+            for _ in range(500):
+                await asyncio.sleep(0.01)
+                if len(received) == high_group:
+                    break
+            assert sorted(received[-2:]) == [low_group, high_group]
+
+        await send_groups(1, 2)
+        assert finished == [2, 1]
+        update = client.subscribe_update(low.subscribe_id, priority=0, end_group=5)
+        assert client._subscriptions[low.subscribe_id].priority == 0
+        await asyncio.sleep(0.01)
+        sub = server._subscribers[low.subscribe_id]
+        assert (sub.priority, sub.end_group) == (update.priority, update.end_group) == (0, 5)
+        await send_groups(3, 4)
+        assert finished == [2, 1, 3, 4]
+
+        # the range only narrows; finished subscriptions leave the schedule
+        with pytest.raises(MOQTException):
+            client.subscribe_update(low.subscribe_id, end_group=0)
+        high_streams = set(server._subscribers[high.subscribe_id].streams)
+        client.unsubscribe(high.subscribe_id)
+        await asyncio.sleep(0.01)
+        assert len(high_streams) == 2 and not high_streams & server._send_priorities.keys()
+        await server._handle_subscribe_update(SubscribeUpdate(
+            subscribe_id=low.subscribe_id, start_group=0, start_object=0, end_group=9, priority=0))
+        assert server._close_err[0] == SessionCloseCode.PROTOCOL_VIOLATION
+
+    asyncio.run(run())
+
+
+def test_subscribe_update_queued():
+    """A SUBSCRIBE queued by MAX_SUBSCRIBE_ID is rewritten by SUBSCRIBE_UPDATE, keeping its filter."""
+    async def run():
+        session = moqt_test_protocol()
+        session._set_peer_max_subscribe_id(session._next_subscribe_id)
+        latest = session.subscribe('live/test', 'latest')
+        ranged = session.subscribe('live/test', 'ranged', filter_type=FilterType.ABSOLUTE_START,
+                                   start_group=2, start_object=0)
+        assert len(session._blocked_requests) == 2
+
+        def queued(pos):
+            buf = Buffer(data=session._blocked_requests[pos][1].data)
+            buf.pull_uint_var(), buf.pull_uint_var()  # type, length
+            return Subscribe.deserialize(buf)
+
+        # a latest object subscribe has no start to range from: only the priority changes
+        session.subscribe_update(latest.subscribe_id, priority=5)
+        request = queued(0)
+        assert (request.filter_type, request.priority) == (FilterType.LATEST_OBJECT, 5)
+        for kwargs in ({'end_group': 5}, {'start_group': 3}):
+            with pytest.raises(MOQTException):
+                session.subscribe_update(latest.subscribe_id, **kwargs)
+        assert queued(0).filter_type == FilterType.LATEST_OBJECT
+
+        session.subscribe_update(ranged.subscribe_id, start_group=3, end_group=5)
+        request = queued(1)
+        assert request.filter_type == FilterType.ABSOLUTE_RANGE
+        assert (request.start_group, request.start_object, request.end_group) == (3, 0, 4)
+
+    asyncio.run(run())
+
+
+def test_timer_wheel():
+    clock = MOQTFakeClock()
+    wheel = TimerWheel(resolution=0.25, slots=8, loop=clock)
+    fired = []
+    def fire(name):
+        fired.append((name, clock.now))
+    wheel.call_later(0.5, fire, 'short')
+    idle = wheel.call_later(1.25, fire, 'idle')
+    cancelled = wheel.call_later(0.75, fire, 'cancelled')
+    wheel.call_later(5.0, fire, 'long')  # beyond one wheel revolution
+    cancelled.cancel()
+    assert len(wheel) == 3
+    for _ in range(6):  # activity keeps the idle timer from expiring
+        clock.advance(0.5)
+        idle.touch()
+    assert fired == [('short', 0.5)] and idle.active
+    clock.advance(3.0)
+    assert fired == [('short', 0.5), ('idle', 4.25), ('long', 5.0)]
+    assert len(wheel) == 0 and wheel._handle is None  # no loop wakeups while empty
+    assert not clock._timers
+
+    # a stalled loop fires overdue timers at the next sweep
+    wheel.call_later(0.5, fire, 'stalled')
+    clock.stall(3.0)
+    clock.advance(0)
+    assert fired[-1] == ('stalled', 9.0) and len(wheel) == 0
+
+
+def test_stream_idle_and_request_timeouts():
+    """Idle data streams are stopped and unanswered requests time out, configurable per request."""
+    async def run():
+        session = moqt_test_protocol()
+        session._timers = session._requests._timers = TimerWheel(resolution=0.01)
+        session.idle_stream_timeout = 0.04
+        default_sub = session.subscribe('test', 'default')
+        sub_msg = session.subscribe('test', 'track', idle_timeout=0.2)
+        for stream_id, msg in ((3, default_sub), (7, sub_msg)):
+            data = subgroup_stream_data(msg.track_alias, group_id=0)
+            session.quic_event_received(StreamDataReceived(data=data, end_stream=False, stream_id=stream_id))
+        await asyncio.sleep(0.1)
+        assert 3 not in session._data_streams  # stopped and dropped
+        assert not session._data_streams[7].reset
+        await asyncio.sleep(0.2)
+        assert not session._data_streams
+        assert len(session._timers) == 0
+
+        t0 = asyncio.get_running_loop().time()
+        response = await session.subscribe('test', 'late', wait_response=True, timeout=0.05)
+        assert isinstance(response, SubscribeError) and response.error_code == 0x5
+        assert asyncio.get_running_loop().time() - t0 < 1
+        assert not session._requests
+
+    asyncio.run(run())
+
+
+def test_pending_requests():
+    """Responses resolve requests by (type, id) and free their entries; FETCH waits on FETCH_OK."""
+    async def run():
+        session = moqt_test_protocol()
+        announce = session.announce('live/sports', wait_response=True)
+        await session._handle_announce_ok(AnnounceOk(namespace=(b'live', b'sports')))
+        assert isinstance(await announce, AnnounceOk)
+
+        fetch = session.fetch('test', 'track', end_group=4, wait_response=True)
+        subscribe_id = session._next_subscribe_id - 1
+        await session._handle_fetch_ok(FetchOk(
+            subscribe_id=subscribe_id, group_order=GroupOrder.ASCENDING, end_of_track=0,
+            largest_group_id=4, largest_object_id=0, parameters={}))
+        assert (await fetch).subscribe_id == subscribe_id
+        assert not session._requests
+
+        server = moqt_test_protocol(is_client=False)
+        sent = control_message_types(server)
+        server.fetch_ok(subscribe_id)
+        assert sent == [MOQTMessageType.FETCH_OK]
+
+    asyncio.run(run())
+
+
+def test_subscribe_many():
+    """subscribe_many() sends each MAX_SUBSCRIBE_ID window in one control write and transmit."""
+    async def run():
+        session = moqt_test_protocol()
+        writes, transmits = [], []
+        send_stream_data = session._quic.send_stream_data
+        def record_write(stream_id, data, end_stream=False):
+            writes.append(stream_id)
+            send_stream_data(stream_id, data, end_stream)
+        session._quic.send_stream_data = record_write
+        session.transmit = lambda: transmits.append(1)
+        session._set_peer_max_subscribe_id(session._next_subscribe_id + 4)
+
+        def pending_ids():
+            return sorted(id for kind, id in session._requests._requests if kind == MOQTMessageType.SUBSCRIBE)
+
+        responses = []
+        async def collect():
+            tracks = [('test', f'track{i}') for i in range(10)]
+            async for response in session.subscribe_many(tracks):
+                responses.append(response)
+        task = asyncio.create_task(collect())
+        await asyncio.sleep(0.01)
+        first = pending_ids()
+        assert len(first) == 4 and writes == [session._control_stream_id] and len(transmits) == 1
+
+        for subscribe_id in first:
+            await session._handle_subscribe_ok(SubscribeOk(
+                subscribe_id=subscribe_id, expires=0, group_order=GroupOrder.ASCENDING, content_exists=0))
+        await asyncio.sleep(0.01)
+        assert len(responses) == 4 and len(writes) == 1  # blocked until the limit is raised
+
+        await session._handle_max_subscribe_id(MaxSubscribeId(subscribe_id=session._next_subscribe_id + 10))
+        await asyncio.sleep(0.01)
+        rest = pending_ids()
+        assert len(rest) == 6 and len(writes) == 2 and len(transmits) == 2
+        for subscribe_id in rest:
+            await session._handle_subscribe_error(SubscribeError(
+                subscribe_id=subscribe_id, error_code=0x4, reason='not found', track_alias=0))
+        await asyncio.wait_for(task, 1)
+        assert sorted(r.subscribe_id for r in responses) == first + rest
+        assert not session._requests
+
+    asyncio.run(run())
+
+
+def test_data_stream_memory_flat():
+    """Session state and RSS stay flat while receiving 100k single-stream groups."""
+    async def run():
+        session = moqt_test_protocol()
+        sub_msg = session.subscribe('test', 'track')
+        sub = session._subscriptions[sub_msg.subscribe_id]
+
+        async def receive_groups(start, count):
+            for group_id in range(start, start + count):
+                status = ObjectStatus.END_OF_GROUP if group_id % 2 else ObjectStatus.NORMAL
+                data = subgroup_stream_data(sub_msg.track_alias, group_id, status=status)
+                session.quic_event_received(
+                    StreamDataReceived(data=data, end_stream=True, stream_id=3 + 4 * group_id))
+                if group_id % 64 == 0:
+                    for _ in range(4):
+                        await asyncio.sleep(0)
+            for _ in range(4):
+                await asyncio.sleep(0)
+
+        await receive_groups(0, 5000)
+        gc.collect()
+        rss_start = moqt_rss_bytes()
+        await receive_groups(5000, 100000)
+        gc.collect()
+        rss_end = moqt_rss_bytes()
+
+        assert session._close_err is None
+        assert not session._data_streams
+        assert not sub.streams
+        assert (rss_end - rss_start) < 16 * 1024 * 1024, f"RSS grew {rss_end - rss_start} bytes"
+
+    set_log_level(logging.WARNING)
+    try:
+        asyncio.run(run())
+    finally:
+        set_log_level(logging.INFO)
+
+
+def test_session_codec_negotiation():
+    """Each server session binds the version selected from its own CLIENT_SETUP."""
+    async def run():
+        servers = []
+        for versions in ([0xff000008], [0xff00000a, 0xff000008], [0xff000009]):
+            server = moqt_test_protocol(is_client=False)
+            await server._handle_client_setup(ClientSetup(versions=versions, parameters={}))
+            assert server._moqt_session_setup.done()
+            servers.append(server)
+        assert [s.codec.version for s in servers] == [0xff000008, 0xff00000a, 0xff000009]
+        assert servers[0].codec.major_version == 8
+
+        # clients bind the SERVER_SETUP version to their own session only
+        clients = []
+        for version in (0xff000008, 0xff00000a):
+            client = moqt_test_protocol(is_client=True)
+            await client._handle_server_setup(ServerSetup(selected_version=version, parameters={}))
+            assert client._close_err is None
+            clients.append(client)
+        assert [c.codec.version for c in clients] == [0xff000008, 0xff00000a]
+        assert DEFAULT_CODEC.version == MOQT_CUR_VERSION
+
+        server = moqt_test_protocol(is_client=False)
+        await server._handle_client_setup(ClientSetup(versions=[0xff000001], parameters={}))
+        assert server._close_err is not None
+        assert server._close_err[0] == SessionCloseCode.PROTOCOL_VIOLATION
+
+    asyncio.run(run())
+
+
+def test_namespace_trie():
+    trie = NamespaceTrie()
+    assert trie.subscribe((b'live',), 'sub1')
+    assert not trie.subscribe((b'live',), 'sub1')
+    assert trie.subscribe((b'live', b'sports'), 'sub2')
+    assert trie.subscribe((), 'sub3')  # empty prefix matches everything
+    assert trie.subscribers((b'live', b'sports', b'football')) == {'sub1', 'sub2', 'sub3'}
+    assert trie.subscribers((b'live', b'news')) == {'sub1', 'sub3'}
+    assert trie.subscribers((b'vod',)) == {'sub3'}
+
+    assert trie.announce((b'live', b'sports', b'football'), 'pub1')
+    assert trie.announce((b'live', b'news'), 'pub2')
+    assert trie.announce((b'vod',), 'pub1')
+    assert sorted(ns for ns, _ in trie.announced((b'live',))) == [
+        (b'live', b'news'), (b'live', b'sports', b'football')]
+    assert trie.announced((b'live', b'sports', b'football')) == [
+        ((b'live', b'sports', b'football'), {'pub1'})]
+    assert trie.announced((b'other',)) == []
+
+    assert trie.unannounce((b'live', b'news'), 'pub2')
+    assert not trie.unannounce((b'live', b'news'), 'pub2')
+    assert sorted(trie.discard('pub1')) == [(b'live', b'sports', b'football'), (b'vod',)]
+    assert trie.announced(()) == []
+    assert trie.unsubscribe((b'live', b'sports'), 'sub2')
+    assert trie.unsubscribe((b'live',), 'sub1')
+    trie.discard('sub3')
+    assert not trie._root.children and not trie._owners  # empty nodes are pruned
+
+
+def control_message_types(protocol):
+    """Record the type of each control message sent by a test protocol."""
+    sent = []
+    def send_control_message(buf):
+        sent.append(Buffer(data=buf.data).pull_uint_var())
+    protocol.send_control_message = send_control_message
+    return sent
+
+
+def test_announce_routing():
+    """ANNOUNCE/UNANNOUNCE are routed to sessions subscribed to a matching prefix."""
+    async def run():
+        server = MOQTTestSession()
+        server.namespaces = NamespaceTrie()
+        publisher = moqt_test_protocol(is_client=False, session=server)
+        subscriber = moqt_test_protocol(is_client=False, session=server)
+        other = moqt_test_protocol(is_client=False, session=server)
+        pub_sent = control_message_types(publisher)
+        sub_sent = control_message_types(subscriber)
+        other_sent = control_message_types(other)
+
+        await publisher._handle_announce(Announce(namespace=(b'live', b'sports'), parameters={}))
+        assert pub_sent == [MOQTMessageType.ANNOUNCE_OK]
+
+        # existing announcements under the prefix are sent after the OK
+        await subscriber._handle_subscribe_announces(
+            SubscribeAnnounces(namespace_prefix=(b'live',), parameters={}))
+        assert sub_sent == [MOQTMessageType.SUBSCRIBE_ANNOUNCES_OK, MOQTMessageType.ANNOUNCE]
+        await other._handle_subscribe_announces(
+            SubscribeAnnounces(namespace_prefix=(b'vod',), parameters={}))
+        assert other_sent == [MOQTMessageType.SUBSCRIBE_ANNOUNCES_OK]
+
+        # new announcements are pushed to matching prefix subscribers only
+        await publisher._handle_announce(Announce(namespace=(b'live', b'news'), parameters={}))
+        assert sub_sent[-1] == MOQTMessageType.ANNOUNCE and len(sub_sent) == 3
+        assert len(other_sent) == 1
+        await publisher._handle_unannounce(Unannounce(namespace=(b'live', b'news')))
+        assert sub_sent[-1] == MOQTMessageType.UNANNOUNCE
+        assert pub_sent == [MOQTMessageType.ANNOUNCE_OK] * 2  # no reply to UNANNOUNCE
+
+        # closing the publisher withdraws its remaining namespaces
+        publisher._close_session()
+        assert sub_sent[-1] == MOQTMessageType.UNANNOUNCE and len(sub_sent) == 5
+        assert server.namespaces.announced(()) == []
+
+        await subscriber._handle_unsubscribe_announces(UnsubscribeAnnounces(namespace_prefix=(b'live',)))
+        assert server.namespaces.subscribers((b'live', b'sports')) == set()
+
+    asyncio.run(run())
+
+
+def test_track_status():
+    """TRACK_STATUS is answered from the publisher's track registry, without subscribing."""
+    async def run():
+        client, server = await loopback_connect(*moqt_loopback_sessions())
+        await client.client_session_init(timeout=2)
+        live = FullTrackName('live/test', 'video')
+        server.tracks.register(live)
+        server.tracks.register(FullTrackName('live/test', 'audio'))
+        status = await client.track_status('live/test', 'video', wait_response=True, timeout=2)
+        assert status.status_code == TrackStatusCode.NOT_STARTED
+
+        for group_id, object_id in ((0, 0), (2, 5), (1, 9), (2, 3)):
+            server.tracks.publish(live, group_id, object_id)
+        status = await client.track_status('live/test', 'video', wait_response=True, timeout=2)
+        assert status.full_track_name is live
+        assert (status.status_code, status.last_group_id, status.last_object_id) == (TrackStatusCode.IN_PROGRESS, 2, 5)
+        server.tracks.finish(live)
+        statuses = await asyncio.gather(
+            client.track_status('live/test', 'video', wait_response=True, timeout=2),
+            client.track_status('live/test', 'audio', wait_response=True, timeout=2),
+            client.track_status('live/test', 'missing', wait_response=True, timeout=2))
+        assert [s.status_code for s in statuses] == [
+            TrackStatusCode.FINISHED, TrackStatusCode.NOT_STARTED, TrackStatusCode.DOES_NOT_EXIST]
+        assert statuses[0].last_group_id == 2
+        assert not server._subscribers and not server._requests and not client._requests
+
+    asyncio.run(run())
+
+
+def test_authorization():
+    """AUTHORIZATION_INFO tokens are verified once per TTL, and unauthorized requests are rejected."""
+    async def run():
+        calls = []
+        def verify(token, kind, scope):
+            calls.append((token, kind, scope))
+            if token == b'broken':
+                raise ValueError("bad signature encoding")
+            return token == b'secret' and scope != FullTrackName('live/test', 'private')
+
+        server = MOQTTestSession()
+        server.authorizer = Authorizer(verify, ttl=0.05)
+        publisher = moqt_test_protocol(is_client=False, session=server)
+        sent = control_message_types(publisher)
+        auth = {ParamType.AUTHORIZATION_INFO: b'secret'}
+
+        def subscribe(subscribe_id, track_name, parameters):
+            return publisher._handle_subscribe(Subscribe(
+                subscribe_id=subscribe_id, track_alias=subscribe_id, namespace=(b'live', b'test'),
+                track_name=track_name, priority=128, group_order=GroupOrder.ASCENDING,
+                filter_type=FilterType.LATEST_OBJECT, parameters=parameters))
+
+        # a storm of SUBSCRIBEs with one token is verified once
+        await asyncio.gather(*(subscribe(n, b'video', auth) for n in range(1, 21)))
+        assert sent == [MOQTMessageType.SUBSCRIBE_OK] * 20 and len(calls) == 1
+        assert server.authorizer.misses == 1 and len(publisher._subscribers) == 20
+        for subscribe_id, track_name, parameters in ((21, b'private', auth), (22, b'video', {}),
+                                                     (23, b'video', {ParamType.AUTHORIZATION_INFO: b'broken'})):
+            await subscribe(subscribe_id, track_name, parameters)
+            assert sent[-1] == MOQTMessageType.SUBSCRIBE_ERROR and subscribe_id not in publisher._subscribers
+        assert calls[2] == (None, MOQTMessageType.SUBSCRIBE, FullTrackName('live/test', 'video'))
+        await subscribe(24, b'video', {ParamType.AUTHORIZATION_INFO: b'broken'})  # errors are not cached
+        assert len(calls) == 5
+
+        await publisher._handle_announce(Announce(namespace=(b'live', b'test'), parameters={}))
+        assert sent[-1] == MOQTMessageType.ANNOUNCE_ERROR and not publisher._namespaces.publishers((b'live', b'test'))
+        await publisher._handle_fetch(Fetch(fetch_type=FetchType.JOINING_FETCH, subscribe_id=30,
+                                            joining_sub_id=1, pre_group_offset=0, parameters=auth))
+        assert sent[-1] == MOQTMessageType.FETCH_OK
+        assert calls[-1] == (b'secret', MOQTMessageType.FETCH, FullTrackName('live/test', 'video'))
+
+        # expired results are verified again, on the executor if one is set
+        await asyncio.sleep(0.06)
+        with ThreadPoolExecutor(1) as executor:
+            server.authorizer.executor = executor
+            await subscribe(31, b'video', auth)
+        assert sent[-1] == MOQTMessageType.SUBSCRIBE_OK and len(calls) == 8
+
+    asyncio.run(run())
+
+
+def test_admission_control(monkeypatch):
+    """Incoming requests are rate limited, capped, and shed while the event loop lags."""
+    clock = MOQTFakeClock()
+    monkeypatch.setattr(limits_module, 'time', clock)
+
+    async def run():
+        def subscribe_data(subscribe_id):
+            return Buffer(data=Subscribe(
+                subscribe_id=subscribe_id, track_alias=subscribe_id, namespace=(b'live',), track_name=b'video',
+                priority=128, group_order=GroupOrder.ASCENDING, filter_type=FilterType.LATEST_OBJECT,
+                parameters={}).serialize().data)
+
+        server = MOQTTestSession()
+        server.control_rate_limits = {(MOQTMessageType.SUBSCRIBE, MOQTMessageType.FETCH): (1.0, 3)}
+        server.max_subscriptions = 4
+        publisher = moqt_test_protocol(is_client=False, session=server)
+        sent = control_message_types(publisher)
+        for subscribe_id in range(1, 6):
+            publisher._moqt_handle_control_message(subscribe_data(subscribe_id))
+        publisher._moqt_handle_control_message(Buffer(data=Announce(namespace=(b'live',), parameters={}).serialize().data))
+        await asyncio.sleep(0.01)
+        assert sent == [MOQTMessageType.SUBSCRIBE_ERROR] * 2 + [MOQTMessageType.SUBSCRIBE_OK] * 3 + [MOQTMessageType.ANNOUNCE_OK]
+        assert publisher.requests_refused == 2 and len(publisher._subscribers) == 3
+        bucket = publisher._request_limits[MOQTMessageType.SUBSCRIBE]
+        clock.advance(0.5)
+        assert not bucket.take() and bucket._tokens == pytest.approx(0.5)
+        clock.advance(0.5)
+        assert bucket.take() and bucket._tokens == pytest.approx(0.0)
+
+        # concurrent subscriptions are capped at max_subscriptions
+        publisher._request_limits[MOQTMessageType.SUBSCRIBE] = None
+        for subscribe_id in range(6, 9):
+            publisher._moqt_handle_control_message(subscribe_data(subscribe_id))
+        await asyncio.sleep(0.01)
+        assert len(publisher._subscribers) == 4 and publisher.requests_refused == 4
+
+        # a stalled event loop sheds new requests until the lag recovers
+        publisher._remove_subscriber(1)
+        monitor = publisher._load_monitor = LoopLagMonitor(threshold=0.02, interval=0.01)
+        monitor.start(loop=clock)
+        clock.advance(0.01)
+        assert monitor.lag == 0.0
+        clock.stall(0.05)  # the sample due at 0.02 runs 40 ms late
+        clock.advance(0)
+        assert monitor.lag == pytest.approx(0.04) and monitor.overloaded
+        publisher._moqt_handle_control_message(subscribe_data(9))
+        assert sent[-1] == MOQTMessageType.SUBSCRIBE_ERROR and publisher.requests_refused == 5
+        clock.advance(0.02)  # on time again: the remembered lag halves per sample
+        assert monitor.lag == pytest.approx(0.01) and not monitor.overloaded
+        publisher._moqt_handle_control_message(subscribe_data(10))
+        await asyncio.sleep(0.01)
+        assert sent[-1] == MOQTMessageType.SUBSCRIBE_OK and 10 in publisher._subscribers
+        monitor.stop()
+
+        # a subscription recorded by a handler still running counts once against the cap
+        server.max_subscriptions = 2
+        publisher = moqt_test_protocol(is_client=False, session=server)
+        publisher._request_limits[MOQTMessageType.SUBSCRIBE] = None
+        sent = control_message_types(publisher)
+        verified = asyncio.Event()
+        async def authorize(msg, scope):
+            await verified.wait()
+            return True
+        publisher._authorize = authorize
+        publisher._moqt_handle_control_message(subscribe_data(1))
+        await asyncio.sleep(0)
+        assert 1 in publisher._subscribers and not publisher._pending_subscribes
+        publisher._moqt_handle_control_message(subscribe_data(2))
+        publisher._moqt_handle_control_message(subscribe_data(3))
+        assert publisher.requests_refused == 1 and sent == [MOQTMessageType.SUBSCRIBE_ERROR]
+        verified.set()
+        await asyncio.sleep(0.01)
+        assert sorted(publisher._subscribers) == [1, 2] and sent.count(MOQTMessageType.SUBSCRIBE_OK) == 2
+        reasons = []
+        publisher.subscribe_error = lambda subscribe_id, code, reason, alias: reasons.append((code, reason))
+        publisher._moqt_handle_control_message(subscribe_data(4))
+        assert reasons == [(SubscribeErrorCode.INTERNAL_ERROR, MOQT_REFUSED_TOO_MANY_SUBSCRIPTIONS)]
+        assert reasons[0][1] in MOQT_REFUSED_REASONS
+
+    asyncio.run(run())
+
+
+def test_subscribe_id_flow_control():
+    """Requests beyond MAX_SUBSCRIBE_ID wait for the peer, which grows and re-grants its window."""
+    async def run():
+        client, server = await loopback_connect(*moqt_loopback_sessions())
+        server.max_subscribe_id_window = 3
+        await client.client_session_init(timeout=2)
+        assert client._peer_max_subscribe_id == 3 and server._peer_max_subscribe_id == 1000
+
+        # ids 1, 2 go out; 3..5 are queued and SUBSCRIBES_BLOCKED grows the server window
+        subs = [client.subscribe('test', f'track{i}') for i in range(5)]
+        assert len(client._blocked_requests) == 3
+        await asyncio.sleep(0.05)
+        assert server.max_subscribe_id_window == 6 and client._peer_max_subscribe_id == 6
+        assert not client._blocked_requests
+        assert sorted(server._subscribers) == [sub.subscribe_id for sub in subs]
+
+        # finished subscriptions are re-granted once half the window is retired
+        for sub in subs[:3]:
+            client.unsubscribe(sub.subscribe_id)
+        await asyncio.sleep(0.05)
+        assert client._peer_max_subscribe_id == 9
+
+        # a request beyond the granted limit closes the session
+        client._peer_max_subscribe_id = None
+        client._next_subscribe_id = 9
+        client.subscribe('test', 'over')
+        await asyncio.sleep(0.05)
+        assert server._close_err[0] == SessionCloseCode.TOO_MANY_SUBSCRIBES
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("raw_quic", [True, False], ids=["raw_quic", "webtransport"])
+def test_session_transport(raw_quic):
+    """MoQT session setup and data delivery over raw QUIC (moq-00) and WebTransport."""
+    async def run():
+        client, server = await loopback_connect(*moqt_loopback_sessions(raw_quic))
+        await client.client_session_init(timeout=2)
+        assert client.raw_quic == server.raw_quic == raw_quic
+        assert (client._h3 is None) == raw_quic
+        assert server._moqt_session_setup.result()
+
+        sub_msg = client.subscribe('live/test', 'track')
+        await asyncio.sleep(0.01)
+        assert sub_msg.subscribe_id in server._subscribers
+
+        # subgroup stream and datagram from the publisher
+        stream_id = server.create_data_stream()
+        header = SubgroupHeader(track_alias=sub_msg.track_alias, group_id=0, subgroup_id=0)
+        obj = ObjectHeader(object_id=0, payload=b'x' * 100)
+        server._quic.send_stream_data(stream_id, header.serialize().data + obj.serialize(server.codec).data)
+        server.transmit()
+        datagrams = []
+        handle_dgram = client._moqt_handle_data_dgram
+        client._moqt_handle_data_dgram = lambda buf: datagrams.append(handle_dgram(buf))
+        dgram = ObjectDatagram(track_alias=sub_msg.track_alias, group_id=0, object_id=1, payload=b'y' * 100)
+        server.send_dgram_message(dgram.serialize(server.codec))
+        await asyncio.sleep(0.05)
+
+        sub = client._subscriptions[sub_msg.subscribe_id]
+        assert stream_id in sub.streams
+        assert client._data_streams[stream_id].header.track_alias == sub_msg.track_alias
+        assert len(datagrams) == 1 and datagrams[0].payload == b'y' * 100
+
+    asyncio.run(run())
+
+
+def test_shared_object_fanout():
+    """One serialized object is sent to subscribers with different track aliases."""
+    async def run():
+        pairs = [await loopback_connect(*moqt_loopback_sessions()) for _ in range(2)]
+        received = []
+        sub_msgs = []
+        for n, (client, server) in enumerate(pairs):
+            await client.client_session_init(timeout=2)
+            for _ in range(n):  # different track alias on each client
+                client.subscribe('live/test', 'other')
+            sub_msgs.append(client.subscribe('live/test', 'track'))
+            handle_stream = client._moqt_handle_data_stream
+            def record(stream_id, buf, buf_len, client=client, handle_stream=handle_stream):
+                msg = handle_stream(stream_id, buf, buf_len)
+                received.append((client, msg))
+                return msg
+            client._moqt_handle_data_stream = record
+            handle_dgram = client._moqt_handle_data_dgram
+            client._moqt_handle_data_dgram = lambda buf, client=client, handle_dgram=handle_dgram: \
+                received.append((client, handle_dgram(buf)))
+        await asyncio.sleep(0.01)
+        assert sub_msgs[0].track_alias != sub_msgs[1].track_alias
+
+        subgroup = SharedSubgroup(group_id=0, subgroup_id=0)
+        objects = [SharedObject(ObjectHeader(object_id=n, payload=bytes([n]) * 2000)) for n in range(3)]
+        dgram = SharedObject(ObjectDatagram(track_alias=0, group_id=0, object_id=3, payload=b'd' * 100))
+        for (client, server), sub_msg in zip(pairs, sub_msgs):
+            stream_id = server.create_data_stream()
+            server.send_subgroup_header(stream_id, subgroup, sub_msg.track_alias, transmit=False)
+            for obj in objects:
+                server.send_object(stream_id, obj)
+            server.send_object_datagram(dgram, sub_msg.track_alias)
+        await asyncio.sleep(0.05)
+
+        for (client, server), sub_msg in zip(pairs, sub_msgs):
+            msgs = [msg for c, msg in received if c is client]
+            headers = [msg for msg in msgs if isinstance(msg, SubgroupHeader)]
+            assert [h.track_alias for h in headers] == [sub_msg.track_alias]
+            assert [obj.payload for obj in msgs if isinstance(obj, ObjectHeader)] == \
+                [bytes([n]) * 2000 for n in range(3)]
+            dgrams = [msg for msg in msgs if isinstance(msg, ObjectDatagram)]
+            assert [(d.track_alias, d.payload) for d in dgrams] == [(sub_msg.track_alias, b'd' * 100)]
+        assert all(len(obj._data) == 1 for obj in objects)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("raw_quic", [True, False], ids=["raw_quic", "webtransport"])
+def test_send_objects_batch(raw_quic):
+    """Batches of small objects arrive as individual objects on a stream and as datagrams."""
+    async def run():
+        client, server = await loopback_connect(*moqt_loopback_sessions(raw_quic))
+        await client.client_session_init(timeout=2)
+        sub_msg = client.subscribe('live/test', 'metadata')
+        received = []
+        handle_stream = client._moqt_handle_data_stream
+        def record(stream_id, buf, buf_len):
+            msg = handle_stream(stream_id, buf, buf_len)
+            received.append(msg)
+            return msg
+        client._moqt_handle_data_stream = record
+        handle_dgram = client._moqt_handle_data_dgram
+        client._moqt_handle_data_dgram = lambda buf: received.append(handle_dgram(buf))
+        await asyncio.sleep(0.01)
+
+        exts = server.codec.extension_template()
+        exts[MOQT_TIMESTAMP_EXT] = 1
+        objects = [(n, b'caption %d' % n, exts if n % 2 else None) for n in range(50)]
+        stream_id = server.create_data_stream()
+        header = SubgroupHeader(track_alias=sub_msg.track_alias, group_id=0, subgroup_id=0)
+        server._quic.send_stream_data(stream_id, header.serialize().data)
+        server.send_objects(stream_id, objects[:25])
+        server.send_objects(stream_id, objects[25:], end_stream=True)
+        server.send_object_datagrams(sub_msg.track_alias, 1, objects)
+        await asyncio.sleep(0.05)
+
+        stream_objects = [msg for msg in received if isinstance(msg, ObjectHeader)]
+        assert [(obj.object_id, obj.payload) for obj in stream_objects] == [(o, p) for o, p, _ in objects]
+        assert stream_objects[1].extensions[MOQT_TIMESTAMP_EXT] == 1
+        dgrams = [msg for msg in received if isinstance(msg, ObjectDatagram)]
+        assert sorted((d.object_id, d.payload) for d in dgrams) == [(o, p) for o, p, _ in objects]
+        assert all(d.track_alias == sub_msg.track_alias and d.group_id == 1 for d in dgrams)
+
+    asyncio.run(run())
+
+
+def test_object_ring():
+    """Objects written to a shared memory ring are read back, wrapping and skipping overwritten objects."""
+    name = ring_name(FullTrackName('test/ring', f'track-{os.getpid()}'))
+    writer = ObjectRingWriter(name, get_codec(MOQT_CUR_VERSION), size=4096, slots=8)
+    try:
+        reader = ObjectRingReader(name, start=0)
+        exts = writer.codec.extension_template()
+        exts[MOQT_TIMESTAMP_EXT] = 7
+        sent = [ObjectHeader(object_id=n, extensions=exts, payload=bytes([n]) * 900) for n in range(6)]
+        for obj in sent[:3]:
+            writer.append(0, 0, obj)
+        objects = reader.read()
+        assert [(o.seq, o.group_id, o.object_id) for o in objects] == [(0, 0, 0), (1, 0, 1), (2, 0, 2)]
+        assert objects[1].data(writer.codec) == sent[1].serialize(writer.codec).data
+        older = get_codec(0xff000008)  # another MoQT version: re-encoded once
+        assert objects[1].data(older) == sent[1].serialize(older).data
+
+        for obj in sent[3:]:  # wraps around the 4 KB data region
+            writer.append(1, 2, obj, publisher_priority=5)
+        objects = reader.read()
+        assert [(o.group_id, o.subgroup_id, o.object_id, o.publisher_priority) for o in objects] == \
+            [(1, 2, n, 5) for n in range(3, 6)]
+        assert objects[-1].data(writer.codec) == sent[5].serialize(writer.codec).data
+
+        # a lapped reader skips to the live edge instead of returning overwritten data
+        for n in range(10):
+            writer.append(2, 0, ObjectHeader(object_id=n, payload=b'y' * 500))
+        assert reader.read() == [] and reader.overruns == 10 and reader.next_seq == writer.write_seq
+        writer.append(3, 0, ObjectHeader(object_id=0, payload=b'z'))
+        assert [o.group_id for o in reader.read()] == [3]
+        live = ObjectRingReader(name)
+        assert live.next_seq == writer.write_seq and live.read() == []
+        live.close()
+        reader.close()
+    finally:
+        writer.close()
+
+
+def test_ring_fanout():
+    """Ring objects are forwarded to each subscriber on a subgroup stream per group."""
+    async def run():
+        pairs = [await loopback_connect(*moqt_loopback_sessions()) for _ in range(2)]
+        track = FullTrackName('live/test', f'ring-{os.getpid()}')
+        received = []
+        for client, _ in pairs:
+            await client.client_session_init(timeout=2)
+            client.subscribe(track.namespace, track.name)
+            handle_stream = client._moqt_handle_data_stream
+            def record(stream_id, buf, buf_len, client=client, handle_stream=handle_stream):
+                msg = handle_stream(stream_id, buf, buf_len)
+                if isinstance(msg, ObjectHeader):
+                    header = client._data_streams[stream_id].header
+                    received.append((client, header.track_alias, header.group_id, msg.object_id, msg.payload))
+                return msg
+            client._moqt_handle_data_stream = record
+        # a FETCH of the track has no track alias and gets no ring objects
+        pairs[0][0].fetch(track.namespace, track.name, end_group=1)
+        await asyncio.sleep(0.01)
+        assert len(pairs[0][1]._track_subscribers[track]) == 2
+
+        writer = ObjectRingWriter(ring_name(track), pairs[0][1].codec, size=65536, slots=64)
+        try:
+            reader = ObjectRingReader(writer.name)
+            fanout = RingFanout(reader, track, lambda: [server for _, server in pairs])
+            task = asyncio.ensure_future(fanout.run(poll_interval=0.001))
+            for group_id in range(2):
+                for object_id in range(3):
+                    writer.append(group_id, 0, ObjectHeader(object_id=object_id, payload=b'%d.%d' % (group_id, object_id)))
+            await asyncio.sleep(0.05)
+            assert not task.done()
+            assert fanout.forwarded == 12
+            for client, server in pairs:
+                sub = next(iter(client._subscriptions.values()))
+                objects = [r[1:] for r in received if r[0] is client]
+                assert objects == [(sub.track_alias, g, o, b'%d.%d' % (g, o)) for g in range(2) for o in range(3)]
+                assert len(sub.streams) <= 1  # group 0's stream was finished when group 1 started
+
+            # an unsubscribed viewer's open stream is finished by the next forward, mid-group,
+            # also when no subscriber is left
+            for (client, server), object_id in zip(pairs, (3, 4)):
+                subscribe_id = next(iter(client._subscriptions))
+                (_, stream_id), = [v for k, v in fanout._streams.items() if k[:2] == (server, subscribe_id)]
+                client.unsubscribe(subscribe_id)
+                await asyncio.sleep(0.01)
+                assert subscribe_id not in server._subscribers
+                writer.append(1, 0, ObjectHeader(object_id=object_id, payload=b'1.%d' % object_id))
+                await asyncio.sleep(0.05)
+                stream = server._quic._streams.get(stream_id)  # discarded once the FIN is acked
+                assert stream is None or stream.sender._buffer_fin is not None
+                assert all(k[0] is not server for k in fanout._streams)
+            assert not fanout._streams and fanout.forwarded == 13
+            task.cancel()
+            reader.close()
+        finally:
+            writer.close()
+
+    asyncio.run(run())
+
+
+def test_ring_fanout_range():
+    """RingFanout only sends objects within each subscription's range, and ends it at end_group."""
+    async def run():
+        pairs = [await loopback_connect(*moqt_loopback_sessions()) for _ in range(2)]
+        track = FullTrackName('live/test', f'ring-range-{os.getpid()}')
+        received = []
+        (narrowed, narrowed_server), (late, late_server) = pairs
+        await narrowed.client_session_init(timeout=2)
+        await late.client_session_init(timeout=2)
+        narrowed_msg = narrowed.subscribe(track.namespace, track.name)
+        late.subscribe(track.namespace, track.name, filter_type=FilterType.ABSOLUTE_START, start_group=1, start_object=1)
+        for client, _ in pairs:
+            handle_stream = client._moqt_handle_data_stream
+            def record(stream_id, buf, buf_len, client=client, handle_stream=handle_stream):
+                msg = handle_stream(stream_id, buf, buf_len)
+                if isinstance(msg, ObjectHeader):
+                    received.append((client, client._data_streams[stream_id].header.group_id, msg.object_id))
+                return msg
+            client._moqt_handle_data_stream = record
+        done = []
+        subscribe_done = narrowed_server.subscribe_done
+        def record_done(subscribe_id, status_code, stream_count=0, reason=""):
+            done.append((subscribe_id, status_code, stream_count))
+            return subscribe_done(subscribe_id, status_code, stream_count, reason)
+        narrowed_server.subscribe_done = record_done
+        await asyncio.sleep(0.01)
+
+        writer = ObjectRingWriter(ring_name(track), narrowed_server.codec, size=65536, slots=64)
+        try:
+            reader = ObjectRingReader(writer.name)
+            fanout = RingFanout(reader, track, lambda: [server for _, server in pairs])
+            task = asyncio.ensure_future(fanout.run(poll_interval=0.001))
+            objects = lambda groups: [(g, o) for g in groups for o in range(2)]
+            for group_id, object_id in objects([0]):
+                writer.append(group_id, 0, ObjectHeader(object_id=object_id, payload=b'x'))
+            await asyncio.sleep(0.05)
+            narrowed.subscribe_update(narrowed_msg.subscribe_id, end_group=2)  # groups 0 and 1 only
+            await asyncio.sleep(0.01)
+            for group_id, object_id in objects(range(1, 4)):
+                writer.append(group_id, 0, ObjectHeader(object_id=object_id, payload=b'x'))
+            await asyncio.sleep(0.05)
+            assert not task.done()
+            task.cancel()
+            assert [r[1:] for r in received if r[0] is narrowed] == objects(range(2))
+            assert [r[1:] for r in received if r[0] is late] == objects(range(1, 4))[1:]
+            assert done == [(narrowed_msg.subscribe_id, SubscribeDoneCode.SUBSCRIPTION_ENDED, 2)]
+            assert not narrowed._subscriptions and not narrowed_server._subscribers
+            assert all(k[0] is late_server for k in fanout._streams)
+            reader.close()
+        finally:
+            writer.close()
+
+    asyncio.run(run())
+
+
+def test_raw_quic_endpoint_path():
+    """A raw QUIC CLIENT_SETUP must carry a matching ENDPOINT_PATH."""
+    async def run():
+        for params, ok in (({SetupParamType.ENDPOINT_PATH: b'/moq'}, True),
+                           ({SetupParamType.ENDPOINT_PATH: b'/other'}, False),
+                           ({}, False)):
+            server = moqt_test_protocol(is_client=False)
+            server._raw_quic = True
+            await server._handle_client_setup(ClientSetup(versions=[MOQT_CUR_VERSION], parameters=params))
+            assert (server._close_err is None) == ok
+
+    asyncio.run(run())
+
+
+def test_multiple_wt_sessions():
+    """Several MoQT sessions share one QUIC connection, each with its own control stream and state."""
+    async def run():
+        client, server = await loopback_connect(*moqt_loopback_sessions())
+        await client.client_session_init(timeout=2)
+        client2 = await client.open_session(timeout=2)
+        client3 = await client.open_session(timeout=2)
+        assert client2._quic is client._quic and client2._session_id != client._session_id
+        assert len(client.sessions) == 3
+
+        assert len(server.sessions) == 3
+        server2 = server._wt_sessions[client2._session_id]
+        server3 = server._wt_sessions[client3._session_id]
+        assert server2 is not server and server2._control_stream_id == client2._control_stream_id
+        assert server2._moqt_session_setup.result() and server3._moqt_session_setup.result()
+
+        # subscriptions and data are scoped to their session
+        sub1 = client.subscribe('live/one', 'track')
+        sub2 = client2.subscribe('live/two', 'track')
+        await asyncio.sleep(0.01)
+        assert list(server._subscribers.values())[0].track == FullTrackName('live/one', 'track')
+        assert list(server2._subscribers.values())[0].track == FullTrackName('live/two', 'track')
+        assert not server3._subscribers
+
+        stream_id = server2.create_data_stream()
+        header = SubgroupHeader(track_alias=sub2.track_alias, group_id=0, subgroup_id=0)
+        obj = ObjectHeader(object_id=0, payload=b'x' * 100)
+        server2._quic.send_stream_data(stream_id, header.serialize().data + obj.serialize(server2.codec).data)
+        server2.transmit()
+        datagrams = []
+        handle_dgram = client2._moqt_handle_data_dgram
+        client2._moqt_handle_data_dgram = lambda buf: datagrams.append(handle_dgram(buf))
+        dgram = ObjectDatagram(track_alias=sub2.track_alias, group_id=0, object_id=1, payload=b'y')
+        server2.send_dgram_message(dgram.serialize(server2.codec))
+        await asyncio.sleep(0.05)
+        assert stream_id in client2._data_streams and stream_id not in client._data_streams
+        assert stream_id in client2._subscriptions[sub2.subscribe_id].streams
+        assert len(datagrams) == 1
+
+        # closing one session leaves the others and the connection up
+        client3.close()
+        await asyncio.sleep(0.05)
+        assert server3._close_err is not None
+        assert len(server.sessions) == 2 and server._close_err is None and server2._close_err is None
+        client2.unsubscribe(sub2.subscribe_id)
+        await asyncio.sleep(0.01)
+        assert not server2._subscribers
+
+    asyncio.run(run())
+
+
+def test_client_pool():
+    """Pooled sessions are shared per (host, port, endpoint), released to idle and replaced when closed."""
+    async def run():
+        from aioquic.asyncio.server import serve
+        client_session, server_session = moqt_loopback_sessions()
+        server = await serve(
+            '127.0.0.1', 0,
+            configuration=server_session.configuration,
+            create_protocol=lambda *args, **kwargs: MOQTSessionProtocol(*args, **kwargs, session=server_session),
+        )
+        port = server._transport.get_extra_info('sockname')[1]
+        try:
+            async with MOQTClientPool(client_session.configuration, idle_timeout=0.1, setup_timeout=2) as pool:
+                first, second = await asyncio.gather(
+                    pool.acquire('127.0.0.1', port, 'moq'),
+                    pool.acquire('127.0.0.1', port, 'moq'),
+                )
+                assert first is second and pool.connects == 1
+                async with pool.session('127.0.0.1', port, 'moq') as session:
+                    assert session is first
+                    sub1 = session.subscribe('live/one', 'track')
+                    sub2 = session.subscribe('live/two', 'track')
+                    assert sub1.subscribe_id != sub2.subscribe_id
+                pool.release(first)
+                pool.release(first)
+                # idle sessions are reused until idle_timeout
+                assert await pool.acquire('127.0.0.1', port, 'moq') is first
+                pool.release(first)
+                await asyncio.sleep(0.2)
+                assert len(pool) == 0
+                await asyncio.wait_for(first._closed.wait(), 2)  # QUIC close takes a few PTOs to drain
+
+                # a closed session is transparently replaced
+                session = await pool.acquire('127.0.0.1', port, 'moq')
+                session.close()
+                await asyncio.sleep(0.01)
+                replaced = await pool.acquire('127.0.0.1', port, 'moq')
+                assert replaced is not session and pool.connects == 3
+                assert replaced._moqt_session_setup.result()
+
+                with pytest.raises(MOQTException):
+                    await pool.acquire('127.0.0.1', port, 'other')
+                assert len(pool) == 1
+            assert len(pool) == 0 and replaced._closed.is_set()
+        finally:
+            server.close()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize('raw_quic', [True, False], ids=['raw_quic', 'webtransport'])
+def test_session_resumption(raw_quic, tmp_path):
+    """Reconnects resume the TLS session from stored tickets and send the setup as 0-RTT data."""
+    path = str(tmp_path / 'tickets')
+    server_store = SessionTicketStore()
+
+    def sessions(client_store):
+        client_session, server_session = moqt_loopback_sessions(raw_quic)
+        client_session.session_ticket_handler = lambda ticket: client_store.put('origin', ticket)
+        client_session.configuration.session_ticket = client_store.get('origin')
+        server_session.ticket_store = server_store
+        return client_session, server_session
+
+    async def run():
+        client, server = await loopback_connect(*sessions(SessionTicketStore(path)), delay=0.005)
+        assert not client.early_data
+        await client.client_session_init(timeout=2)
+        await asyncio.sleep(0.05)
+        client.close()
+
+        # a new process picks the ticket up from the file
+        client_store = SessionTicketStore(path)
+        assert 'origin' in client_store and len(server_store) == 1
+        client, server = await loopback_connect(*sessions(client_store), delay=0.005)
+        assert client.early_data and not client._quic._handshake_complete
+        handshake_complete = []
+        cls, handle_client_setup = server._control_msg_registry[MOQTMessageType.CLIENT_SETUP]
+        async def client_setup(session, msg):
+            handshake_complete.append(session._quic._handshake_complete)
+            await handle_client_setup(session, msg)
+        server._control_msg_registry[MOQTMessageType.CLIENT_SETUP] = (cls, client_setup)
+
+        await client.client_session_init(timeout=2)
+        assert client._quic.tls.session_resumed and client._quic.tls.early_data_accepted
+        assert server._moqt_session_setup.result()
+        assert handshake_complete == [not raw_quic]  # raw QUIC CLIENT_SETUP arrives as 0-RTT
+
+        sub_msg = client.subscribe('live/test', 'track')
+        await asyncio.sleep(0.05)
+        assert sub_msg.subscribe_id in server._subscribers
+        assert len(server_store) == 1  # single use: replaced by the newly issued ticket
+        client.close()
+
+    asyncio.run(run())
@@ -1,4 +1,6 @@
 from enum import IntEnum
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
 
 MOQT_VERSIONS = [
     0xff000008, 
@@ -13,8 +15,21 @@ MOQT_CUR_VERSION = 0xff00000a
 
 MOQT_DEFAULT_PRIORITY = 128
 
+MOQT_ALPN = "moq-00"  # raw QUIC MoQT session, no HTTP/3 or WebTransport framing
+
 MOQT_TIMESTAMP_EXT = 0x20
 
+MOQT_TRACK_INTERN_SIZE = 65536  # max interned FullTrackName objects
+
+# Reason phrases of requests refused by admission control. Draft-10 has no
+# error code for overload, so they are sent with INTERNAL_ERROR; a reason in
+# MOQT_REFUSED_REASONS means the request was not attempted and may be retried.
+MOQT_REFUSED_OVERLOADED = "Overloaded"
+MOQT_REFUSED_RATE_LIMITED = "Rate limited"
+MOQT_REFUSED_TOO_MANY_SUBSCRIPTIONS = "Too many subscriptions"
+MOQT_REFUSED_REASONS = frozenset((MOQT_REFUSED_OVERLOADED, MOQT_REFUSED_RATE_LIMITED,
+                                  MOQT_REFUSED_TOO_MANY_SUBSCRIPTIONS))
+
 class MOQTMessageType(IntEnum):
     """MOQT message type constants."""
     CLIENT_SETUP = 0x40
@@ -79,6 +94,15 @@ class ContentExistsCode(IntEnum):
     NO_CONTENT = 0x0
     EXISTS = 0x01
     
+class AnnounceErrorCode(IntEnum):
+    """ANNOUNCE_ERROR error codes."""
+    INTERNAL_ERROR = 0x0
+    UNAUTHORIZED = 0x01
+    TIMEOUT = 0x02
+    NOT_SUPPORTED = 0x03
+    UNINTERESTED = 0x04
+
+
 class SubscribeErrorCode(IntEnum):
     """SUBSCRIBE_ERROR error codes."""
     INTERNAL_ERROR = 0x0
@@ -163,3 +187,76 @@ class MOQTException(Exception):
         self.reason_phrase = reason_phrase
         super().__init__(f"{reason_phrase} ({error_code})")
         
+
+
+@lru_cache(maxsize=4096)
+def _namespace_tuple(namespace: Union[str, Tuple[Union[bytes, str], ...]]) -> Tuple[bytes, ...]:
+    if isinstance(namespace, str):
+        return tuple(part.encode() for part in namespace.split('/'))
+    return tuple(part.encode() if isinstance(part, str) else part for part in namespace)
+
+
+def make_namespace_tuple(
+    namespace: Union[str, Tuple[Union[bytes, str], ...], List[Union[bytes, str]]]
+) -> Tuple[bytes, ...]:
+    """Convert a '/' delimited string or a tuple of parts into a bytes tuple (cached)."""
+    if isinstance(namespace, list):
+        namespace = tuple(namespace)
+    elif not isinstance(namespace, (str, tuple)):
+        raise ValueError("namespace must be string with '/' delimiters or tuple")
+    return _namespace_tuple(namespace)
+
+
+_track_name_bytes = lru_cache(maxsize=4096)(str.encode)
+
+_track_names: Dict[Tuple[Tuple[bytes, ...], bytes], 'FullTrackName'] = {}
+
+
+class FullTrackName:
+    """Interned, immutable (namespace, track name) pair with a cached hash.
+
+    Constructing the same full track name returns the same object, so dicts
+    keyed on it hash a single int and compare by identity. The intern table
+    is bounded by MOQT_TRACK_INTERN_SIZE, evicting the oldest entry; an
+    evicted name still compares equal to a newly interned one.
+    """
+    __slots__ = ('namespace', 'name', '_hash')
+
+    def __new__(
+        cls,
+        namespace: Union[str, Tuple[Union[bytes, str], ...], List[Union[bytes, str]]],
+        name: Union[bytes, str],
+    ) -> 'FullTrackName':
+        namespace = make_namespace_tuple(namespace)
+        if isinstance(name, str):
+            name = _track_name_bytes(name)
+        key = (namespace, name)
+        track = _track_names.get(key)
+        if track is None:
+            track = object.__new__(cls)
+            object.__setattr__(track, 'namespace', namespace)
+            object.__setattr__(track, 'name', name)
+            object.__setattr__(track, '_hash', hash(key))
+            if len(_track_names) >= MOQT_TRACK_INTERN_SIZE:
+                del _track_names[next(iter(_track_names))]
+            _track_names[key] = track
+        return track
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not FullTrackName:
+            return NotImplemented
+        return self._hash == other._hash and self.name == other.name and self.namespace == other.namespace
+
+    def __reduce__(self):
+        return (FullTrackName, (self.namespace, self.name))
+
+    def __repr__(self) -> str:
+        return f"FullTrackName({self.namespace}, {self.name})"
@@ -0,0 +1,109 @@
+import time
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+MOQT_AUTH_CACHE_TTL = 60.0  # seconds a verification result is reused
+MOQT_AUTH_CACHE_SIZE = 10000  # cached verification results, oldest first out
+
+# verifier(token, message type, scope) -> allowed
+TokenVerifier = Callable[[Optional[bytes], int, Hashable], bool]
+AuthKey = Tuple[Optional[bytes], int, Hashable]
+
+
+class Authorizer:
+    """Checks the AUTHORIZATION_INFO token of incoming ANNOUNCE, SUBSCRIBE and FETCH requests.
+
+    verifier(token, message type, scope) returns whether a request is
+    allowed. token is the AUTHORIZATION_INFO parameter (None if absent),
+    scope the announced namespace tuple or the FullTrackName subscribed to
+    or fetched. Results, allowed or not, are cached for ttl seconds by
+    (token, type, scope): players reconnecting with the same token are
+    answered from the cache, and concurrent requests for one key share a
+    single verification. Verifier exceptions deny the request and are not
+    cached. With an executor (e.g. a ThreadPoolExecutor) the verifier runs
+    there instead of on the event loop, for expensive signature checks:
+
+        authorizer = Authorizer(verify_token, executor=ThreadPoolExecutor(4))
+        server = MOQTServerSession(host, port, ..., authorizer=authorizer)
+    """
+    __slots__ = ('verifier', 'ttl', 'max_entries', 'executor', '_cache', '_pending', 'hits', 'misses')
+
+    def __init__(
+        self,
+        verifier: TokenVerifier,
+        ttl: float = MOQT_AUTH_CACHE_TTL,
+        max_entries: int = MOQT_AUTH_CACHE_SIZE,
+        executor: Optional[Executor] = None,
+    ):
+        self.verifier = verifier
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.executor = executor
+        self._cache: Dict[AuthKey, Tuple[float, bool]] = {}  # key -> (expiry, allowed)
+        self._pending: Dict[AuthKey, asyncio.Future] = {}  # verifications in progress
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def cached(self, token: Optional[bytes], kind: int, scope: Hashable) -> Optional[bool]:
+        """Cached result for a request, None if not cached or expired."""
+        key = (token, kind, scope)
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._cache[key]
+            return None
+        self.hits += 1
+        return entry[1]
+
+    async def authorize(self, token: Optional[bytes], kind: int, scope: Hashable) -> bool:
+        """Whether a request is allowed, verifying its token on a cache miss."""
+        allowed = self.cached(token, kind, scope)
+        if allowed is not None:
+            return allowed
+        key = (token, kind, scope)
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        fut = self._pending[key] = loop.create_future()
+        try:
+            if self.executor is None:
+                allowed = bool(self.verifier(token, kind, scope))
+            else:
+                allowed = bool(await loop.run_in_executor(self.executor, self.verifier, token, kind, scope))
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"MOQT auth: verifier error: {e}")
+            allowed = False
+        else:
+            self._store(key, allowed)
+        finally:
+            del self._pending[key]
+        fut.set_result(allowed)
+        return allowed
+
+    def _store(self, key: AuthKey, allowed: bool) -> None:
+        cache = self._cache
+        if key not in cache and len(cache) >= self.max_entries:
+            del cache[next(iter(cache))]
+        cache[key] = (time.monotonic() + self.ttl, allowed)
+
+    def clear(self) -> None:
+        """Drop all cached results, e.g. after revoking tokens or rotating keys."""
+        self._cache.clear()
+
+    def __repr__(self) -> str:
+        return f"Authorizer(cached={len(self._cache)}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,87 @@
+import time
+import asyncio
+from typing import Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+MOQT_LOAD_SHED_LAG = 0.1  # seconds of event loop lag above which new requests are refused
+MOQT_LAG_SAMPLE_INTERVAL = 0.05  # seconds between event loop lag samples
+
+
+class TokenBucket:
+    """Token bucket rate limit: `rate` tokens per second, holding at most `burst`."""
+    __slots__ = ('rate', 'burst', '_tokens', '_last')
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+
+    def take(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available. Returns False (taking none) if over the limit."""
+        now = time.monotonic()
+        available = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if available < tokens:
+            self._tokens = available
+            return False
+        self._tokens = available - tokens
+        return True
+
+    def __repr__(self) -> str:
+        return f"TokenBucket(rate={self.rate}, burst={self.burst}, tokens={self._tokens:.1f})"
+
+
+class LoopLagMonitor:
+    """Event loop lag: how late a callback scheduled every `interval` runs.
+
+    A loop busy with one client's work runs every other callback late, so
+    lag is the signal for shedding load. lag holds the latest sample, or
+    half the previous lag if that is larger, so a stall is remembered for
+    a few samples. overloaded is True while lag exceeds `threshold`.
+    Shared by all sessions of a server; start() on its event loop.
+    """
+    __slots__ = ('threshold', 'interval', 'lag', '_loop', '_handle', '_expected')
+
+    def __init__(self, threshold: float = MOQT_LOAD_SHED_LAG, interval: float = MOQT_LAG_SAMPLE_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.lag = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._expected = 0.0
+
+    @property
+    def overloaded(self) -> bool:
+        return self.lag > self.threshold
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        if self._handle is not None:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._schedule()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self) -> None:
+        self._expected = self._loop.time() + self.interval
+        self._handle = self._loop.call_at(self._expected, self._sample)
+
+    def _sample(self) -> None:
+        overloaded = self.overloaded
+        self.lag = max(self._loop.time() - self._expected, self.lag / 2)
+        if self.overloaded != overloaded:
+            if overloaded:
+                logger.info(f"MOQT event: event loop lag recovered: {self.lag * 1000:.1f} ms")
+            else:
+                logger.warning(f"MOQT event: event loop lag {self.lag * 1000:.1f} ms: shedding new requests")
+        self._schedule()
+
+    def __repr__(self) -> str:
+        return f"LoopLagMonitor(lag={self.lag * 1000:.1f} ms, threshold={self.threshold * 1000:.0f} ms)"
@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, Optional, Tuple
+
+from aioquic.quic.connection import QuicConnection
+
+NetworkAddress = Tuple[str, int]
+
+
+class LoopbackTransport:
+    """In-memory datagram transport delivering packets to a peer protocol.
+
+    Packets are delivered on the next loop iteration, as a socket would, so
+    the QUIC handshake and flow control behave as over a real network. A
+    one-way delay (seconds) emulates the network latency.
+    """
+    def __init__(self, addr: NetworkAddress, peer_addr: NetworkAddress, delay: float = 0.0):
+        self._loop = asyncio.get_running_loop()
+        self.addr = addr
+        self.peer_addr = peer_addr
+        self.delay = delay
+        self.peer: Optional[asyncio.DatagramProtocol] = None
+        self.bytes_sent = 0
+        self.datagrams_sent = 0
+
+    def sendto(self, data: bytes, addr: Optional[NetworkAddress] = None) -> None:
+        self.bytes_sent += len(data)
+        self.datagrams_sent += 1
+        if self.delay > 0:
+            self._loop.call_later(self.delay, self.peer.datagram_received, data, self.addr)
+        else:
+            self._loop.call_soon(self.peer.datagram_received, data, self.addr)
+
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        return self.addr if name == 'sockname' else default
+
+    def close(self) -> None:
+        pass
+
+
+async def loopback_connect(
+    client_session: Any, server_session: Any, delay: float = 0.0
+) -> Tuple[Any, Any]:
+    """Connect client and server MOQTSessionProtocols in memory and complete the QUIC handshake.
+
+    The session objects provide the QuicConfiguration (and endpoint), as
+    MOQTClientSession and MOQTServerSession do. A server ticket_store issues
+    and accepts session tickets, passed to the client session_ticket_handler.
+    A client resuming with 0-RTT returns without waiting for the handshake.
+    Returns (client, server) protocols; the transports are available as
+    protocol._transport.
+    """
+    from ..protocol import MOQTSessionProtocol
+
+    client_addr, server_addr = ('127.0.0.1', 10001), ('127.0.0.1', 4433)
+    client_quic = QuicConnection(
+        configuration=client_session.configuration,
+        session_ticket_handler=getattr(client_session, 'session_ticket_handler', None),
+    )
+    ticket_store = getattr(server_session, 'ticket_store', None)
+    server_quic = QuicConnection(
+        configuration=server_session.configuration,
+        original_destination_connection_id=client_quic.original_destination_connection_id,
+        session_ticket_fetcher=ticket_store.fetch if ticket_store is not None else None,
+        session_ticket_handler=ticket_store.add if ticket_store is not None else None,
+    )
+    client = MOQTSessionProtocol(client_quic, session=client_session)
+    server = MOQTSessionProtocol(server_quic, session=server_session)
+    client_transport = LoopbackTransport(client_addr, server_addr, delay)
+    server_transport = LoopbackTransport(server_addr, client_addr, delay)
+    client_transport.peer, server_transport.peer = server, client
+    client.connection_made(client_transport)
+    server.connection_made(server_transport)
+    client.connect(server_addr)
+    if not client.early_data:
+        await client.wait_connected()
+    return client, server
@@ -0,0 +1,103 @@
+import time
+import asyncio
+from typing import TYPE_CHECKING, Optional, Union
+
+from ..types import MOQTException
+from .logger import get_logger
+
+if TYPE_CHECKING:
+    from ..messages import SharedObject
+    from ..protocol import MOQTSessionProtocol
+
+logger = get_logger(__name__)
+
+MOQT_PACER_INTERVAL = 1/30  # seconds: one video frame
+MOQT_PACER_BURST = 16384  # bytes written without pacing
+MOQT_PACER_QUANTUM = 4096  # bytes per paced stream write
+
+
+class ObjectPacer:
+    """Paces object writes on a session's data streams.
+
+    An object larger than the burst allowance is written in `quantum` byte
+    pieces, spread over the frame `interval`. If the connection cannot carry
+    the object within the interval, the pieces follow its delivery rate
+    instead: congestion window / smoothed RTT, from the QUIC loss recovery.
+    Bytes then wait in the publisher instead of the QUIC send buffer, so a
+    large I-frame does not build a queue in front of later objects.
+    Smaller objects are written at once while burst credit is left. write()
+    returns when the last piece is queued, so a publisher waiting for it
+    slows down to what the link carries.
+
+    Use one pacer per publishing task, e.g. per subgroup stream generator.
+    """
+    __slots__ = ('_session', 'interval', 'burst', 'quantum', '_tokens', '_last')
+
+    def __init__(
+        self,
+        session: 'MOQTSessionProtocol',
+        interval: float = MOQT_PACER_INTERVAL,
+        burst: int = MOQT_PACER_BURST,
+        quantum: int = MOQT_PACER_QUANTUM,
+    ):
+        self._session = session
+        self.interval = interval
+        self.burst = burst
+        self.quantum = min(quantum, burst)  # a piece must fit the burst credit
+        self._tokens = float(burst)  # byte credit, refilled at the pacing rate
+        self._last = time.monotonic()
+
+    def link_rate(self) -> Optional[float]:
+        """Connection delivery rate in bytes/s (cwnd / smoothed RTT), None before the first RTT sample.
+
+        Read from aioquic's loss recovery internals (aioquic is pinned in
+        pyproject); None if they are missing, pacing by the frame interval.
+        """
+        loss = getattr(self._session._quic, '_loss', None)
+        rtt = getattr(loss, '_rtt_smoothed', None)
+        cwnd = getattr(loss, 'congestion_window', None)
+        if not getattr(loss, '_rtt_initialized', False) or not rtt or rtt <= 0 or cwnd is None:
+            return None
+        return cwnd / rtt
+
+    def rate(self, size: int) -> float:
+        """Pacing rate in bytes/s for an object of `size` bytes."""
+        rate = max(size, self.quantum) / self.interval  # spread over the frame interval
+        link_rate = self.link_rate()
+        if link_rate is not None and link_rate < rate:
+            rate = link_rate
+        return rate
+
+    def _refill(self, rate: float) -> None:
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._last) * rate)
+        self._last = now
+
+    async def write(self, stream_id: int, data: Union[bytes, 'SharedObject'], end_stream: bool = False) -> None:
+        """Write an object (or any stream data) to a data stream, paced."""
+        session = self._session
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = data.data(session.codec)
+        size = len(data)
+        rate = self.rate(size)
+        view = memoryview(data)
+        pos = 0
+        while True:
+            self._refill(rate)
+            if size - pos <= self._tokens:  # the rest fits the burst credit
+                chunk = view[pos:]
+            elif self._tokens >= self.quantum:
+                chunk = view[pos:pos + self.quantum]
+            else:
+                await asyncio.sleep((min(self.quantum, size - pos) - self._tokens) / rate)
+                continue
+            if session._close_err is not None:
+                raise MOQTException(*session._close_err)
+            pos += len(chunk)
+            self._tokens -= len(chunk)
+            session.send_stream_data(stream_id, bytes(chunk), end_stream=end_stream and pos == size)
+            if pos == size:
+                return
+
+    def __repr__(self) -> str:
+        return f"ObjectPacer(interval={self.interval}, burst={self.burst}, tokens={int(self._tokens)})"
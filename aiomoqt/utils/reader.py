@@ -0,0 +1,78 @@
+from typing import Union
+
+from aioquic.buffer import BufferReadError
+
+
+class BufferReader:
+    """Read cursor over received bytes, with the read API of aioquic's Buffer.
+
+    Wraps the event bytes (or a memoryview of them) without copying, where
+    Buffer(data=...) copies every received byte into a new buffer. Only
+    pulled values and payloads are copied out. Reads past the end raise
+    aioquic's BufferReadError, so message deserializers take either one.
+    """
+    __slots__ = ('_data', '_pos', 'capacity')
+
+    def __init__(self, data: Union[bytes, memoryview], pos: int = 0):
+        self._data = data
+        self._pos = pos
+        self.capacity = len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, pos: int) -> None:
+        if not 0 <= pos <= self.capacity:
+            raise BufferReadError
+        self._pos = pos
+
+    def eof(self) -> bool:
+        return self._pos >= self.capacity
+
+    def pull_uint_var(self) -> int:
+        pos = self._pos
+        try:
+            first = self._data[pos]
+        except IndexError:
+            raise BufferReadError
+        if first < 0x40:  # one byte: most ids, lengths and types
+            self._pos = pos + 1
+            return first
+        end = pos + (1 << (first >> 6))
+        if end > self.capacity:
+            raise BufferReadError
+        self._pos = end
+        return int.from_bytes(self._data[pos:end], 'big') & ((1 << (8 * (end - pos) - 2)) - 1)
+
+    def pull_uint8(self) -> int:
+        pos = self._pos
+        try:
+            value = self._data[pos]
+        except IndexError:
+            raise BufferReadError
+        self._pos = pos + 1
+        return value
+
+    def pull_uint16(self) -> int:
+        return int.from_bytes(self.pull_bytes(2), 'big')
+
+    def pull_uint32(self) -> int:
+        return int.from_bytes(self.pull_bytes(4), 'big')
+
+    def pull_bytes(self, length: int) -> bytes:
+        pos = self._pos
+        end = pos + length
+        if length < 0 or end > self.capacity:
+            raise BufferReadError
+        self._pos = end
+        return bytes(self._data[pos:end])
+
+    def data_slice(self, start: int, end: int) -> bytes:
+        return bytes(self._data[start:end])
+
+    def view(self, start: int) -> memoryview:
+        """Zero copy view of the bytes from start to the end."""
+        return memoryview(self._data)[start:]
+
+    def __repr__(self) -> str:
+        return f"BufferReader(pos={self._pos}, capacity={self.capacity})"
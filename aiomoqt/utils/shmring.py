@@ -0,0 +1,363 @@
+import sys
+import struct
+import asyncio
+import hashlib
+from multiprocessing import shared_memory, resource_tracker
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..types import FullTrackName, SubscribeDoneCode, MOQT_DEFAULT_PRIORITY
+from ..messages import ObjectHeader, SharedObject, SharedSubgroup
+from ..messages.codec import MOQTCodec, get_codec
+from .reader import BufferReader
+from .logger import get_logger
+
+if TYPE_CHECKING:
+    from ..protocol import MOQTSessionProtocol
+    from ..state import Subscription
+
+logger = get_logger(__name__)
+
+MOQT_RING_SIZE = 16 * 1024 * 1024  # object bytes held by a track ring
+MOQT_RING_SLOTS = 8192  # objects indexed by a track ring
+MOQT_RING_POLL_INTERVAL = 0.001  # seconds between reader polls of an idle ring
+
+# ring layout: header, index of fixed size entries, then the object data
+_MAGIC = b'MQRG'
+_LAYOUT_VERSION = 1
+_HEADER = struct.Struct('<4sIIIQ')  # magic, layout version, MoQT version, index slots, data capacity
+_WRITE_SEQ = 24  # offset of the objects published counter (u64)
+_HEAD = 32  # offset of the data bytes claimed counter (u64)
+_INDEX = 64  # offset of the index
+_U64 = struct.Struct('<Q')
+# seq + 1 (0: empty), data position, length, publisher priority, group id, subgroup id, object id
+_ENTRY = struct.Struct('<QQIIQQQ')
+
+
+def ring_name(track: FullTrackName, prefix: str = 'moqt') -> str:
+    """Shared memory name of a track's ring (short enough for POSIX shm name limits)."""
+    key = b'\0'.join(track.namespace) + b'\0\0' + track.name
+    return f"{prefix}-{hashlib.blake2b(key, digest_size=8).hexdigest()}"
+
+
+class RingObject:
+    """An object read from a ring: its stream encoding, shared like a SharedObject.
+
+    data(codec) returns the ring's encoding for the ring's MoQT version, and
+    re-encodes (once) for another version, so it can be passed to
+    send_object() or ObjectPacer.write() in place of a SharedObject.
+    """
+    __slots__ = ('seq', 'group_id', 'subgroup_id', 'object_id', 'publisher_priority', '_codec', '_data', '_shared')
+
+    def __init__(self, seq: int, group_id: int, subgroup_id: int, object_id: int,
+                 publisher_priority: int, codec: MOQTCodec, data: bytes):
+        self.seq = seq
+        self.group_id = group_id
+        self.subgroup_id = subgroup_id
+        self.object_id = object_id
+        self.publisher_priority = publisher_priority
+        self._codec = codec
+        self._data = data
+        self._shared: Optional[SharedObject] = None
+
+    def data(self, codec: MOQTCodec) -> bytes:
+        if codec is self._codec:
+            return self._data
+        if self._shared is None:
+            data = self._data
+            self._shared = SharedObject(ObjectHeader.deserialize(BufferReader(data), len(data), self._codec))
+        return self._shared.data(codec)
+
+    def __repr__(self) -> str:
+        return (f"RingObject(seq={self.seq}, id={self.group_id}.{self.subgroup_id}.{self.object_id}, "
+                f"size={len(self._data)})")
+
+
+class _Ring:
+    __slots__ = ('name', 'slots', 'capacity', 'codec', '_shm', '_buf', '_data_offset')
+
+    def _attach(self, shm: shared_memory.SharedMemory) -> None:
+        self._shm = shm
+        self._buf = shm.buf
+        self.name = shm.name
+        magic, layout, version, self.slots, self.capacity = _HEADER.unpack_from(self._buf, 0)
+        if magic != _MAGIC or layout != _LAYOUT_VERSION:
+            raise ValueError(f"not an object ring: {shm.name}")
+        self.codec = get_codec(version)
+        self._data_offset = _INDEX + self.slots * _ENTRY.size
+
+    @property
+    def write_seq(self) -> int:
+        """Objects published to the ring."""
+        return _U64.unpack_from(self._buf, _WRITE_SEQ)[0]
+
+    def close(self) -> None:
+        if self._buf is not None:
+            self._buf = None
+            self._shm.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name}, seq={self.write_seq if self._buf is not None else None})"
+
+
+class ObjectRingWriter(_Ring):
+    """Single producer side of a track's object ring in shared memory.
+
+    The ingest process appends each object of the track once, in its stream
+    encoding, with (group, subgroup, object) ids in a fixed size index.
+    Egress processes attach ObjectRingReaders by name and forward from it,
+    so serialization happens once for all worker processes. Old objects are
+    overwritten: the ring never waits for readers, a reader that falls
+    behind by more than the ring skips ahead.
+    """
+    __slots__ = ('_seq', '_head')
+
+    def __init__(
+        self,
+        name: str,
+        codec: MOQTCodec,
+        size: int = MOQT_RING_SIZE,
+        slots: int = MOQT_RING_SLOTS,
+    ):
+        shm = shared_memory.SharedMemory(name=name, create=True, size=_INDEX + slots * _ENTRY.size + size)
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, _LAYOUT_VERSION, codec.version, slots, size)
+        self._attach(shm)
+        self._seq = 0
+        self._head = 0
+
+    def append(self, group_id: int, subgroup_id: int, obj: ObjectHeader,
+               publisher_priority: int = MOQT_DEFAULT_PRIORITY) -> int:
+        """Append an object, serialized with the ring's codec. Returns its sequence number."""
+        return self.append_data(group_id, subgroup_id, obj.object_id, obj.serialize(self.codec).data,
+                                publisher_priority)
+
+    def append_data(self, group_id: int, subgroup_id: int, object_id: int, data: bytes,
+                    publisher_priority: int = MOQT_DEFAULT_PRIORITY) -> int:
+        """Append an object already in its stream encoding for the ring's codec."""
+        size = len(data)
+        capacity = self.capacity
+        if size > capacity // 2:
+            raise ValueError(f"object of {size} bytes too large for ring of {capacity}")
+        buf = self._buf
+        pos = self._head
+        offset = pos % capacity
+        if offset + size > capacity:  # objects are contiguous: wrap to the start
+            pos += capacity - offset
+            offset = 0
+        end = pos + size
+        _U64.pack_into(buf, _HEAD, end)  # claim the space before overwriting it
+        start = self._data_offset + offset
+        buf[start:start + size] = data
+        seq = self._seq
+        _ENTRY.pack_into(buf, _INDEX + (seq % self.slots) * _ENTRY.size,
+                         seq + 1, pos, size, publisher_priority, group_id, subgroup_id, object_id)
+        self._seq = seq + 1
+        self._head = end
+        _U64.pack_into(buf, _WRITE_SEQ, seq + 1)  # publish
+        return seq
+
+    def close(self, unlink: bool = True) -> None:
+        shm = self._shm
+        super().close()
+        if unlink:
+            shm.unlink()
+
+
+class ObjectRingReader(_Ring):
+    """Consumer side of a track's object ring, attached by name.
+
+    Readers start at the live edge (or at `start`) and read the objects
+    published since, validating each index entry and its data against the
+    writer's counters after copying it, so an object overwritten meanwhile
+    is never returned. Each object is copied out of shared memory once per
+    reader process, then shared by all its subscribers. A reader lapped by
+    the writer skips to the live edge, counting the objects lost in overruns.
+    """
+    __slots__ = ('next_seq', 'overruns')
+
+    def __init__(self, name: str, start: Optional[int] = None):
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # with a resource tracker already running (the writer's process, or a multiprocessing child
+            # sharing its parent's), the writer's registration covers the segment. Otherwise a new
+            # tracker would be started for this process and unlink the segment when the reader exits.
+            tracked = getattr(resource_tracker._resource_tracker, '_fd', None) is not None
+            shm = shared_memory.SharedMemory(name=name)
+            if not tracked:
+                resource_tracker.unregister(shm._name, 'shared_memory')
+        self._attach(shm)
+        self.next_seq = self.write_seq if start is None else start
+        self.overruns = 0
+
+    def _skip(self, write_seq: int) -> None:
+        self.overruns += write_seq - self.next_seq
+        logger.warning(f"MOQT ring: {self.name}: reader overrun, skipped {write_seq - self.next_seq} objects")
+        self.next_seq = write_seq
+
+    def read(self, limit: int = 256) -> List[RingObject]:
+        """Objects published since the last read, at most limit."""
+        buf = self._buf
+        write_seq = self.write_seq
+        seq = self.next_seq
+        if write_seq - seq > self.slots:
+            self._skip(write_seq)
+            return []
+        objects = []
+        slots = self.slots
+        capacity = self.capacity
+        data_offset = self._data_offset
+        codec = self.codec
+        end_seq = min(write_seq, seq + limit)
+        while seq < end_seq:
+            entry = _INDEX + (seq % slots) * _ENTRY.size
+            marker, pos, size, priority, group_id, subgroup_id, object_id = _ENTRY.unpack_from(buf, entry)
+            start = data_offset + pos % capacity
+            data = bytes(buf[start:start + size])
+            # still intact: index slot not reused, data not reclaimed by the writer
+            if marker != seq + 1 or _U64.unpack_from(buf, entry)[0] != marker \
+                    or _U64.unpack_from(buf, _HEAD)[0] > pos + capacity:
+                self.next_seq = seq
+                self._skip(self.write_seq)
+                return objects
+            objects.append(RingObject(seq, group_id, subgroup_id, object_id, priority, codec, data))
+            seq += 1
+        self.next_seq = seq
+        return objects
+
+    async def objects(self, poll_interval: float = MOQT_RING_POLL_INTERVAL) -> AsyncIterator[RingObject]:
+        """Objects as they are published, polling an idle ring every poll_interval."""
+        while self._buf is not None:
+            objects = self.read()
+            if not objects:
+                await asyncio.sleep(poll_interval)
+                continue
+            for obj in objects:
+                yield obj
+
+
+class RingFanout:
+    """Forwards a track's ring objects to the track's subscribers on this process's sessions.
+
+    sessions() returns the MoQT sessions to serve, e.g. those of a
+    MOQTServerSession's connections. Each peer subscription to the track
+    gets a data stream per subgroup, opened on its first object with the
+    subgroup header for the subscriber's track alias, and finished when a
+    later group starts or the subscription ends; FETCHes of the track (no
+    track alias) are skipped. Objects before a subscription's start are not
+    sent to it, and on reaching its end_group (as narrowed by
+    SUBSCRIBE_UPDATE) its streams are finished and SUBSCRIBE_DONE is sent.
+    Objects are encoded once per process (RingObject) and only the stream
+    writes are per subscriber.
+    """
+    __slots__ = ('reader', 'track', 'sessions', '_streams', '_opened', '_group_id', 'forwarded')
+
+    def __init__(
+        self,
+        reader: ObjectRingReader,
+        track: FullTrackName,
+        sessions: Callable[[], Iterable['MOQTSessionProtocol']],
+    ):
+        self.reader = reader
+        self.track = track
+        self.sessions = sessions
+        # (session, subscribe id, subgroup id) -> (group id, stream id)
+        self._streams: Dict[Tuple['MOQTSessionProtocol', int, int], Tuple[int, int]] = {}
+        # (session, subscribe id) -> data streams opened, the SUBSCRIBE_DONE stream count
+        self._opened: Dict[Tuple['MOQTSessionProtocol', int], int] = {}
+        self._group_id: Optional[int] = None
+        self.forwarded = 0  # object writes to subscriber streams
+
+    def _finish(self, keys: Iterable[Tuple['MOQTSessionProtocol', int, int]]) -> None:
+        """Finish (FIN) and forget subgroup streams, also those of subscriptions that have ended."""
+        streams = self._streams
+        for key in keys:
+            session = key[0]
+            _, stream_id = streams.pop(key)
+            if session._close_err is not None:
+                continue
+            try:
+                session.send_stream_data(stream_id, b"", end_stream=True, transmit=False)
+            except RuntimeError as e:  # reset by the peer (STOP_SENDING)
+                logger.debug(f"MOQT ring: stream({stream_id}): not finished: {e}")
+
+    def _end_subscription(self, session: 'MOQTSessionProtocol', sub: 'Subscription') -> None:
+        """Finish a subscription that reached its end group: FIN its streams, then SUBSCRIBE_DONE."""
+        subscribe_id = sub.subscribe_id
+        if session._subscribers.get(subscribe_id) is not sub:  # already done
+            return
+        self._finish([key for key in self._streams if key[0] is session and key[1] == subscribe_id])
+        session.subscribe_done(subscribe_id, SubscribeDoneCode.SUBSCRIPTION_ENDED,
+                               stream_count=self._opened.pop((session, subscribe_id), 0), reason="end of range")
+
+    def _end_group(self) -> None:
+        """Finish the subgroup streams of the previous group."""
+        self._finish(list(self._streams))
+
+    def forward(self, objects: Iterable[RingObject]) -> None:
+        """Send objects to every current subscriber of the track, one transmit per session."""
+        track = self.track
+        targets = []
+        for session in self.sessions():
+            subs = session._track_subscribers.get(track)
+            if not subs or session._close_err is not None:
+                continue
+            # subscriptions only: a FETCH has no track alias and is answered from the cache
+            subs = [sub for sub in subs.values() if sub.track_alias is not None]
+            if subs:
+                targets.append((session, subs))
+        streams = self._streams
+        opened = self._opened
+        if opened:  # finish the streams of subscriptions that ended (e.g. UNSUBSCRIBE) mid-group
+            live = {(session, sub.subscribe_id) for session, subs in targets for sub in subs}
+            for key in [key for key in opened if key not in live]:
+                del opened[key]
+            ended = [key for key in streams if key[:2] not in live]
+            if ended:
+                self._finish(ended)
+                for session in {key[0] for key in ended}:
+                    if session._close_err is None:
+                        session.transmit()
+        if not targets:
+            return
+        for obj in objects:
+            if obj.group_id != self._group_id:
+                if self._group_id is not None:
+                    self._end_group()
+                self._group_id = obj.group_id
+            subgroup = None
+            group_id = obj.group_id
+            for session, subs in targets:
+                for sub in subs:
+                    if group_id < sub.start_group or (group_id == sub.start_group and obj.object_id < sub.start_object):
+                        continue
+                    if sub.end_group and group_id >= sub.end_group:  # end_group is the last group + 1
+                        self._end_subscription(session, sub)
+                        continue
+                    key = (session, sub.subscribe_id, obj.subgroup_id)
+                    entry = streams.get(key)
+                    if entry is None:
+                        stream_id = session.create_data_stream(sub.subscribe_id, obj.publisher_priority)
+                        opened[key[:2]] = opened.get(key[:2], 0) + 1
+                        if subgroup is None:
+                            subgroup = SharedSubgroup(obj.group_id, obj.subgroup_id, obj.publisher_priority)
+                        session.send_subgroup_header(stream_id, subgroup, sub.track_alias, transmit=False)
+                        streams[key] = (obj.group_id, stream_id)
+                    else:
+                        stream_id = entry[1]
+                    session.send_object(stream_id, obj, transmit=False)
+                    self.forwarded += 1
+        for session, _ in targets:
+            session.transmit()
+
+    async def run(self, poll_interval: float = MOQT_RING_POLL_INTERVAL) -> None:
+        """Forward objects as they are published, until cancelled or the ring is closed."""
+        reader = self.reader
+        while reader._buf is not None:
+            objects = reader.read()
+            if objects:
+                self.forward(objects)
+            else:
+                await asyncio.sleep(poll_interval)
+
+    def __repr__(self) -> str:
+        return f"RingFanout(track={self.track}, streams={len(self._streams)}, forwarded={self.forwarded})"
@@ -0,0 +1,106 @@
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, Hashable, Optional
+
+from aioquic.tls import SessionTicket
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SessionTicketStore:
+    """TLS session tickets for QUIC resumption and 0-RTT, optionally persisted to a file.
+
+    Clients store the tickets they receive by origin and resume the next
+    connection to it with them:
+
+        store = SessionTicketStore('/var/tmp/moqt-tickets')
+        client = MOQTClientSession(host, port, endpoint='moq', ticket_store=store)
+
+    Servers use add() and fetch() as the aioquic session ticket handler and
+    fetcher. fetch() removes the ticket, so each ticket (and its 0-RTT data)
+    is accepted only once; the server issues a new ticket on every connection.
+    At most max_tickets are kept, oldest first out.
+    """
+    def __init__(self, path: Optional[str] = None, max_tickets: int = 1024):
+        self.path = path
+        self.max_tickets = max_tickets
+        self._tickets: Dict[Hashable, SessionTicket] = {}
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tickets
+
+    def get(self, key: Hashable) -> Optional[SessionTicket]:
+        """Valid ticket stored for key (expired tickets are dropped)."""
+        ticket = self._tickets.get(key)
+        if ticket is not None and not ticket.is_valid:
+            self.pop(key)
+            return None
+        return ticket
+
+    def put(self, key: Hashable, ticket: SessionTicket) -> None:
+        self._tickets.pop(key, None)
+        self._tickets[key] = ticket
+        while len(self._tickets) > self.max_tickets:
+            del self._tickets[next(iter(self._tickets))]
+        self._save()
+
+    def pop(self, key: Hashable) -> Optional[SessionTicket]:
+        ticket = self._tickets.pop(key, None)
+        if ticket is not None:
+            self._save()
+        return ticket
+
+    # aioquic server callbacks: tickets keyed by their label
+    def add(self, ticket: SessionTicket) -> None:
+        """Session ticket handler: store a ticket issued by this server."""
+        self.put(ticket.ticket, ticket)
+
+    def fetch(self, label: bytes) -> Optional[SessionTicket]:
+        """Session ticket fetcher: single use lookup of a ticket presented by a client."""
+        ticket = self.pop(label)
+        if ticket is not None and not ticket.is_valid:
+            return None
+        return ticket
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'rb') as f:
+                tickets: Dict[Hashable, Any] = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"MOQT: ignoring session ticket file: {self.path}: {e}")
+            return
+        self._tickets = {
+            key: ticket for key, ticket in tickets.items()
+            if isinstance(ticket, SessionTicket) and ticket.is_valid
+        }
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        # write and rename, so a reader never sees a partial file
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.tickets')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(self._tickets, f)
+            os.chmod(tmp_path, 0o600)  # tickets carry resumption secrets
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"MOQT: session ticket file not saved: {self.path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def __repr__(self) -> str:
+        return f"SessionTicketStore(path={self.path!r}, tickets={len(self._tickets)})"
@@ -0,0 +1,135 @@
+import asyncio
+import weakref
+from typing import Any, Callable, List, Optional, Set
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+MOQT_TIMER_RESOLUTION = 0.25  # seconds per timer wheel slot
+MOQT_TIMER_SLOTS = 512  # wheel size: timers further out than slots * resolution are revisited
+
+
+class Timer:
+    """A timer wheel entry: calls callback(*args) once `timeout` seconds after the last touch()."""
+    __slots__ = ('timeout', 'expires', 'callback', 'args', 'active', '_wheel', '_slot')
+
+    def __init__(self, wheel: 'TimerWheel', timeout: float, callback: Callable[..., Any], args: tuple):
+        self._wheel = wheel
+        self.timeout = timeout
+        self.expires = wheel.now + timeout
+        self.callback = callback
+        self.args = args
+        self.active = True
+        self._slot: Optional[Set['Timer']] = None
+
+    def touch(self) -> None:
+        """Restart the timeout from now (activity seen). Does not touch the wheel."""
+        self.expires = self._wheel.now + self.timeout
+
+    def cancel(self) -> None:
+        if self.active:
+            self.active = False
+            self._wheel._count -= 1
+            if self._slot is not None:  # not already due in the current sweep
+                self._slot.discard(self)
+                self._slot = None
+
+    def __repr__(self) -> str:
+        return f"Timer(timeout={self.timeout}, expires={self.expires:.3f}, active={self.active})"
+
+
+class TimerWheel:
+    """Hashed timer wheel with coarse resolution for idle timeouts and request deadlines.
+
+    Arming, touching and cancelling a timer are O(1) attribute updates with
+    no loop timer per entry: a single loop callback sweeps the due slot every
+    `resolution` seconds while timers are active. touch() only records the new
+    expiry; a timer reaching its slot early is moved to the slot of its
+    current expiry. `now` is the loop time of the latest sweep, so timeouts
+    fire up to one resolution late or (after touch) early.
+    """
+    __slots__ = ('resolution', 'now', '_loop', '_slots', '_tick', '_count', '_handle', '__weakref__')
+
+    def __init__(
+        self,
+        resolution: float = MOQT_TIMER_RESOLUTION,
+        slots: int = MOQT_TIMER_SLOTS,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self.resolution = resolution
+        self._loop = asyncio.get_running_loop() if loop is None else loop
+        self.now = self._loop.time()
+        self._slots: List[Set[Timer]] = [set() for _ in range(slots)]
+        self._tick = int(self.now / resolution)  # next tick to sweep
+        self._count = 0  # active timers
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def call_later(self, timeout: float, callback: Callable[..., Any], *args: Any) -> Timer:
+        """Arm a timer calling callback(*args) after timeout seconds (or after the last touch)."""
+        if self._handle is None:
+            self.now = self._loop.time()  # idle wheel: refresh the clock
+        timer = Timer(self, timeout, callback, args)
+        self._insert(timer)
+        self._count += 1
+        if self._handle is None:
+            self._handle = self._loop.call_later(self.resolution, self._sweep)
+        return timer
+
+    def _insert(self, timer: Timer) -> None:
+        tick = max(int(timer.expires / self.resolution), self._tick)
+        slot = timer._slot = self._slots[tick % len(self._slots)]
+        slot.add(timer)
+
+    def _sweep(self) -> None:
+        self._handle = None
+        now = self.now = self._loop.time()
+        slots = self._slots
+        last = int(now / self.resolution)
+        if last - self._tick >= len(slots):  # loop stalled: sweep every slot once
+            self._tick = last - len(slots) + 1
+        expired = []
+        while self._tick <= last:
+            index = self._tick % len(slots)
+            slot = slots[index]
+            self._tick += 1
+            if not slot:
+                continue
+            slots[index] = set()
+            for timer in slot:
+                if timer.expires <= now:
+                    expired.append(timer)
+                else:
+                    self._insert(timer)
+        for timer in expired:
+            timer._slot = None
+        for timer in expired:
+            if not timer.active:  # cancelled by an earlier callback
+                continue
+            timer.active = False
+            self._count -= 1
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                logger.error(f"MOQT error: timer callback failed: {timer.callback}: {e}")
+        if self._count > 0 and self._handle is None:
+            self._handle = self._loop.call_later(self.resolution, self._sweep)
+
+    def __repr__(self) -> str:
+        return f"TimerWheel(resolution={self.resolution}, timers={self._count})"
+
+
+_wheels: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TimerWheel]' = weakref.WeakKeyDictionary()
+
+
+def get_timer_wheel(loop: Optional[asyncio.AbstractEventLoop] = None) -> TimerWheel:
+    """Timer wheel shared by all sessions on an event loop."""
+    loop = asyncio.get_running_loop() if loop is None else loop
+    wheel = _wheels.get(loop)
+    if wheel is None:
+        wheel = _wheels[loop] = TimerWheel(loop=loop)
+    return wheel
+